@@ -0,0 +1,518 @@
+"""
+Local JSON API for Daily Task Tracker Pro
+An optional asyncio HTTP server, bound to localhost, for scripts and bots that
+would otherwise open tasks_enhanced.db themselves. Reads run on a small pool
+of read-only connections; every write is queued to one writer thread that
+group-commits whatever is pending in a single transaction, one savepoint per
+request, so API clients never race each other or the GUI for the write lock.
+When the in-flight or write queue limits are reached, requests are refused
+with 503 and Retry-After instead of piling up. Run it standalone with
+
+    python api_server.py --port 8766
+
+or enable it in the app settings. Endpoints:
+
+    GET    /tasks?date=&search=&limit=&after=   list (keyset paged)
+    GET    /tasks/<id>                          one task
+    POST   /tasks                               create
+    PATCH  /tasks/<id>                          update fields
+    DELETE /tasks/<id>                          delete with subtasks
+    POST   /tasks/<id>/time                     log {"minutes": n}
+    GET    /stats?date= or ?start=&end=         completion and time totals
+    POST   /batch                               [{"method", "path", "body"}, ...]
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import json
+import queue
+import re
+import sqlite3
+import threading
+from datetime import date, datetime
+from urllib.parse import parse_qs, urlparse
+
+import tag_index
+import task_queries
+from reminders import parse_due
+from subtasks import TaskHierarchy
+from task_model import TASK_FIELDS
+
+
+MAX_BODY_BYTES = 1024 * 1024
+MAX_BATCH = 100
+
+# Columns a client may set; the rest are derived or internal
+WRITABLE_FIELDS = ('title', 'description', 'priority', 'category', 'completed', 'estimated_time',
+                   'tags', 'notes', 'progress', 'date_created', 'parent_task_id', 'due_at')
+PRIORITIES = ('High', 'Medium', 'Low')
+
+STATUS_TEXT = {200: 'OK', 201: 'Created', 400: 'Bad Request', 404: 'Not Found',
+               405: 'Method Not Allowed', 413: 'Payload Too Large', 500: 'Internal Server Error',
+               503: 'Service Unavailable'}
+
+
+class ApiError(Exception):
+    """An error reported to the client with an HTTP status"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class Busy(ApiError):
+    def __init__(self, message="Server busy, retry shortly"):
+        super().__init__(503, message)
+
+
+# Request handlers. Readers take (conn, params); writers take (conn, hierarchy, body).
+
+def _task_dict(row):
+    return dict(zip(TASK_FIELDS, row))
+
+
+def _day(value, name='date'):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        raise ApiError(400, f"'{name}' must be a YYYY-MM-DD date")
+
+
+def _int(value, name):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ApiError(400, f"'{name}' must be an integer")
+
+
+def list_tasks(conn, params):
+    """One page of tasks for a date (or all dates), with search and #tags"""
+    tags, words = tag_index.split_search(params.get('search', ''))
+    where, args = 'archived = 0', []
+    if 'date' in params:
+        where += ' AND date_created = ?'
+        args.append(_day(params['date']))
+        order, descending = task_queries.TASK_ORDER, False
+    else:
+        order, descending = ('date_created', 'id'), True
+    if words:
+        where += ' AND (title LIKE ? OR description LIKE ? OR tags LIKE ?)'
+        args.extend([f'%{words}%'] * 3)
+    tag_clause, tag_args = tag_index.tag_filter_sql(tags)
+    where += tag_clause
+    args.extend(tag_args)
+
+    limit = min(_int(params.get('limit', task_queries.PAGE_SIZE), 'limit'), 500)
+    try:
+        after = json.loads(params['after']) if 'after' in params else None
+    except ValueError:
+        raise ApiError(400, "'after' must be the JSON cursor of a previous page")
+
+    rows, next_cursor = task_queries.fetch_page(conn.cursor(), TASK_FIELDS, where, args, after=after,
+                                                limit=limit, order=order, descending=descending)
+    return {'tasks': [_task_dict(row) for row in rows],
+            'next': json.dumps(next_cursor) if next_cursor is not None else None}
+
+
+def get_task(conn, params, task_id):
+    cursor = conn.cursor()
+    cursor.execute(f'SELECT {", ".join(TASK_FIELDS)} FROM tasks WHERE id = ?', (task_id,))
+    row = cursor.fetchone()
+    if row is None:
+        raise ApiError(404, f"Task {task_id} not found")
+    return _task_dict(row)
+
+
+def task_stats(conn, params):
+    """Totals for one date or an inclusive range"""
+    if 'date' in params:
+        start = end = _day(params['date'])
+    else:
+        start = _day(params.get('start'), 'start')
+        end = _day(params.get('end'), 'end')
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT COUNT(*), COALESCE(SUM(completed), 0), COALESCE(SUM(estimated_time), 0),
+               COALESCE(SUM(actual_time), 0)
+        FROM tasks WHERE date_created BETWEEN ? AND ? AND archived = 0
+    ''', (start, end))
+    total, completed, estimated, actual = cursor.fetchone()
+    return {'start': start, 'end': end, 'total': total, 'completed': completed,
+            'estimated_minutes': estimated, 'actual_minutes': actual}
+
+
+def _fields(body, required=()):
+    if not isinstance(body, dict):
+        raise ApiError(400, "Body must be a JSON object")
+    unknown = set(body) - set(WRITABLE_FIELDS)
+    if unknown:
+        raise ApiError(400, f"Unknown or read-only fields: {', '.join(sorted(unknown))}")
+    for name in required:
+        if not str(body.get(name) or '').strip():
+            raise ApiError(400, f"'{name}' is required")
+    if 'date_created' in body:
+        _day(body['date_created'], 'date_created')
+    if 'priority' in body and body['priority'] not in PRIORITIES:
+        raise ApiError(400, f"'priority' must be one of {', '.join(PRIORITIES)}")
+    if 'completed' in body and body['completed'] not in (0, 1):
+        raise ApiError(400, "'completed' must be 0 or 1")
+    if 'progress' in body and not 0 <= _int(body['progress'], 'progress') <= 100:
+        raise ApiError(400, "'progress' must be between 0 and 100")
+    if body.get('due_at') is not None and parse_due(body['due_at']) is None:
+        raise ApiError(400, "'due_at' must be a 'YYYY-MM-DD HH:MM' time")
+    return body
+
+
+def _check_parent(conn, hierarchy, parent_id, task_id=None):
+    """Reject a parent that is missing, or the task itself or one of its subtasks"""
+    if parent_id is None:
+        return
+    parent_id = _int(parent_id, 'parent_task_id')
+    cursor = conn.cursor()
+    cursor.execute('SELECT 1 FROM tasks WHERE id = ?', (parent_id,))
+    if cursor.fetchone() is None:
+        raise ApiError(400, f"Parent task {parent_id} not found")
+    if task_id is not None and parent_id in hierarchy.subtree_ids(task_id):
+        raise ApiError(400, "A task cannot be moved under itself or one of its subtasks")
+
+
+def _completion_bookkeeping(cursor, fields, task_id):
+    """Same bookkeeping as ticking the box in the app, on the local date"""
+    if 'completed' not in fields:
+        return
+    progress = '' if 'progress' in fields else ', progress = CASE WHEN completed = 1 THEN 100 ELSE 0 END'
+    cursor.execute(f'''
+        UPDATE tasks SET date_completed = CASE WHEN completed = 1 THEN ? END{progress}
+        WHERE id = ?
+    ''', (date.today().isoformat(), task_id))
+
+
+def create_task(conn, hierarchy, body):
+    fields = dict(_fields(body, required=('title',)))
+    _check_parent(conn, hierarchy, fields.get('parent_task_id'))
+    fields.setdefault('date_created', date.today().isoformat())
+    cursor = conn.cursor()
+    cursor.execute(f'''
+        INSERT INTO tasks ({', '.join(fields)}) VALUES ({', '.join('?' for _ in fields)})
+    ''', list(fields.values()))
+    task_id = cursor.lastrowid
+    _completion_bookkeeping(cursor, fields, task_id)
+    hierarchy.refresh(task_id)
+    return get_task(conn, {}, task_id)
+
+
+def update_task(conn, hierarchy, body, task_id):
+    fields = _fields(body)
+    old_parent = get_task(conn, {}, task_id)['parent_task_id']
+    _check_parent(conn, hierarchy, fields.get('parent_task_id'), task_id)
+    if fields:
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            UPDATE tasks SET {', '.join(f'{name} = ?' for name in fields)} WHERE id = ?
+        ''', list(fields.values()) + [task_id])
+        _completion_bookkeeping(cursor, fields, task_id)
+        hierarchy.refresh(task_id)
+        # A moved task leaves its old parent's rollup behind
+        if old_parent is not None and fields.get('parent_task_id', old_parent) != old_parent:
+            hierarchy.refresh(old_parent)
+    return get_task(conn, {}, task_id)
+
+
+def delete_task(conn, hierarchy, body, task_id):
+    get_task(conn, {}, task_id)
+    return {'deleted': hierarchy.delete_subtree(task_id)}
+
+
+def log_time(conn, hierarchy, body, task_id):
+    get_task(conn, {}, task_id)
+    if not isinstance(body, dict):
+        raise ApiError(400, "Body must be a JSON object")
+    minutes = _int(body.get('minutes'), 'minutes')
+    if minutes <= 0:
+        raise ApiError(400, "'minutes' must be positive")
+
+    now = datetime.now()
+    cursor = conn.cursor()
+    cursor.execute('''
+        INSERT INTO time_logs (task_id, start_time, end_time, duration, notes)
+        VALUES (?, ?, ?, ?, ?)
+    ''', (task_id, now, now, minutes * 60, body.get('notes') or "Logged via API"))
+    cursor.execute('UPDATE tasks SET actual_time = actual_time + ? WHERE id = ?', (minutes, task_id))
+    hierarchy.refresh(task_id)
+    return get_task(conn, {}, task_id)
+
+
+ROUTES = [
+    ('GET', re.compile(r'/tasks'), list_tasks, False),
+    ('GET', re.compile(r'/tasks/(\d+)'), get_task, False),
+    ('GET', re.compile(r'/stats'), task_stats, False),
+    ('POST', re.compile(r'/tasks'), create_task, True),
+    ('PATCH', re.compile(r'/tasks/(\d+)'), update_task, True),
+    ('DELETE', re.compile(r'/tasks/(\d+)'), delete_task, True),
+    ('POST', re.compile(r'/tasks/(\d+)/time'), log_time, True),
+]
+
+
+def route(method, path):
+    """(handler, is_write, path args) for a request"""
+    matched_path = False
+    for route_method, pattern, handler, is_write in ROUTES:
+        match = pattern.fullmatch(path)
+        if match:
+            matched_path = True
+            if route_method == method:
+                return handler, is_write, [int(arg) for arg in match.groups()]
+    raise ApiError(405 if matched_path else 404, f"No route for {method} {path}")
+
+
+class ReadPool:
+    """Fixed set of read-only connections shared by executor threads"""
+
+    def __init__(self, db_path, size=4):
+        self.size = size
+        self.executor = concurrent.futures.ThreadPoolExecutor(size, thread_name_prefix='api-read')
+        self.connections = queue.Queue()
+        for _ in range(size):
+            conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True, timeout=30, check_same_thread=False)
+            self.connections.put(conn)
+
+    def _call(self, fn, *args):
+        conn = self.connections.get()
+        try:
+            return fn(conn, *args)
+        finally:
+            self.connections.put(conn)
+
+    def run(self, fn, *args):
+        return asyncio.get_running_loop().run_in_executor(self.executor, self._call, fn, *args)
+
+
+class SerializedWriter:
+    """Single writer thread; queued writes are group-committed in batches
+
+    Each write runs in its own savepoint, so a failing request is rolled back
+    alone while the rest of its batch commits.
+    """
+
+    def __init__(self, db_path, max_pending=256, batch_size=64):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.pending = queue.Queue(max_pending)
+        self.thread = threading.Thread(target=self._run, name='api-writer', daemon=True)
+        self.thread.start()
+
+    def submit(self, fn, *args):
+        """Queue fn(conn, hierarchy, *args); returns a concurrent Future"""
+        future = concurrent.futures.Future()
+        try:
+            self.pending.put_nowait((fn, args, future))
+        except queue.Full:
+            raise Busy("Write queue is full, retry shortly")
+        return future
+
+    def _run(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        hierarchy = TaskHierarchy(conn)
+        cursor = conn.cursor()
+        while True:
+            batch = [self.pending.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.pending.get_nowait())
+                except queue.Empty:
+                    break
+
+            outcomes = []
+            try:
+                cursor.execute('BEGIN IMMEDIATE')
+                for fn, args, future in batch:
+                    cursor.execute('SAVEPOINT api_request')
+                    try:
+                        outcomes.append((future, fn(conn, hierarchy, *args), None))
+                        cursor.execute('RELEASE api_request')
+                    except Exception as e:
+                        cursor.execute('ROLLBACK TO api_request')
+                        cursor.execute('RELEASE api_request')
+                        outcomes.append((future, None, e))
+                cursor.execute('COMMIT')
+            except sqlite3.Error as e:
+                if conn.in_transaction:
+                    cursor.execute('ROLLBACK')
+                outcomes = [(future, None, Busy(f"Database unavailable: {e}")) for _, _, future in batch]
+
+            # Results are released only once the batch is durable
+            for future, result, error in outcomes:
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+
+
+class ApiServer:
+    """asyncio HTTP/1.1 front end over the read pool and the writer"""
+
+    def __init__(self, db_path='tasks_enhanced.db', host='127.0.0.1', port=8766,
+                 read_connections=4, max_inflight=64):
+        self.db_path = db_path
+        self.host = host
+        self.port = port
+        self.read_connections = read_connections
+        self.max_inflight = max_inflight
+        self.inflight = 0
+
+    async def start(self):
+        self.reads = ReadPool(self.db_path, self.read_connections)
+        self.writer = SerializedWriter(self.db_path)
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        return self.server
+
+    async def serve_forever(self):
+        server = await self.start()
+        async with server:
+            await server.serve_forever()
+
+    async def handle_connection(self, reader, writer):
+        """Serve requests on one connection in order (keep-alive)"""
+        try:
+            while True:
+                request = await self.read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                status, payload = await self.dispatch(method, target, body)
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                await self.write_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except ApiError as e:
+            await self.write_response(writer, e.status, {'error': str(e)}, keep_alive=False)
+        finally:
+            writer.close()
+
+    async def read_request(self, reader):
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, target, _ = line.decode('latin-1').split(' ', 2)
+        except ValueError:
+            raise ApiError(400, "Malformed request line")
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get('content-length') or 0)
+        except ValueError:
+            raise ApiError(400, "Content-Length must be an integer")
+        if length < 0:
+            raise ApiError(400, "Content-Length must not be negative")
+        if length > MAX_BODY_BYTES:
+            raise ApiError(413, "Request body too large")
+        body = await reader.readexactly(length) if length else b''
+        return method.upper(), target, headers, body
+
+    async def write_response(self, writer, status, payload, keep_alive=True):
+        body = json.dumps(payload, default=str).encode('utf-8')
+        head = [f'HTTP/1.1 {status} {STATUS_TEXT.get(status, "")}',
+                'Content-Type: application/json',
+                f'Content-Length: {len(body)}',
+                f'Connection: {"keep-alive" if keep_alive else "close"}']
+        if status == 503:
+            head.append('Retry-After: 1')
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body)
+        await writer.drain()  # Slow readers hold their own connection back, not the server
+
+    async def dispatch(self, method, target, body):
+        """Run one request; returns (status, payload)"""
+        if self.inflight >= self.max_inflight:
+            return 503, {'error': "Too many requests in flight, retry shortly"}
+        self.inflight += 1
+        try:
+            url = urlparse(target)
+            data = json.loads(body) if body else None
+            if url.path == '/batch' and method == 'POST':
+                return 200, await self.run_batch(data)
+            params = {key: values[0] for key, values in parse_qs(url.query).items()}
+            status = 201 if method == 'POST' else 200
+            return status, await self.call(method, url.path, params, data)
+        except ApiError as e:
+            return e.status, {'error': str(e)}
+        except ValueError:
+            return 400, {'error': "Body is not valid JSON"}
+        except Exception as e:
+            return 500, {'error': str(e)}
+        finally:
+            self.inflight -= 1
+
+    async def call(self, method, path, params, data):
+        handler, is_write, args = route(method, path)
+        if is_write:
+            return await asyncio.wrap_future(self.writer.submit(handler, data, *args))
+        return await self.reads.run(handler, params, *args)
+
+    async def run_batch(self, requests):
+        """Run sub-requests concurrently; their writes share the writer's next commit"""
+        if not isinstance(requests, list) or len(requests) > MAX_BATCH:
+            raise ApiError(400, f"Batch must be a list of at most {MAX_BATCH} requests")
+
+        async def run_one(request):
+            try:
+                url = urlparse(request['path'])
+                params = {key: values[0] for key, values in parse_qs(url.query).items()}
+                result = await self.call(request.get('method', 'GET').upper(), url.path,
+                                         params, request.get('body'))
+                return {'status': 200, 'body': result}
+            except ApiError as e:
+                return {'status': e.status, 'body': {'error': str(e)}}
+            except (KeyError, TypeError):
+                return {'status': 400, 'body': {'error': "Each request needs a 'path'"}}
+
+        return await asyncio.gather(*(run_one(request) for request in requests))
+
+
+def start_in_thread(db_path='tasks_enhanced.db', host='127.0.0.1', port=8766):
+    """Run the API on a daemon thread with its own event loop (used by the GUI)"""
+    api = ApiServer(db_path, host, port)
+    ready = threading.Event()
+    errors = []
+
+    def run():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(api.start())
+        except OSError as e:
+            errors.append(e)
+            ready.set()
+            return
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, name='api-server', daemon=True).start()
+    ready.wait()
+    if errors:
+        raise errors[0]
+    return api
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Daily Task Tracker Pro local API")
+    parser.add_argument('--db', default='tasks_enhanced.db')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8766)
+    args = parser.parse_args()
+
+    print(f"API listening on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(ApiServer(args.db, args.host, args.port).serve_forever())
+    except KeyboardInterrupt:
+        pass
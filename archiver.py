@@ -0,0 +1,172 @@
+"""
+Task archival for Daily Task Tracker Pro
+Moves completed tasks older than a horizon, together with their time logs,
+out of the hot tables into an attached archive database. Reads that reach
+back past the archive watermark go through the ``task_history`` and
+``time_log_history`` views, which union both stores.
+"""
+
+import json
+from datetime import date, timedelta
+
+import sync
+
+
+class TaskArchiver:
+    """Hot/cold partitioning of the tasks and time_logs tables"""
+
+    def __init__(self, conn, archive_path='tasks_archive.db', horizon_days=90, batch_size=200):
+        self.conn = conn
+        self.cursor = conn.cursor()
+        self.horizon_days = horizon_days
+        self.batch_size = batch_size
+        self.archive_path = archive_path
+
+        self.cursor.execute('ATTACH DATABASE ? AS archive', (archive_path,))
+        self.init_schema()
+        self.watermark = self.load_watermark()
+
+    def init_schema(self):
+        """Mirror the hot tables in the archive and build the history views"""
+        for table in ('tasks', 'time_logs'):
+            self.cursor.execute(f'''
+                CREATE TABLE IF NOT EXISTS archive.{table} AS
+                SELECT * FROM main.{table} WHERE 0
+            ''')
+
+            # Pick up columns added to the hot table by later migrations
+            archived_columns = set(self.columns(table, 'archive'))
+            for column, declared_type in self.columns(table, 'main').items():
+                if column not in archived_columns:
+                    self.cursor.execute(f'ALTER TABLE archive.{table} ADD COLUMN {column} {declared_type}')
+
+        self.cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS archive.idx_archive_tasks_id ON tasks (id)')
+        self.cursor.execute('CREATE INDEX IF NOT EXISTS archive.idx_archive_tasks_date ON tasks (date_created)')
+        self.cursor.execute('CREATE INDEX IF NOT EXISTS archive.idx_archive_time_logs_task ON time_logs (task_id)')
+        sync.init_archive_triggers(self.cursor)
+
+        # Archived rows keep archived = 1 on disk but read as live history
+        task_columns = list(self.columns('tasks', 'main'))
+        archived_select = ', '.join('0 AS archived' if c == 'archived' else c for c in task_columns)
+        self.cursor.execute('DROP VIEW IF EXISTS temp.task_history')
+        self.cursor.execute(f'''
+            CREATE TEMP VIEW task_history AS
+            SELECT {', '.join(task_columns)} FROM main.tasks
+            UNION ALL
+            SELECT {archived_select} FROM archive.tasks
+        ''')
+
+        log_columns = ', '.join(self.columns('time_logs', 'main'))
+        self.cursor.execute('DROP VIEW IF EXISTS temp.time_log_history')
+        self.cursor.execute(f'''
+            CREATE TEMP VIEW time_log_history AS
+            SELECT {log_columns} FROM main.time_logs
+            UNION ALL
+            SELECT {log_columns} FROM archive.time_logs
+        ''')
+        self.conn.commit()
+
+    def columns(self, table, schema):
+        """Column name -> declared type, in table order"""
+        self.cursor.execute(f'PRAGMA {schema}.table_info({table})')
+        return {row[1]: row[2] for row in self.cursor.fetchall()}
+
+    def load_watermark(self):
+        """Newest date_created that has been moved to the archive"""
+        self.cursor.execute("SELECT value FROM settings WHERE key = 'archive_watermark'")
+        row = self.cursor.fetchone()
+        return row[0] if row else None
+
+    def source_for(self, start_date):
+        """Table or view to read for a range starting at start_date"""
+        if self.watermark and str(start_date) <= self.watermark:
+            return 'task_history'
+        return 'tasks'
+
+    def log_source_for(self, start_date):
+        """Time log table or view to read for a range starting at start_date"""
+        if self.watermark and str(start_date)[:10] <= self.watermark:
+            return 'time_log_history'
+        return 'time_logs'
+
+    def archive_batch(self):
+        """Move one batch of old completed task trees; returns the number of tasks moved"""
+        if not self.horizon_days:
+            return 0
+
+        # Whole trees only: roots whose subtasks are all done, taking the subtasks along
+        cutoff = date.today() - timedelta(days=self.horizon_days)
+        self.cursor.execute('''
+            WITH RECURSIVE blocked (id) AS (
+                SELECT parent_task_id FROM main.tasks WHERE completed = 0 AND parent_task_id IS NOT NULL
+                UNION
+                SELECT t.parent_task_id FROM main.tasks t JOIN blocked ON t.id = blocked.id
+                WHERE t.parent_task_id IS NOT NULL
+            )
+            SELECT id FROM main.tasks t
+            WHERE completed = 1 AND date_created < ?
+              AND NOT EXISTS (SELECT 1 FROM main.tasks p WHERE p.id = t.parent_task_id)
+              AND id NOT IN (SELECT id FROM blocked)
+            ORDER BY date_created
+            LIMIT ?
+        ''', (cutoff, self.batch_size))
+        roots = [row[0] for row in self.cursor.fetchall()]
+        if not roots:
+            return 0
+
+        self.cursor.execute('''
+            WITH RECURSIVE tree (id) AS (
+                SELECT value FROM json_each(?)
+                UNION
+                SELECT c.id FROM main.tasks c JOIN tree ON c.parent_task_id = tree.id
+            )
+            SELECT id, date_created FROM main.tasks WHERE id IN (SELECT id FROM tree)
+        ''', (json.dumps(roots),))
+        rows = self.cursor.fetchall()
+
+        ids = json.dumps([row[0] for row in rows])
+        newest = max(str(row[1]) for row in rows)
+
+        task_columns = list(self.columns('tasks', 'main'))
+        task_select = ', '.join('1' if c == 'archived' else c for c in task_columns)
+        log_columns = ', '.join(self.columns('time_logs', 'main'))
+
+        try:
+            self.cursor.execute(f'''
+                INSERT INTO archive.tasks ({', '.join(task_columns)})
+                SELECT {task_select} FROM main.tasks
+                WHERE id IN (SELECT value FROM json_each(?))
+            ''', (ids,))
+            self.cursor.execute(f'''
+                INSERT INTO archive.time_logs ({log_columns})
+                SELECT {log_columns} FROM main.time_logs
+                WHERE task_id IN (SELECT value FROM json_each(?))
+            ''', (ids,))
+            # Flag before deleting anything so delete triggers can tell a move from a user delete
+            self.cursor.execute('UPDATE main.tasks SET archived = 1 WHERE id IN (SELECT value FROM json_each(?))', (ids,))
+            self.cursor.execute('DELETE FROM main.time_logs WHERE task_id IN (SELECT value FROM json_each(?))', (ids,))
+            self.cursor.execute('DELETE FROM main.tasks WHERE id IN (SELECT value FROM json_each(?))', (ids,))
+
+            if not self.watermark or newest > self.watermark:
+                self.cursor.execute('''
+                    INSERT OR REPLACE INTO settings (key, value) VALUES ('archive_watermark', ?)
+                ''', (newest,))
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+
+        if not self.watermark or newest > self.watermark:
+            self.watermark = newest
+        return len(rows)
+
+    def forget(self, task_id):
+        """Remove an archived task and its time logs; the caller commits"""
+        self.cursor.execute('DELETE FROM archive.time_logs WHERE task_id = ?', (task_id,))
+        self.cursor.execute('DELETE FROM archive.tasks WHERE id = ?', (task_id,))
+
+    def forget_many(self, task_ids):
+        """Remove several archived tasks and their time logs; the caller commits"""
+        ids = json.dumps(list(task_ids))
+        self.cursor.execute('DELETE FROM archive.time_logs WHERE task_id IN (SELECT value FROM json_each(?))', (ids,))
+        self.cursor.execute('DELETE FROM archive.tasks WHERE id IN (SELECT value FROM json_each(?))', (ids,))
@@ -0,0 +1,379 @@
+"""
+Canvas-drawn views for Daily Task Tracker Pro
+Dense displays draw their cells as items on a single Tk Canvas and resolve
+the pointer to a cell arithmetically, instead of creating a widget per cell.
+Redrawing deletes and recreates items; no widget is created or destroyed.
+"""
+
+import tkinter as tk
+import tkinter.font as tkfont
+from datetime import date, timedelta
+
+import customtkinter as ctk
+
+
+ACCENT = (0x1f, 0x6a, 0xa5)
+SELECTED = "#3b8ed0"
+
+
+def palette():
+    """Background, text and empty-cell colors matching the appearance mode"""
+    if ctk.get_appearance_mode() == "Dark":
+        return {"bg": "#2b2b2b", "text": "gray70", "empty": "#3a3a3a", "tip": "#1d1e1e", "fill": ACCENT,
+                "row": "#333333", "strong": "gray90"}
+    return {"bg": "#dbdbdb", "text": "gray30", "empty": "#c8c8c8", "tip": "#f9f9fa", "fill": ACCENT,
+            "row": "#cfcfcf", "strong": "gray10"}
+
+
+def shade(color, empty, level):
+    """Blend from the empty color (#rrggbb) towards color (r, g, b); level is 0..1"""
+    empty = tuple(int(empty[i:i + 2], 16) for i in (1, 3, 5))
+    return "#" + "".join(f"{round(e + (c - e) * level):02x}" for c, e in zip(color, empty))
+
+
+class YearHeatmap:
+    """Contribution-style grid, one band of week columns per year
+
+    values maps 'YYYY-MM-DD' to a count; describe(day) supplies the tooltip
+    text and on_select(day) is called on click.
+    """
+
+    CELL = 13
+    GAP = 2
+    LEFT = 32
+    TOP = 16
+    LEVELS = 4
+
+    def __init__(self, parent, on_select, describe):
+        self.on_select = on_select
+        self.describe = describe
+        self.years = []
+        self.values = {}
+        self.colors = palette()
+
+        pitch = self.CELL + self.GAP
+        self.canvas = tk.Canvas(parent, width=self.LEFT + 54 * pitch, height=self.band_height(),
+                                highlightthickness=0)
+        self.canvas.bind("<Motion>", self.on_motion)
+        self.canvas.bind("<Leave>", lambda e: self.hide_tip())
+        self.canvas.bind("<Button-1>", self.on_click)
+
+    def band_height(self):
+        return self.TOP + 7 * (self.CELL + self.GAP) + 10
+
+    def pack(self, **kwargs):
+        self.canvas.pack(**kwargs)
+
+    @staticmethod
+    def grid_start(year):
+        """Monday on or before January 1st"""
+        first = date(year, 1, 1)
+        return first - timedelta(days=first.weekday())
+
+    def draw(self, years, values):
+        """Draw the given years, newest first, in one pass"""
+        self.years = list(years)
+        self.values = values
+        self.colors = colors = palette()
+        canvas = self.canvas
+        canvas.delete("all")
+        canvas.configure(bg=colors["bg"], height=self.band_height() * len(self.years))
+
+        counts = sorted(count for count in values.values() if count > 0)
+        # Quartile thresholds keep one busy day from washing out the rest
+        thresholds = [counts[len(counts) * level // self.LEVELS] for level in range(1, self.LEVELS)] if counts else []
+
+        pitch = self.CELL + self.GAP
+        for band, year in enumerate(self.years):
+            top = band * self.band_height()
+            canvas.create_text(2, top + 2, text=str(year), anchor="nw", fill=colors["text"],
+                               font=("TkDefaultFont", 9, "bold"))
+            for row, name in ((0, "Mon"), (2, "Wed"), (4, "Fri")):
+                canvas.create_text(2, top + self.TOP + row * pitch + self.CELL / 2, text=name, anchor="w",
+                                   fill=colors["text"], font=("TkDefaultFont", 8))
+
+            start = self.grid_start(year)
+            day = date(year, 1, 1)
+            while day.year == year:
+                column, row = (day - start).days // 7, day.weekday()
+                x = self.LEFT + column * pitch
+                y = top + self.TOP + row * pitch
+                if day.day == 1:
+                    canvas.create_text(x, top + 2, text=day.strftime("%b"), anchor="nw", fill=colors["text"],
+                                       font=("TkDefaultFont", 8))
+                count = values.get(str(day), 0)
+                level = sum(count >= threshold for threshold in thresholds) + 1 if count > 0 else 0
+                fill = shade(colors["fill"], colors["empty"], level / self.LEVELS) if level else colors["empty"]
+                canvas.create_rectangle(x, y, x + self.CELL, y + self.CELL, fill=fill, width=0)
+                day += timedelta(days=1)
+
+        # One tooltip, moved and refilled on hover
+        canvas.create_rectangle(0, 0, 0, 0, fill=colors["tip"], outline=colors["text"], state="hidden",
+                                tags=("tip", "tip_box"))
+        canvas.create_text(0, 0, text="", anchor="nw", fill=colors["text"], state="hidden",
+                           font=("TkDefaultFont", 9), tags=("tip", "tip_text"))
+
+    def date_at(self, x, y):
+        """The day drawn under a canvas point, or None"""
+        if not self.years or x < self.LEFT:
+            return None
+        band, offset = divmod(y, self.band_height())
+        pitch = self.CELL + self.GAP
+        column, row = (x - self.LEFT) // pitch, (offset - self.TOP) // pitch
+        if band >= len(self.years) or offset < self.TOP or not 0 <= row < 7:
+            return None
+        year = self.years[int(band)]
+        day = self.grid_start(year) + timedelta(days=int(column) * 7 + int(row))
+        return day if day.year == year else None
+
+    def on_motion(self, event):
+        day = self.date_at(event.x, event.y)
+        if day is None:
+            self.hide_tip()
+            return
+        canvas = self.canvas
+        canvas.itemconfigure("tip_text", text=self.describe(day))
+        x = min(event.x + 12, int(canvas["width"]) - 220)
+        y = event.y + 14 if event.y < int(canvas["height"]) - 50 else event.y - 40
+        canvas.coords("tip_text", x + 6, y + 4)
+        x1, y1, x2, y2 = canvas.bbox("tip_text")
+        canvas.coords("tip_box", x1 - 6, y1 - 4, x2 + 6, y2 + 4)
+        canvas.itemconfigure("tip", state="normal")
+        canvas.tag_raise("tip_box")
+        canvas.tag_raise("tip_text")
+
+    def hide_tip(self):
+        self.canvas.itemconfigure("tip", state="hidden")
+
+    def on_click(self, event):
+        day = self.date_at(event.x, event.y)
+        if day is not None:
+            self.on_select(day)
+
+
+_fonts = {}
+
+
+def _font(size, weight="normal"):
+    """Shared Font objects, used to measure text before it is drawn"""
+    key = (size, weight)
+    if key not in _fonts:
+        family = tkfont.nametofont("TkDefaultFont").actual("family")
+        _fonts[key] = tkfont.Font(family=family, size=size, weight=weight)
+    return _fonts[key]
+
+
+def fit(text, font, width):
+    """text, shortened with an ellipsis to at most width pixels"""
+    if font.measure(text) <= width:
+        return text
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if font.measure(text[:middle] + "…") <= width:
+            low = middle
+        else:
+            high = middle - 1
+    return text[:low] + "…"
+
+
+def rounded_rectangle(canvas, x1, y1, x2, y2, radius, **kwargs):
+    """A rectangle with rounded corners, drawn as one smoothed polygon"""
+    points = (x1 + radius, y1, x2 - radius, y1, x2, y1, x2, y1 + radius, x2, y2 - radius, x2, y2,
+              x2 - radius, y2, x1 + radius, y2, x1, y2, x1, y2 - radius, x1, y1 + radius, x1, y1)
+    return canvas.create_polygon(points, smooth=True, **kwargs)
+
+
+class TaskRow:
+    """One task drawn on its own Canvas: one Tk widget instead of about fifteen
+
+    The checkbox and the subtask, timer, edit and delete buttons are regions
+    resolved by hit-testing the click. The only real widget is the title entry,
+    created while the title is renamed (double-click or Return) and destroyed
+    after. actions maps 'toggle', 'subtask', 'timer', 'edit', 'delete', 'select'
+    and 'extend' to callables taking the task id, and 'rename' to one taking
+    the id and the new title. The row also takes keyboard focus: Space toggles,
+    Return renames and Delete deletes.
+    """
+
+    HEIGHT = 96
+    CONTENT = 46  # left edge of the text, right of the checkbox
+    ACTIONS = 56  # width of the button column on the right
+    BADGES = 110  # width of the priority and category column
+
+    PRIORITY_COLORS = {"High": "red", "Medium": "orange", "Low": "green"}
+    PRIORITY_EMOJI = {"High": "🔥", "Medium": "⚡", "Low": "🟢"}
+    BUTTONS = (("timer", "⏱️", "green"), ("edit", "✏️", "blue"), ("delete", "🗑️", "red"))
+
+    def __init__(self, parent, task, actions, selected=False):
+        self.task = task
+        self.actions = actions
+        self.selected = selected
+        self.focused = False
+        self.hits = []
+        self.editor = None
+        self.colors = palette()
+
+        self.canvas = canvas = tk.Canvas(parent, height=self.HEIGHT, highlightthickness=0, takefocus=1)
+        canvas.bind("<Configure>", lambda e: self.draw())
+        canvas.bind("<Button-1>", self.on_click)
+        canvas.bind("<Double-Button-1>", self.on_double_click)
+        canvas.bind("<Control-Button-1>", lambda e: self.actions["select"](self.task.id))
+        canvas.bind("<Shift-Button-1>", lambda e: self.actions["extend"](self.task.id))
+        canvas.bind("<Motion>", self.on_motion)
+        canvas.bind("<FocusIn>", lambda e: self.set_focused(True))
+        canvas.bind("<FocusOut>", lambda e: self.set_focused(False))
+        canvas.bind("<space>", lambda e: self.actions["toggle"](self.task.id))
+        canvas.bind("<Return>", lambda e: self.start_rename())
+        canvas.bind("<Delete>", lambda e: self.actions["delete"](self.task.id))
+
+    def pack(self, **kwargs):
+        self.canvas.pack(**kwargs)
+
+    def outline(self):
+        if self.selected:
+            return SELECTED
+        return self.colors["text"] if self.focused else self.colors["row"]
+
+    def set_selected(self, selected):
+        """Restyle the border without redrawing the row"""
+        self.selected = selected
+        self.canvas.itemconfigure("frame", outline=self.outline())
+
+    def set_focused(self, focused):
+        self.focused = focused
+        self.canvas.itemconfigure("frame", outline=self.outline())
+
+    def button(self, action, x1, y1, x2, y2, text, fill, size=12):
+        """A filled rounded rectangle with a label, registered for hit-testing"""
+        rounded_rectangle(self.canvas, x1, y1, x2, y2, 6, fill=fill, outline=fill)
+        self.canvas.create_text((x1 + x2) / 2, (y1 + y2) / 2, text=text, fill="white", font=_font(size))
+        self.hits.append((x1, y1, x2, y2, action))
+
+    def draw(self):
+        """Draw every item of the row for the current width and theme"""
+        task, canvas = self.task, self.canvas
+        self.colors = colors = palette()
+        width = canvas.winfo_width()
+        canvas.delete("all")
+        canvas.configure(bg=colors["bg"])
+        self.hits = []
+        if width < 2 * self.CONTENT:
+            return
+
+        rounded_rectangle(canvas, 2, 2, width - 2, self.HEIGHT - 2, 12, fill=colors["row"],
+                          outline=self.outline(), width=2, tags="frame")
+
+        # Checkbox
+        fill = shade(ACCENT, colors["row"], 1)
+        rounded_rectangle(canvas, 14, 14, 36, 36, 5, fill=fill if task.completed else colors["row"],
+                          outline=fill if task.completed else colors["text"], width=2)
+        if task.completed:
+            canvas.create_text(25, 25, text="✓", fill="white", font=_font(12, "bold"))
+        self.hits.append((8, 8, 42, 42, "toggle"))
+
+        # Title, clipped before the badges
+        right = width - self.ACTIONS - self.BADGES
+        title = f"{'✓ ' if task.completed else ''}{task.title}"
+        if task.progress > 0 and not task.completed:
+            title += f" ({task.progress}%)"
+        title_font = _font(13, "bold")
+        canvas.create_text(self.CONTENT, 25, text=fit(title, title_font, right - self.CONTENT), anchor="w",
+                           fill=colors["strong"], font=title_font, tags="title")
+
+        # Priority and category badges
+        canvas.create_text(right + self.BADGES - 8, 16,
+                           text=f"{self.PRIORITY_EMOJI.get(task.priority, '')} {task.priority}", anchor="ne",
+                           fill=self.PRIORITY_COLORS.get(task.priority, "gray"), font=_font(10, "bold"))
+        category_font = _font(9)
+        canvas.create_text(right + self.BADGES - 8, 34, text=fit(f"📁 {task.category}", category_font, self.BADGES - 8),
+                           anchor="ne", fill=colors["text"], font=category_font)
+
+        # Description and tags
+        small = _font(10)
+        tags_width = min(small.measure(f"🏷️ {task.tags}"), (right - self.CONTENT) // 3) if task.tags else 0
+        if task.description:
+            canvas.create_text(self.CONTENT, 52,
+                               text=fit(f"📝 {task.description}", small, right - self.CONTENT - tags_width - 10),
+                               anchor="w", fill=colors["text"], font=small)
+        if task.tags:
+            canvas.create_text(right, 52, text=fit(f"🏷️ {task.tags}", small, tags_width), anchor="e",
+                               fill=SELECTED, font=small)
+
+        # Time information, progress and the subtask button
+        time_info = f"⏱️ Est: {task.estimated_time}m"
+        if task.actual_time > 0:
+            time_info += f" | Actual: {task.actual_time}m"
+        if task.rollup_time and task.rollup_time > task.actual_time:
+            time_info += f" | With subtasks: {task.rollup_time}m"
+        if task.due_at:
+            time_info += f" | ⏰ {str(task.due_at)[11:16]}"
+        subtask_left = right + self.BADGES - 88
+        progress_left = subtask_left - 110
+        canvas.create_text(self.CONTENT, 76, text=fit(time_info, small, progress_left - self.CONTENT - 10),
+                           anchor="w", fill=colors["text"], font=small)
+        if task.progress > 0 and not task.completed:
+            rounded_rectangle(canvas, progress_left, 70, progress_left + 100, 82, 6, fill=colors["empty"],
+                              outline=colors["empty"])
+            rounded_rectangle(canvas, progress_left, 70, progress_left + max(12, task.progress), 82, 6,
+                              fill=fill, outline=fill)
+        self.button("subtask", subtask_left, 66, subtask_left + 80, 86, "➕ Subtask", "gray40", size=10)
+
+        # Action column
+        left = width - self.ACTIONS
+        for index, (action, text, color) in enumerate(self.BUTTONS):
+            top = 10 + index * 28
+            self.button(action, left, top, left + 40, top + 24, text, color)
+
+    def hit(self, x, y):
+        """The action under a point of the canvas, or None"""
+        for x1, y1, x2, y2, action in self.hits:
+            if x1 <= x <= x2 and y1 <= y <= y2:
+                return action
+        return None
+
+    def on_click(self, event):
+        self.canvas.focus_set()
+        action = self.hit(event.x, event.y)
+        if action is not None:
+            self.actions[action](self.task.id)
+
+    def on_double_click(self, event):
+        bbox = self.canvas.bbox("title")
+        if bbox and bbox[0] <= event.x <= bbox[2] and bbox[1] <= event.y <= bbox[3]:
+            self.start_rename()
+
+    def on_motion(self, event):
+        cursor = "hand2" if self.hit(event.x, event.y) else ""
+        if self.canvas["cursor"] != cursor:
+            self.canvas.configure(cursor=cursor)
+
+    # Inline rename, the one real widget a row creates
+    def start_rename(self):
+        if self.editor is not None:
+            return
+        colors = self.colors
+        self.editor = editor = tk.Entry(self.canvas, font=_font(13, "bold"), relief="flat", bg=colors["row"],
+                                        fg=colors["strong"], insertbackground=colors["strong"])
+        editor.insert(0, self.task.title)
+        editor.select_range(0, "end")
+        editor.bind("<Return>", lambda e: self.finish_rename(True))
+        editor.bind("<Escape>", lambda e: self.finish_rename(False))
+        editor.bind("<FocusOut>", lambda e: self.finish_rename(False))
+        width = self.canvas.winfo_width() - self.ACTIONS - self.BADGES - self.CONTENT
+        self.canvas.itemconfigure("title", state="hidden")
+        self.canvas.create_window(self.CONTENT, 25, window=editor, anchor="w", width=max(width, 60),
+                                  tags="editor")
+        editor.focus_set()
+
+    def finish_rename(self, save):
+        editor, self.editor = self.editor, None
+        if editor is None:
+            return
+        title = editor.get().strip()
+        self.canvas.delete("editor")
+        editor.destroy()
+        self.canvas.itemconfigure("title", state="normal")
+        self.canvas.focus_set()
+        if save and title and title != self.task.title:
+            self.actions["rename"](self.task.id, title)
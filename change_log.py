@@ -0,0 +1,281 @@
+"""
+Change log and undo/redo for Daily Task Tracker Pro
+Connection-local TEMP triggers append every write to tasks, time_logs, the
+recurrence tables and the archive made inside a user action to change_log,
+with JSON before/after row images. Undo and redo replay those images as
+inverse or forward statements in one small transaction per action. Writes
+outside an action (recurrence expansion, archival, other processes) are not
+recorded. Older actions are compacted in idle time: repeated writes to one row
+collapse into a single entry.
+"""
+
+import json
+from contextlib import contextmanager
+
+
+# Tables whose rows are recorded, with the column that identifies a row
+LOGGED_TABLES = {
+    'tasks': 'id',
+    'time_logs': 'id',
+    'recurrence_rules': 'id',
+    'recurrence_occurrences': 'rowid',
+    'archive.tasks': 'id',
+    'archive.time_logs': 'id',
+}
+
+# Columns a trigger fills in once a row exists; updates are never replayed onto them
+GENERATED_COLUMNS = {'tasks': ('uuid',)}
+
+
+class ChangeLog:
+    """Append-only mutation log with grouped undo/redo"""
+
+    def __init__(self, conn, max_actions=10000):
+        self.conn = conn
+        self.cursor = conn.cursor()
+        self.max_actions = max_actions
+        self.init_schema()
+
+    def init_schema(self):
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS change_groups (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                label TEXT,
+                state TEXT DEFAULT 'done',
+                compacted INTEGER DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS change_log (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                group_id INTEGER NOT NULL,
+                table_name TEXT NOT NULL,
+                row_id INTEGER NOT NULL,
+                op TEXT NOT NULL,
+                before TEXT,
+                after TEXT
+            )
+        ''')
+        self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_change_log_group ON change_log (group_id, seq)')
+        self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_change_groups_state ON change_groups (state, id)')
+
+        # The current action lives in TEMP so other connections never log into it
+        self.cursor.execute('CREATE TEMP TABLE IF NOT EXISTS change_context (group_id INTEGER)')
+        self.cursor.execute('DELETE FROM temp.change_context')
+        self.cursor.execute('INSERT INTO temp.change_context VALUES (NULL)')
+
+        for table, key in LOGGED_TABLES.items():
+            self._create_triggers(table, key)
+        self.conn.commit()
+
+    def _create_triggers(self, table, key):
+        """TEMP triggers over the table's current columns; absent tables are skipped"""
+        schema, _, name = table.rpartition('.')
+        self.cursor.execute('PRAGMA database_list')
+        if (schema or 'main') not in [row[1] for row in self.cursor.fetchall()]:
+            return
+        self.cursor.execute(f'PRAGMA {schema or "main"}.table_info({name})')
+        columns = [row[1] for row in self.cursor.fetchall()]
+        if not columns:
+            return
+        if key == 'rowid':
+            columns.insert(0, 'rowid')
+        image = {row: 'json_object(' + ', '.join(f"'{c}', {row}.{c}" for c in columns) + ')'
+                 for row in ('OLD', 'NEW')}
+        group = '(SELECT group_id FROM temp.change_context)'
+
+        statements = {
+            'insert': ('INSERT', 'NEW', 'NULL', image['NEW'], ''),
+            'update': ('UPDATE', 'NEW', image['OLD'], image['NEW'], f"AND {image['OLD']} IS NOT {image['NEW']}"),
+            'delete': ('DELETE', 'OLD', image['OLD'], 'NULL', ''),
+        }
+        for op, (event, row, before, after, condition) in statements.items():
+            trigger = f"trg_change_log_{table.replace('.', '_')}_{op}"
+            self.cursor.execute(f'DROP TRIGGER IF EXISTS temp.{trigger}')
+            self.cursor.execute(f'''
+                CREATE TEMP TRIGGER {trigger} AFTER {event} ON {schema or 'main'}.{name}
+                WHEN {group} IS NOT NULL {condition}
+                BEGIN
+                    INSERT INTO change_log (group_id, table_name, row_id, op, before, after)
+                    VALUES ({group}, '{table}', {row}.{key}, '{op}', {before}, {after});
+                END
+            ''')
+
+    @contextmanager
+    def action(self, label):
+        """Record writes made inside the block as one undoable action
+
+        Starting an action discards the redo stack. Blocks nested inside an
+        open action join it. The caller commits.
+        """
+        self.cursor.execute('SELECT group_id FROM temp.change_context')
+        current = self.cursor.fetchone()[0]
+        if current is not None:
+            yield current
+            return
+
+        self._discard_redo()
+        self.cursor.execute('INSERT INTO change_groups (label) VALUES (?)', (label,))
+        group_id = self.cursor.lastrowid
+        self.cursor.execute('UPDATE temp.change_context SET group_id = ?', (group_id,))
+        try:
+            yield group_id
+        finally:
+            self.cursor.execute('UPDATE temp.change_context SET group_id = NULL')
+            self.cursor.execute('''
+                DELETE FROM change_groups
+                WHERE id = ? AND NOT EXISTS (SELECT 1 FROM change_log WHERE group_id = ?)
+            ''', (group_id, group_id))
+
+    def _discard_redo(self):
+        self.cursor.execute('''
+            DELETE FROM change_log WHERE group_id IN (SELECT id FROM change_groups WHERE state = 'undone')
+        ''')
+        self.cursor.execute("DELETE FROM change_groups WHERE state = 'undone'")
+
+    def _latest(self, state, newest):
+        self.cursor.execute(f'''
+            SELECT id, label FROM change_groups WHERE state = ?
+            ORDER BY id {'DESC' if newest else 'ASC'} LIMIT 1
+        ''', (state,))
+        return self.cursor.fetchone()
+
+    def can_undo(self):
+        return self._latest('done', newest=True) is not None
+
+    def can_redo(self):
+        return self._latest('undone', newest=False) is not None
+
+    def undo(self):
+        """Revert the latest action in one transaction; returns (label, affected) or None"""
+        group = self._latest('done', newest=True)
+        if group is None:
+            return None
+        return group[1], self._apply(group[0], reverse=True)
+
+    def redo(self):
+        """Reapply the earliest undone action; returns (label, affected) or None"""
+        group = self._latest('undone', newest=False)
+        if group is None:
+            return None
+        return group[1], self._apply(group[0], reverse=False)
+
+    def _apply(self, group_id, reverse):
+        """Replay a group and flip its state, all or nothing"""
+        self.cursor.execute('SAVEPOINT change_log_replay')
+        try:
+            affected = self._replay(group_id, reverse)
+            self.cursor.execute('UPDATE change_groups SET state = ? WHERE id = ?',
+                                ('undone' if reverse else 'done', group_id))
+        except Exception:
+            self.cursor.execute('ROLLBACK TO change_log_replay')
+            self.cursor.execute('RELEASE change_log_replay')
+            raise
+        self.cursor.execute('RELEASE change_log_replay')
+        self.conn.commit()
+        return affected
+
+    def _replay(self, group_id, reverse):
+        """Apply a group's images; returns the task ids, dates and tables touched"""
+        self.cursor.execute(f'''
+            SELECT table_name, row_id, op, before, after FROM change_log
+            WHERE group_id = ? ORDER BY seq {'DESC' if reverse else 'ASC'}
+        ''', (group_id,))
+        entries = self.cursor.fetchall()
+
+        affected = {'task_ids': set(), 'dates': set(), 'tables': set()}
+        for table, row_id, op, before, after in entries:
+            before = json.loads(before) if before else None
+            after = json.loads(after) if after else None
+            if reverse:
+                op = {'insert': 'delete', 'delete': 'insert'}.get(op, op)
+                before, after = after, before
+            key = LOGGED_TABLES[table]
+
+            affected['tables'].add(table)
+            if op == 'delete':
+                self.cursor.execute(f'DELETE FROM {table} WHERE {key} = ?', (row_id,))
+            elif op == 'insert':
+                columns = list(after)
+                self.cursor.execute(f'''
+                    INSERT OR REPLACE INTO {table} ({', '.join(columns)})
+                    VALUES ({', '.join('?' for _ in columns)})
+                ''', [after[c] for c in columns])
+            else:
+                generated = GENERATED_COLUMNS.get(table, ())
+                columns = [c for c in after if c != key and c not in generated]
+                self.cursor.execute(f'''
+                    UPDATE {table} SET {', '.join(f'{c} = ?' for c in columns)} WHERE {key} = ?
+                ''', [after[c] for c in columns] + [row_id])
+
+            if table in ('tasks', 'archive.tasks'):
+                affected['task_ids'].add(row_id)
+                for image in (before, after):
+                    if image and image.get('date_created'):
+                        affected['dates'].add(image['date_created'])
+            elif table in ('time_logs', 'archive.time_logs'):
+                task_id = (after or before).get('task_id')
+                if task_id is not None:
+                    affected['task_ids'].add(task_id)
+        return affected
+
+    def compact(self, batch_size=50):
+        """Coalesce entries of up to batch_size settled actions; the caller commits
+
+        Within an action only the first before image and the last after image
+        of each row matter, so repeated writes collapse into one entry and rows
+        created then deleted disappear. A merged insert keeps the row's first
+        seq and any other merged entry its last, so replay still creates a row
+        before, and changes or deletes it after, the entries around it. Actions beyond max_actions are dropped,
+        oldest first. Returns the number of actions processed.
+        """
+        self.cursor.execute('''
+            SELECT id FROM change_groups
+            WHERE compacted = 0 AND id < (SELECT MAX(id) FROM change_groups)
+            ORDER BY id LIMIT ?
+        ''', (batch_size,))
+        group_ids = [row[0] for row in self.cursor.fetchall()]
+
+        for group_id in group_ids:
+            self.cursor.execute('''
+                SELECT seq, table_name, row_id, op, before, after FROM change_log
+                WHERE group_id = ? ORDER BY seq
+            ''', (group_id,))
+            merged = {}
+            for seq, table, row_id, op, before, after in self.cursor.fetchall():
+                first = merged.get((table, row_id))
+                if first is None:
+                    merged[(table, row_id)] = [seq, seq, before, after, 1]
+                else:
+                    first[1] = seq
+                    first[3] = after
+                    first[4] += 1
+
+            for (table, row_id), (first_seq, last_seq, before, after, count) in merged.items():
+                if count == 1:
+                    continue
+                self.cursor.execute('''
+                    DELETE FROM change_log WHERE group_id = ? AND table_name = ? AND row_id = ?
+                ''', (group_id, table, row_id))
+                if before is None and after is None:
+                    continue  # Created and deleted within the action
+                op = 'insert' if before is None else 'delete' if after is None else 'update'
+                if op == 'update' and json.loads(before) == json.loads(after):
+                    continue
+                seq = first_seq if op == 'insert' else last_seq
+                self.cursor.execute('''
+                    INSERT INTO change_log (seq, group_id, table_name, row_id, op, before, after)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', (seq, group_id, table, row_id, op, before, after))
+
+            self.cursor.execute('UPDATE change_groups SET compacted = 1 WHERE id = ?', (group_id,))
+
+        self.cursor.execute('''
+            SELECT id FROM change_groups ORDER BY id DESC LIMIT 1 OFFSET ?
+        ''', (self.max_actions,))
+        row = self.cursor.fetchone()
+        if row:
+            self.cursor.execute('DELETE FROM change_log WHERE group_id <= ?', (row[0],))
+            self.cursor.execute('DELETE FROM change_groups WHERE id <= ?', (row[0],))
+        return len(group_ids)
@@ -0,0 +1,123 @@
+"""
+External change detection for Daily Task Tracker Pro
+Triggers append every task write to task_changes, whoever makes it (this
+window, another instance, a script). The watcher polls PRAGMA data_version,
+which only moves when another connection commits, and reads the new change
+rows only then, so idle polls cost one pragma and the UI can refresh just the
+dates and tasks that were touched.
+"""
+
+from collections import namedtuple
+
+
+# dates/task_ids changed since the last poll; full when changes were pruned unseen
+ChangeSet = namedtuple('ChangeSet', 'dates task_ids full')
+
+
+class ChangeWatcher:
+    """Polls for commits made by other connections to the task database"""
+
+    def __init__(self, conn, retention_hours=24):
+        self.conn = conn
+        self.cursor = conn.cursor()
+        self.retention_hours = retention_hours
+        self.init_schema()
+
+        self.data_version = self._data_version()
+        self.last_seq = self._max_seq()
+
+    def init_schema(self):
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS task_changes (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                task_id INTEGER NOT NULL,
+                date_created DATE,
+                previous_date DATE,
+                changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        self.cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_task_changes_insert AFTER INSERT ON tasks
+            BEGIN
+                INSERT INTO task_changes (task_id, date_created) VALUES (NEW.id, NEW.date_created);
+            END
+        ''')
+        self.cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_task_changes_update AFTER UPDATE ON tasks
+            BEGIN
+                INSERT INTO task_changes (task_id, date_created, previous_date)
+                VALUES (NEW.id, NEW.date_created,
+                        CASE WHEN OLD.date_created IS NOT NEW.date_created THEN OLD.date_created END);
+            END
+        ''')
+        self.cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_task_changes_delete AFTER DELETE ON tasks
+            BEGIN
+                INSERT INTO task_changes (task_id, date_created) VALUES (OLD.id, OLD.date_created);
+            END
+        ''')
+        self.cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_task_changes_time_log AFTER INSERT ON time_logs
+            BEGIN
+                INSERT INTO task_changes (task_id, date_created)
+                SELECT id, date_created FROM tasks WHERE id = NEW.task_id;
+            END
+        ''')
+        self.conn.commit()
+
+    def _data_version(self):
+        self.cursor.execute('PRAGMA data_version')
+        return self.cursor.fetchone()[0]
+
+    def _max_seq(self):
+        self.cursor.execute('SELECT COALESCE(MAX(seq), 0) FROM task_changes')
+        return self.cursor.fetchone()[0]
+
+    def poll(self):
+        """ChangeSet of rows committed since the last poll, or None if nothing changed
+
+        Our own writes are not reported by data_version, but they do land in
+        task_changes; they are returned alongside the external ones, which is
+        harmless since they are already reflected in the UI.
+        """
+        version = self._data_version()
+        if version == self.data_version:
+            return None
+        self.data_version = version
+
+        self.cursor.execute('''
+            SELECT seq, task_id, date_created, previous_date FROM task_changes
+            WHERE seq > ? ORDER BY seq
+        ''', (self.last_seq,))
+        rows = self.cursor.fetchall()
+        if not rows:
+            return None
+
+        # A gap means rows were pruned (or rolled back) before we saw them
+        full = rows[0][0] != self.last_seq + 1
+        self.last_seq = rows[-1][0]
+
+        dates, task_ids = set(), set()
+        for _, task_id, date_created, previous_date in rows:
+            task_ids.add(task_id)
+            for day in (date_created, previous_date):
+                if day is not None:
+                    dates.add(str(day))
+        return ChangeSet(dates, task_ids, full)
+
+    def prune(self):
+        """Drop change rows past the retention window; the caller commits
+
+        Rows this connection wrote never move data_version, so with no other
+        commit since the last poll everything up to the newest row has been
+        seen and last_seq catches up before pruning.
+        """
+        newest = self._max_seq()
+        if self._data_version() == self.data_version:
+            self.last_seq = newest
+
+        self.cursor.execute('''
+            DELETE FROM task_changes
+            WHERE changed_at < datetime('now', ?) AND seq <= ?
+        ''', (f'-{self.retention_hours} hours', self.last_seq))
+        return self.cursor.rowcount
@@ -0,0 +1,124 @@
+"""
+Daily rollup for Daily Task Tracker Pro
+productivity_stats holds one row per date with counters kept current by
+triggers on tasks and time_logs, so every writer maintains it and long-range
+views read a few hundred rows instead of scanning the task history:
+
+    tasks_created      tasks dated that day
+    planned_done       tasks dated that day that are completed
+    tasks_completed    tasks completed on that day (date_completed)
+    total_time_worked  seconds of focus logged, by the session's end date
+
+Rows moved to the archive keep counting. The older efficiency_score and
+focus_score columns are left as they were.
+"""
+
+COUNTERS = ('tasks_created', 'planned_done', 'tasks_completed', 'total_time_worked')
+
+
+def _bump_sql(day, deltas, when='1'):
+    """Upsert adding deltas {counter: expr} to the row of day"""
+    values = ', '.join(deltas.get(column, '0') for column in COUNTERS)
+    updates = ', '.join(f'{column} = COALESCE({column}, 0) + excluded.{column}'
+                        for column in COUNTERS if column in deltas)
+    return f'''
+        INSERT INTO productivity_stats (date, {', '.join(COUNTERS)})
+        SELECT {day}, {values} WHERE {day} IS NOT NULL AND ({when})
+        ON CONFLICT (date) DO UPDATE SET {updates};
+    '''
+
+
+def _task_sql(row, sign):
+    return (_bump_sql(f'{row}.date_created', {'tasks_created': f'{sign}1',
+                                               'planned_done': f'{sign}({row}.completed = 1)'})
+            + _bump_sql(f'date({row}.date_completed)', {'tasks_completed': f'{sign}1'},
+                        f'{row}.completed = 1'))
+
+
+def _log_sql(row, sign):
+    return _bump_sql(f'date({row}.end_time)', {'total_time_worked': f'{sign}{row}.duration'},
+                     f'{row}.duration > 0')
+
+
+def init_schema(cursor, task_source='tasks', log_source='time_logs'):
+    """Add the counters, the unique date index and the triggers; backfill on first run
+
+    The sources are where the backfill reads, so archived rows can be included.
+    """
+    cursor.execute('PRAGMA table_info(productivity_stats)')
+    columns = [row[1] for row in cursor.fetchall()]
+    for column in COUNTERS:
+        if column not in columns:
+            cursor.execute(f'ALTER TABLE productivity_stats ADD COLUMN {column} INTEGER DEFAULT 0')
+
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_productivity_stats_date'")
+    needs_backfill = cursor.fetchone() is None
+    if needs_backfill:
+        cursor.execute('DELETE FROM productivity_stats')
+    cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_productivity_stats_date ON productivity_stats (date)')
+
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_task_insert AFTER INSERT ON tasks
+        BEGIN
+            {_task_sql('NEW', '')}
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_task_update
+        AFTER UPDATE OF date_created, completed, date_completed ON tasks
+        WHEN OLD.date_created IS NOT NEW.date_created OR OLD.completed IS NOT NEW.completed
+          OR OLD.date_completed IS NOT NEW.date_completed
+        BEGIN
+            {_task_sql('OLD', '-')}
+            {_task_sql('NEW', '')}
+        END
+    ''')
+    # Tasks moved to the archive are flagged first and keep their counts
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_task_delete AFTER DELETE ON tasks
+        WHEN OLD.archived = 0
+        BEGIN
+            {_task_sql('OLD', '-')}
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_log_insert AFTER INSERT ON time_logs
+        BEGIN
+            {_log_sql('NEW', '')}
+        END
+    ''')
+    # So do their time logs, which the archiver deletes after flagging the task
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_log_delete AFTER DELETE ON time_logs
+        WHEN NOT EXISTS (SELECT 1 FROM tasks WHERE id = OLD.task_id AND archived = 1)
+        BEGIN
+            {_log_sql('OLD', '-')}
+        END
+    ''')
+
+    if needs_backfill:
+        cursor.execute(f'''
+            INSERT INTO productivity_stats (date, {', '.join(COUNTERS)})
+            SELECT day, SUM(created), SUM(planned), SUM(completed), SUM(worked) FROM (
+                SELECT date_created AS day, COUNT(*) AS created, SUM(completed = 1) AS planned,
+                       0 AS completed, 0 AS worked
+                FROM {task_source} GROUP BY date_created
+                UNION ALL
+                SELECT date(date_completed), 0, 0, COUNT(*), 0
+                FROM {task_source} WHERE completed = 1 GROUP BY date(date_completed)
+                UNION ALL
+                SELECT date(end_time), 0, 0, 0, SUM(duration)
+                FROM {log_source} WHERE duration > 0 GROUP BY date(end_time)
+            )
+            WHERE day IS NOT NULL
+            GROUP BY day
+        ''')
+
+
+def fetch_days(cursor, start, end):
+    """{date string: (tasks_created, planned_done, tasks_completed, total_time_worked)} for a range"""
+    cursor.execute(f'''
+        SELECT date, {', '.join(COUNTERS)} FROM productivity_stats
+        WHERE date BETWEEN ? AND ?
+    ''', (str(start), str(end)))
+    return {row[0]: row[1:] for row in cursor.fetchall()}
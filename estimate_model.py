@@ -0,0 +1,236 @@
+"""
+Estimate model for Daily Task Tracker Pro
+Learns how long tasks really take compared with their estimate, from completed
+tasks with both an estimate and logged time. The model is a ridge regression
+of log(actual / estimated) on the task's category, priority and tags, so a
+category that usually runs 40% over scales its estimates by 1.4, and a tag
+seen on only a few tasks is pulled towards no correction.
+
+The normal equations are kept between fits: a refit reads the training rows,
+adds the tasks that are new or changed since the last fit and takes back the
+ones that changed or disappeared, then solves a system the size of the
+feature count. Fits run on a worker thread with their own read-only
+connection; predictions read the last solved weights and are memoized per
+(category, priority, tags). NumPy builds and solves the system when it is
+installed, plain Python otherwise.
+"""
+
+import math
+import os
+import sqlite3
+import threading
+
+from tag_index import parse_tags
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+INTERCEPT = '*'
+
+# Below this many completed tasks estimates are returned unchanged
+MIN_SAMPLES = 5
+
+# Prior strength, in tasks: a feature needs about this many tasks to move halfway
+RIDGE = 3.0
+
+# Actual/estimated ratios are clipped to this factor either way
+MAX_RATIO = 8.0
+
+TRAINING_SQL = '''
+    SELECT id, estimated_time, actual_time, category, priority, tags FROM {table}
+    WHERE completed = 1 AND estimated_time > 0 AND actual_time > 0
+'''
+
+
+def features(category, priority, tags):
+    """[(feature, value)] for one task; a task's tags share a weight of one"""
+    tags = parse_tags(tags)
+    return ([(INTERCEPT, 1.0), (f'category:{category}', 1.0), (f'priority:{priority}', 1.0)]
+            + [(f'tag:{tag}', 1.0 / len(tags)) for tag in tags])
+
+
+def _solve(matrix, vector):
+    """Solve matrix @ x = vector by Gaussian elimination with partial pivoting"""
+    size = len(vector)
+    rows = [list(row) + [value] for row, value in zip(matrix, vector)]
+    for column in range(size):
+        pivot = max(range(column, size), key=lambda r: abs(rows[r][column]))
+        rows[column], rows[pivot] = rows[pivot], rows[column]
+        lead = rows[column][column]
+        for r in range(column + 1, size):
+            factor = rows[r][column] / lead
+            if factor:
+                row, source = rows[r], rows[column]
+                for c in range(column, size + 1):
+                    row[c] -= factor * source[c]
+    solution = [0.0] * size
+    for r in range(size - 1, -1, -1):
+        total = rows[r][size] - sum(rows[r][c] * solution[c] for c in range(r + 1, size))
+        solution[r] = total / rows[r][r]
+    return solution
+
+
+class EstimateModel:
+    """Predicts actual minutes from an estimate; refits incrementally off the UI thread"""
+
+    def __init__(self, db_path, archive_path=None, ridge=RIDGE):
+        self.db_path = db_path
+        self.archive_path = archive_path
+        self.ridge = ridge
+        self.index = {}      # feature -> column of the normal equations
+        self.gram = None     # X^T X
+        self.moment = None   # X^T y
+        self.rows = {}       # task id -> training values at the last fit
+        self.samples = 0
+        # (feature -> coefficient, memoized ratios), replaced whole after each fit
+        self.model = ({}, {})
+        self.fitting = False
+
+    # Fitting
+    def connect(self):
+        conn = sqlite3.connect(f'file:{self.db_path}?mode=ro', uri=True, timeout=30)
+        if self.archive_path and os.path.exists(self.archive_path):
+            conn.execute('ATTACH DATABASE ? AS archive', (f'file:{self.archive_path}?mode=ro',))
+        return conn
+
+    def training_rows(self, conn):
+        """{task id: (estimated, actual, category, priority, tags)} for completed, timed tasks"""
+        tables = ['main.tasks']
+        if conn.execute("SELECT 1 FROM pragma_database_list WHERE name = 'archive'").fetchone():
+            tables.append('archive.tasks')
+        sql = ' UNION ALL '.join(TRAINING_SQL.format(table=table) for table in tables)
+        return {row[0]: row[1:] for row in conn.execute(sql)}
+
+    def _column(self, feature):
+        """Column of a feature, growing the normal equations for a new one"""
+        column = self.index.get(feature)
+        if column is None:
+            column = self.index[feature] = len(self.index)
+            if np is not None:
+                self.gram = np.pad(self.gram, ((0, 1), (0, 1))) if self.gram is not None else np.zeros((1, 1))
+                self.moment = np.append(self.moment, 0.0) if self.moment is not None else np.zeros(1)
+            else:
+                self.gram = self.gram or []
+                for row in self.gram:
+                    row.append(0.0)
+                self.gram.append([0.0] * (column + 1))
+                self.moment = (self.moment or []) + [0.0]
+        return column
+
+    def _accumulate(self, changes):
+        """Add (sign, values) rows to the normal equations"""
+        encoded = []
+        for sign, (estimated, actual, category, priority, tags) in changes:
+            ratio = min(max(actual / estimated, 1 / MAX_RATIO), MAX_RATIO)
+            encoded.append((sign, math.log(ratio),
+                            [(self._column(name), value) for name, value in features(category, priority, tags)]))
+
+        if np is not None:
+            design = np.zeros((len(encoded), len(self.index)))
+            rows, columns, values = [], [], []
+            for row, (_, _, cells) in enumerate(encoded):
+                for column, value in cells:
+                    rows.append(row)
+                    columns.append(column)
+                    values.append(value)
+            design[rows, columns] = values
+            signs = np.array([sign for sign, _, _ in encoded], dtype=float)
+            targets = np.array([target for _, target, _ in encoded])
+            self.gram += design.T @ (design * signs[:, None])
+            self.moment += design.T @ (targets * signs)
+        else:
+            for sign, target, cells in encoded:
+                for i, a in cells:
+                    self.moment[i] += sign * a * target
+                    row = self.gram[i]
+                    for j, b in cells:
+                        row[j] += sign * a * b
+
+    def _solve(self):
+        """Feature weights from the current normal equations"""
+        size = len(self.index)
+        # The intercept is not shrunk; every other feature is pulled towards zero
+        penalty = [0.0 if column == 0 else self.ridge for column in range(size)]
+        if np is not None:
+            solution = np.linalg.solve(self.gram + np.diag(penalty), self.moment).tolist()
+        else:
+            matrix = [[value + (penalty[i] if i == j else 0.0) for j, value in enumerate(row)]
+                      for i, row in enumerate(self.gram)]
+            solution = _solve(matrix, self.moment)
+        return {feature: solution[column] for feature, column in self.index.items()}
+
+    def fit(self, conn=None):
+        """Fold the tasks that changed since the last fit in; returns True if the weights changed"""
+        own = conn is None
+        conn = conn or self.connect()
+        try:
+            current = self.training_rows(conn)
+        finally:
+            if own:
+                conn.close()
+
+        changes = [(-1.0, values) for task_id, values in self.rows.items() if current.get(task_id) != values]
+        changes += [(1.0, values) for task_id, values in current.items() if self.rows.get(task_id) != values]
+        if not changes:
+            return False
+
+        self._column(INTERCEPT)
+        self._accumulate(changes)
+        self.rows = current
+        self.samples = len(current)
+        self.model = (self._solve() if self.samples >= MIN_SAMPLES else {}, {})
+        return True
+
+    def refit_async(self):
+        """Refit on a worker thread; returns False if a fit is already running"""
+        if self.fitting:
+            return False
+        self.fitting = True
+
+        def worker():
+            try:
+                self.fit()
+            except (sqlite3.Error, ArithmeticError, ValueError):
+                pass  # Keep the previous weights; the next refit starts over from them
+            finally:
+                self.fitting = False
+
+        threading.Thread(target=worker, name='estimate-fit', daemon=True).start()
+        return True
+
+    # Predictions
+    @property
+    def ready(self):
+        return bool(self.model[0])
+
+    def ratio(self, category, priority, tags):
+        """Expected actual/estimated factor for a task"""
+        weights, ratios = self.model
+        if not weights:
+            return 1.0
+        key = (category, priority, tuple(parse_tags(tags)))
+        ratio = ratios.get(key)
+        if ratio is None:
+            log_ratio = sum(weights.get(name, 0.0) * value for name, value in features(category, priority, tags))
+            ratio = ratios[key] = math.exp(log_ratio)
+        return ratio
+
+    def predict(self, estimated, category, priority, tags):
+        """Realistic minutes for an estimate"""
+        if not estimated:
+            return estimated
+        return max(1, round(estimated * self.ratio(category, priority, tags)))
+
+    def forecast(self, rows):
+        """(planned, expected) minutes left for open tasks
+
+        rows are (estimated_time, actual_time, category, priority, tags).
+        """
+        planned = expected = 0
+        for estimated, actual, category, priority, tags in rows:
+            planned += max((estimated or 0) - (actual or 0), 0)
+            expected += max(self.predict(estimated or 0, category, priority, tags) - (actual or 0), 0)
+        return planned, expected
@@ -0,0 +1,219 @@
+"""
+Focus analytics for Daily Task Tracker Pro
+Every time log is split into the clock hours it covers and added to
+focus_hours, one row per (hour, task), by triggers on time_logs, so the GUI,
+the API, recovered sessions and undo all keep it current. A session is placed
+to end at its end_time and to last its logged duration. Heatmap, category and
+task breakdowns aggregate those buckets with one GROUP BY each, so their cost
+follows the hours with focus time rather than the number of sessions. Rows
+moved to the archive keep their buckets.
+"""
+
+import calendar
+from datetime import timedelta
+
+
+# Only the first this many hours of a longer session are bucketed
+MAX_SESSION_HOURS = 168
+
+# Session-length histogram bins as (upper bound in minutes, label); None is open
+SESSION_BINS = ((5, "<5m"), (15, "5-15m"), (25, "15-25m"), (45, "25-45m"),
+                (60, "45-60m"), (90, "60-90m"), (None, "90m+"))
+
+WEEKDAY_NAMES = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+
+# Hour 0 fell on a Thursday; this turns an hour number into a Monday-first weekday
+WEEKDAY_SQL = '(hour / 24 + 3) % 7'
+
+
+def hour_number(day):
+    """Number of the first hour of a date, as stored in focus_hours.hour"""
+    return calendar.timegm(day.timetuple()) // 3600
+
+
+def _pieces_sql(row, sign=''):
+    """Rows (hour, task_id, seconds) for one time log, split at clock hours
+
+    Hours are numbered from 1970-01-01 00:00 in naive local time: strftime('%s')
+    reads the local timestamp as if it were UTC, and hour_number() matches it.
+    """
+    span = f'''
+        SELECT CAST(strftime('%s', {row}.end_time) AS INTEGER) - {row}.duration AS s,
+               CAST(strftime('%s', {row}.end_time) AS INTEGER) AS e
+    '''
+    return f'''
+        SELECT b / 3600, {row}.task_id, {sign}(MIN(e, b + 3600) - MAX(s, b))
+        FROM (SELECT (span.s / 3600 + o.n) * 3600 AS b, span.s, span.e
+              FROM ({span}) span JOIN focus_hour_offsets o
+              ON o.n <= (span.e - span.s) / 3600 + 1)
+        WHERE b < e AND b + 3600 > s
+    '''
+
+
+def _upsert_sql(row, sign=''):
+    return f'''
+        INSERT INTO focus_hours (hour, task_id, seconds)
+        {_pieces_sql(row, sign)}
+        ON CONFLICT (hour, task_id) DO UPDATE SET seconds = seconds + excluded.seconds;
+    '''
+
+
+_VALID_LOG = "{row}.task_id IS NOT NULL AND {row}.end_time IS NOT NULL AND {row}.duration > 0"
+
+
+def init_schema(cursor, log_source='time_logs'):
+    """Create the hourly buckets and their triggers; backfill them on first creation
+
+    log_source is where the backfill reads, so archived logs can be included.
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'focus_hours'")
+    needs_backfill = cursor.fetchone() is None
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS focus_hours (
+            hour INTEGER NOT NULL,
+            task_id INTEGER NOT NULL,
+            seconds INTEGER NOT NULL,
+            PRIMARY KEY (hour, task_id)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_focus_hours_task ON focus_hours (task_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_time_logs_end ON time_logs (end_time, duration)')
+
+    cursor.execute('CREATE TABLE IF NOT EXISTS focus_hour_offsets (n INTEGER PRIMARY KEY)')
+    cursor.executemany('INSERT OR IGNORE INTO focus_hour_offsets (n) VALUES (?)',
+                       [(n,) for n in range(MAX_SESSION_HOURS + 1)])
+
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_focus_hours_insert AFTER INSERT ON time_logs
+        WHEN {_VALID_LOG.format(row='NEW')}
+        BEGIN
+            {_upsert_sql('NEW')}
+        END
+    ''')
+    # Logs leaving with their task for the archive are moves, not deletions
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_focus_hours_delete AFTER DELETE ON time_logs
+        WHEN {_VALID_LOG.format(row='OLD')}
+          AND NOT EXISTS (SELECT 1 FROM tasks WHERE id = OLD.task_id AND archived = 1)
+        BEGIN
+            {_upsert_sql('OLD', sign='-')}
+            DELETE FROM focus_hours WHERE task_id = OLD.task_id AND seconds <= 0;
+        END
+    ''')
+
+    if needs_backfill:
+        cursor.execute(f'''
+            INSERT INTO focus_hours (hour, task_id, seconds)
+            SELECT pieces.hour, pieces.task_id, SUM(pieces.seconds) FROM (
+                SELECT b / 3600 AS hour, task_id, MIN(e, b + 3600) - MAX(s, b) AS seconds
+                FROM (SELECT (span.s / 3600 + o.n) * 3600 AS b, span.s, span.e, span.task_id
+                      FROM (SELECT task_id,
+                                   CAST(strftime('%s', end_time) AS INTEGER) - duration AS s,
+                                   CAST(strftime('%s', end_time) AS INTEGER) AS e
+                            FROM {log_source} l WHERE {_VALID_LOG.format(row='l')}) span
+                      JOIN focus_hour_offsets o ON o.n <= (span.e - span.s) / 3600 + 1)
+                WHERE b < e AND b + 3600 > s
+            ) pieces
+            GROUP BY pieces.hour, pieces.task_id
+        ''')
+
+
+def peak_hours(grid, limit=3):
+    """[(weekday name, hour, minutes)] for the busiest cells of a heatmap grid"""
+    cells = [(minutes, weekday, hour) for weekday, row in enumerate(grid)
+             for hour, minutes in enumerate(row) if minutes]
+    cells.sort(reverse=True)
+    return [(WEEKDAY_NAMES[weekday], hour, minutes) for minutes, weekday, hour in cells[:limit]]
+
+
+class FocusAnalytics:
+    """Read-side queries over focus_hours and time_logs for a date range"""
+
+    def __init__(self, conn, task_source='tasks', log_source='time_logs'):
+        self.conn = conn
+        self.cursor = conn.cursor()
+        self.task_source = task_source
+        self.log_source = log_source
+
+    @staticmethod
+    def _hours(start, end):
+        """Inclusive dates to half-open hour number bounds"""
+        return hour_number(start), hour_number(end + timedelta(days=1))
+
+    @staticmethod
+    def _bounds(start, end):
+        """Inclusive dates to half-open timestamp bounds"""
+        return str(start), str(end + timedelta(days=1))
+
+    def heatmap(self, start, end):
+        """7x24 list of focus minutes by weekday (Monday first) and hour of day"""
+        self.cursor.execute(f'''
+            SELECT {WEEKDAY_SQL}, hour % 24, SUM(seconds)
+            FROM focus_hours WHERE hour >= ? AND hour < ?
+            GROUP BY 1, 2
+        ''', self._hours(start, end))
+        grid = [[0] * 24 for _ in range(7)]
+        for weekday, hour, seconds in self.cursor.fetchall():
+            grid[weekday][hour] = seconds // 60
+        return grid
+
+    def by_category(self, start, end):
+        """[(category, minutes)] with the most focused category first"""
+        self.cursor.execute(f'''
+            SELECT COALESCE(t.category, 'General'), SUM(f.seconds) / 60
+            FROM focus_hours f JOIN {self.task_source} t ON t.id = f.task_id
+            WHERE f.hour >= ? AND f.hour < ?
+            GROUP BY 1 ORDER BY 2 DESC
+        ''', self._hours(start, end))
+        return self.cursor.fetchall()
+
+    def top_tasks(self, start, end, limit=5):
+        """[(task_id, title, minutes)] for the tasks with the most focus time"""
+        self.cursor.execute(f'''
+            SELECT f.task_id, t.title, f.minutes
+            FROM (SELECT task_id, SUM(seconds) / 60 AS minutes FROM focus_hours
+                  WHERE hour >= ? AND hour < ? GROUP BY task_id
+                  ORDER BY minutes DESC LIMIT ?) f
+            JOIN {self.task_source} t ON t.id = f.task_id
+            ORDER BY f.minutes DESC
+        ''', self._hours(start, end) + (limit,))
+        return self.cursor.fetchall()
+
+    def session_stats(self, start, end):
+        """Session count, total and median minutes and the length histogram
+
+        Returns {'count', 'total_minutes', 'median_minutes', 'bins': [(label, count)]}.
+        """
+        minutes = 'duration / 60.0'
+        cases = ' '.join(f'WHEN {minutes} < {bound} THEN {index}'
+                         for index, (bound, _) in enumerate(SESSION_BINS) if bound is not None)
+        where = 'end_time >= ? AND end_time < ? AND duration > 0'
+        bounds = self._bounds(start, end)
+
+        self.cursor.execute(f'''
+            SELECT CASE {cases} ELSE {len(SESSION_BINS) - 1} END, COUNT(*), SUM(duration)
+            FROM {self.log_source} WHERE {where}
+            GROUP BY 1
+        ''', bounds)
+        counts = [0] * len(SESSION_BINS)
+        total_seconds = 0
+        for index, count, seconds in self.cursor.fetchall():
+            counts[index] = count
+            total_seconds += seconds
+
+        count = sum(counts)
+        median = 0
+        if count:
+            self.cursor.execute(f'''
+                SELECT duration FROM {self.log_source} WHERE {where}
+                ORDER BY duration LIMIT 1 OFFSET ?
+            ''', bounds + (count // 2,))
+            median = self.cursor.fetchone()[0] / 60
+
+        return {
+            'count': count,
+            'total_minutes': total_seconds // 60,
+            'median_minutes': median,
+            'bins': [(label, counts[index]) for index, (_, label) in enumerate(SESSION_BINS)],
+        }
@@ -0,0 +1,279 @@
+"""
+Focus timer engine for Daily Task Tracker Pro
+Counts down on the monotonic clock so wall-clock changes never skew a session.
+The engine has no GUI dependency: scheduling is injected (``root.after`` in the
+app), which keeps it usable and testable headless.
+"""
+
+import math
+import time
+from datetime import datetime, timedelta
+
+
+class FocusTimer:
+    """Countdown timer with real pause/resume and exactly one pending tick"""
+
+    IDLE = "idle"
+    RUNNING = "running"
+    PAUSED = "paused"
+
+    def __init__(self, schedule, cancel, on_tick=None, on_finish=None, clock=time.monotonic):
+        # schedule(delay_ms, callback) -> handle, cancel(handle)
+        self.schedule = schedule
+        self.cancel = cancel
+        self.on_tick = on_tick
+        self.on_finish = on_finish
+        self.clock = clock
+
+        self.state = self.IDLE
+        self.duration = 0
+        self._accumulated = 0.0  # Active seconds from finished run segments
+        self._segment_start = None
+        self._pending = None
+
+    @property
+    def is_running(self):
+        return self.state == self.RUNNING
+
+    @property
+    def is_paused(self):
+        return self.state == self.PAUSED
+
+    @property
+    def is_active(self):
+        return self.state != self.IDLE
+
+    def elapsed(self):
+        """Active (unpaused) seconds in the current session"""
+        elapsed = self._accumulated
+        if self.state == self.RUNNING:
+            elapsed += self.clock() - self._segment_start
+        return elapsed
+
+    def remaining(self):
+        """Seconds left until the session finishes"""
+        return max(0.0, self.duration - self.elapsed())
+
+    def remaining_seconds(self):
+        """Whole seconds left, rounded up so a fresh 25:00 session shows 25:00"""
+        return int(math.ceil(self.remaining() - 1e-6))
+
+    def start(self, duration_seconds, elapsed=0.0):
+        """Start a new session, optionally resuming from already elapsed seconds"""
+        self._cancel_pending()
+        self.duration = int(duration_seconds)
+        self._accumulated = float(elapsed)
+        self._segment_start = self.clock()
+        self.state = self.RUNNING
+        self._tick()
+
+    def pause(self):
+        """Freeze the session without ending it"""
+        if self.state != self.RUNNING:
+            return
+        self._accumulated += self.clock() - self._segment_start
+        self._segment_start = None
+        self.state = self.PAUSED
+        self._cancel_pending()
+
+    def resume(self):
+        """Continue a paused session"""
+        if self.state != self.PAUSED:
+            return
+        self._segment_start = self.clock()
+        self.state = self.RUNNING
+        self._tick()
+
+    def stop(self):
+        """End the session early and return the active seconds worked"""
+        elapsed = self.elapsed()
+        self._halt()
+        return elapsed
+
+    def reset(self):
+        """Discard the session"""
+        self._halt()
+
+    def _halt(self):
+        self._cancel_pending()
+        self.state = self.IDLE
+        self.duration = 0
+        self._accumulated = 0.0
+        self._segment_start = None
+
+    def _cancel_pending(self):
+        if self._pending is not None:
+            self.cancel(self._pending)
+            self._pending = None
+
+    def _tick(self):
+        """Report the remaining time and schedule the next second boundary"""
+        self._pending = None
+        if self.state != self.RUNNING:
+            return
+
+        if self.remaining() <= 0:
+            elapsed = float(self.duration)
+            self._halt()
+            if self.on_finish:
+                self.on_finish(elapsed)
+            return
+
+        if self.on_tick:
+            self.on_tick(self.remaining_seconds())
+
+        # Wake up exactly when the displayed second changes
+        fraction = self.elapsed() % 1.0
+        delay_ms = max(1, int(math.ceil((1.0 - fraction) * 1000)))
+        self._pending = self.schedule(delay_ms, self._tick)
+
+
+class SessionCheckpoint:
+    """Persist the active focus session so a crash or sleep never loses it
+
+    The session row is written on start, pause and resume only. While running,
+    a heartbeat row is appended every ``interval`` seconds, so the worst-case
+    loss after a crash is one interval and the database sees one small commit
+    per interval instead of one per tick. A paused session keeps beating too
+    when its owner calls beat(), which tells other windows it is still alive.
+    """
+
+    def __init__(self, conn, interval=30, clock=time.monotonic, now=datetime.now):
+        self.conn = conn
+        self.cursor = conn.cursor()
+        self.interval = interval
+        self.clock = clock
+        self.now = now
+        self.session_id = None
+        self._last_beat = None
+        self.init_schema(self.cursor)
+
+    @staticmethod
+    def init_schema(cursor):
+        """Create the checkpoint tables"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS timer_sessions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                task_id INTEGER,
+                started_at TIMESTAMP,
+                duration INTEGER,
+                elapsed INTEGER DEFAULT 0,
+                state TEXT DEFAULT 'running',
+                updated_at TIMESTAMP
+            )
+        ''')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS timer_heartbeats (
+                session_id INTEGER,
+                beat_at TIMESTAMP,
+                elapsed INTEGER
+            )
+        ''')
+
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_timer_heartbeats_session
+            ON timer_heartbeats (session_id, elapsed)
+        ''')
+
+    def begin(self, task_id, duration, started_at):
+        """Record a newly started session"""
+        self.cursor.execute('''
+            INSERT INTO timer_sessions (task_id, started_at, duration, elapsed, state, updated_at)
+            VALUES (?, ?, ?, 0, 'running', ?)
+        ''', (task_id, started_at, int(duration), self.now()))
+        self.session_id = self.cursor.lastrowid
+        self._last_beat = self.clock()
+        self.conn.commit()
+
+    def beat(self, elapsed):
+        """Append a heartbeat if the interval has passed; cheap no-op otherwise"""
+        if self.session_id is None or self.clock() - self._last_beat < self.interval:
+            return
+        self._last_beat = self.clock()
+        self.cursor.execute('''
+            INSERT INTO timer_heartbeats (session_id, beat_at, elapsed)
+            VALUES (?, ?, ?)
+        ''', (self.session_id, self.now(), int(elapsed)))
+        self.conn.commit()
+
+    def pause(self, elapsed):
+        """Store the exact elapsed time when the session is paused"""
+        self._set_state('paused', elapsed)
+
+    def resume(self, elapsed):
+        """Mark the session as running again"""
+        self._last_beat = self.clock()
+        self._set_state('running', elapsed)
+
+    def _set_state(self, state, elapsed):
+        if self.session_id is None:
+            return
+        self.cursor.execute('''
+            UPDATE timer_sessions SET state = ?, elapsed = ?, updated_at = ? WHERE id = ?
+        ''', (state, int(elapsed), self.now(), self.session_id))
+        self.conn.commit()
+
+    def close(self):
+        """Drop the checkpoint of a session that is being logged; the caller commits"""
+        if self.session_id is None:
+            return
+        self.cursor.execute('DELETE FROM timer_heartbeats WHERE session_id = ?', (self.session_id,))
+        self.cursor.execute('DELETE FROM timer_sessions WHERE id = ?', (self.session_id,))
+        self.session_id = None
+
+    def discard(self):
+        """Drop the checkpoint of a session that is reset without logging"""
+        self.close()
+        self.conn.commit()
+
+    def recover(self, own=False):
+        """Close interrupted sessions into time_logs
+
+        A session is interrupted once nothing was heard from it for two
+        intervals; sessions still beating, such as one running in another
+        window, are left to their owner. With own, only this checkpoint's
+        session is closed, however recent. Returns a list of (task_id, seconds)
+        for the sessions that were logged.
+        """
+        self.cursor.execute(f'''
+            SELECT s.id, s.task_id, s.started_at, s.duration, s.elapsed, s.updated_at,
+                   MAX(h.elapsed), MAX(h.beat_at)
+            FROM timer_sessions s
+            LEFT JOIN timer_heartbeats h ON h.session_id = s.id
+            WHERE s.id {'=' if own else 'IS NOT'} ?
+            GROUP BY s.id
+        ''', (self.session_id,))
+        sessions = self.cursor.fetchall()
+
+        recovered = []
+        stale_before = self.now() - timedelta(seconds=2 * self.interval)
+        for session_id, task_id, started_at, duration, elapsed, updated_at, beat_elapsed, beat_at in sessions:
+            heard = [datetime.fromisoformat(str(value)) for value in (started_at, updated_at, beat_at) if value]
+            if not own and heard and max(heard) > stale_before:
+                continue
+            seconds = min(max(elapsed or 0, beat_elapsed or 0), duration or 0)
+
+            if task_id and seconds > 0:
+                start = datetime.fromisoformat(str(started_at))
+                end = datetime.fromisoformat(str(beat_at)) if beat_at else start + timedelta(seconds=seconds)
+
+                self.cursor.execute('''
+                    INSERT INTO time_logs (task_id, start_time, end_time, duration, notes)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (task_id, start, end, seconds, "Recovered focus session"))
+
+                self.cursor.execute('''
+                    UPDATE tasks
+                    SET actual_time = actual_time + ?
+                    WHERE id = ?
+                ''', (seconds // 60, task_id))
+                recovered.append((task_id, seconds))
+
+            self.cursor.execute('DELETE FROM timer_heartbeats WHERE session_id = ?', (session_id,))
+            self.cursor.execute('DELETE FROM timer_sessions WHERE id = ?', (session_id,))
+
+        if own:
+            self.session_id = None
+        self.conn.commit()
+        return recovered
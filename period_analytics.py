@@ -0,0 +1,204 @@
+"""
+Period analytics for Daily Task Tracker Pro
+Week-over-week and month-over-month comparisons, rolling averages and
+completion streaks, each answered by one query with window functions over the
+daily rollup in productivity_stats (see daily_rollup), however many periods
+it covers.
+
+Results are cached per period. TEMP triggers on productivity_stats note every
+date this connection's writes touch. Before answering, the cache drops only the
+entries whose dates were touched, so a dashboard over years only re-queries
+the periods that changed. Writes from other connections are not seen by the
+triggers; call clear() after them.
+"""
+
+from datetime import date, timedelta
+
+
+# Start of the period holding a date, and the step from one period start to the next
+PERIOD_SQL = {'week': "date(date, 'weekday 0', '-6 days')", 'month': "date(date, 'start of month')"}
+PERIOD_STEP = {'week': '+7 days', 'month': '+1 month'}
+
+ROLLING_DAYS = (7, 30)
+
+
+def period_start(day, kind):
+    if kind == 'week':
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def next_period(start, kind):
+    if kind == 'week':
+        return start + timedelta(days=7)
+    return (start + timedelta(days=32)).replace(day=1)
+
+
+def previous_period(start, kind):
+    if kind == 'week':
+        return start - timedelta(days=7)
+    return (start - timedelta(days=1)).replace(day=1)
+
+
+def change(current, previous):
+    """Relative change, or None when there is nothing to compare with"""
+    return (current - previous) / previous if previous else None
+
+
+class PeriodAnalytics:
+    """Cached period comparisons over productivity_stats"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.cursor = conn.cursor()
+        self._cache = {}  # key -> (value, first date, last date it depends on; None is open)
+
+        self.cursor.execute('CREATE TEMP TABLE IF NOT EXISTS rollup_touched (date TEXT PRIMARY KEY)')
+        for event in ('INSERT', 'UPDATE'):
+            self.cursor.execute(f'''
+                CREATE TEMP TRIGGER IF NOT EXISTS trg_rollup_touched_{event.lower()}
+                AFTER {event} ON main.productivity_stats
+                BEGIN
+                    -- Not OR IGNORE: the upsert firing this would override that policy
+                    INSERT INTO rollup_touched (date)
+                    SELECT NEW.date WHERE NOT EXISTS (SELECT 1 FROM rollup_touched WHERE date = NEW.date);
+                END
+            ''')
+
+    def clear(self):
+        self._cache.clear()
+
+    def _refresh(self):
+        """Drop cached entries that depend on dates written since the last call"""
+        self.cursor.execute('SELECT date FROM rollup_touched')
+        touched = [row[0] for row in self.cursor.fetchall()]
+        if not touched:
+            return
+        self.cursor.execute('DELETE FROM rollup_touched')
+        stale = [key for key, (_, low, high) in self._cache.items()
+                 if any((low is None or low <= day) and (high is None or day <= high) for day in touched)]
+        for key in stale:
+            del self._cache[key]
+
+    def _put(self, key, value, low, high):
+        self._cache[key] = (value, None if low is None else str(low), None if high is None else str(high))
+        return value
+
+    def compare(self, kind, start, end):
+        """One dict per period from the one holding start to the one holding end
+
+        Each has 'start', 'created', 'planned_done', 'completed' and 'worked'
+        (seconds), the same counters of the previous period under 'previous',
+        and 'completed_change' and 'worked_change' as fractions or None.
+        """
+        self._refresh()
+        periods = []
+        period = period_start(start, kind)
+        while period <= end:
+            periods.append(period)
+            period = next_period(period, kind)
+
+        missing = [period for period in periods if (kind, period) not in self._cache]
+        if missing:
+            # The calendar of periods makes LAG see empty periods as zeros
+            query_start = previous_period(missing[0], kind)
+            query_end = next_period(missing[-1], kind) - timedelta(days=1)
+            counters = ('created', 'planned_done', 'completed', 'worked')
+            self.cursor.execute(f'''
+                WITH RECURSIVE periods (period) AS (
+                    SELECT date(?) UNION ALL
+                    SELECT date(period, '{PERIOD_STEP[kind]}') FROM periods WHERE period < ?
+                ), totals AS (
+                    SELECT {PERIOD_SQL[kind]} AS period,
+                           SUM(tasks_created) AS created, SUM(planned_done) AS planned_done,
+                           SUM(tasks_completed) AS completed, SUM(total_time_worked) AS worked
+                    FROM productivity_stats
+                    WHERE date BETWEEN ? AND ?
+                    GROUP BY 1
+                ), series AS (
+                    SELECT period, {', '.join(f'COALESCE(totals.{name}, 0) AS {name}' for name in counters)}
+                    FROM periods LEFT JOIN totals USING (period)
+                )
+                SELECT * FROM (
+                    SELECT period, {', '.join(counters)},
+                           {', '.join(f'LAG({name}, 1, 0) OVER w' for name in counters)}
+                    FROM series
+                    WINDOW w AS (ORDER BY period)
+                )
+                WHERE period >= ?
+            ''', (str(query_start), str(missing[-1]), str(query_start), str(query_end), str(missing[0])))
+
+            for row in self.cursor.fetchall():
+                period = date.fromisoformat(row[0])
+                current, previous = dict(zip(counters, row[1:5])), dict(zip(counters, row[5:]))
+                self._put((kind, period), dict(
+                    current, start=period, previous=previous,
+                    completed_change=change(current['completed'], previous['completed']),
+                    worked_change=change(current['worked'], previous['worked']),
+                ), previous_period(period, kind), next_period(period, kind) - timedelta(days=1))
+
+        return [self._cache[(kind, period)][0] for period in periods]
+
+    def rolling(self, start, end):
+        """One dict per day with its counters and rolling 7 and 30-day figures
+
+        'avg7_completed', 'avg30_completed', 'avg7_worked' and 'avg30_worked'
+        are per-calendar-day averages; 'created30' and 'planned30' are sums.
+        """
+        self._refresh()
+        key = ('rolling', str(start), str(end))
+        if key in self._cache:
+            return self._cache[key][0]
+
+        lead = max(ROLLING_DAYS) - 1
+        averages = ', '.join(
+            f'AVG({name}) OVER (ORDER BY day ROWS BETWEEN {days - 1} PRECEDING AND CURRENT ROW) AS avg{days}_{name}'
+            for days in ROLLING_DAYS for name in ('completed', 'worked'))
+        self.cursor.execute(f'''
+            WITH RECURSIVE days (day) AS (
+                SELECT date(?) UNION ALL SELECT date(day, '+1 day') FROM days WHERE day < ?
+            ), daily AS (
+                SELECT days.day, COALESCE(p.tasks_created, 0) AS created,
+                       COALESCE(p.planned_done, 0) AS planned_done,
+                       COALESCE(p.tasks_completed, 0) AS completed,
+                       COALESCE(p.total_time_worked, 0) AS worked
+                FROM days LEFT JOIN productivity_stats p ON p.date = days.day
+            )
+            SELECT * FROM (
+                SELECT day, completed, worked, {averages},
+                       SUM(created) OVER last30 AS created30, SUM(planned_done) OVER last30 AS planned30
+                FROM daily
+                WINDOW last30 AS (ORDER BY day ROWS BETWEEN {lead} PRECEDING AND CURRENT ROW)
+            )
+            WHERE day >= ?
+        ''', (str(start - timedelta(days=lead)), str(end), str(start)))
+        columns = [description[0] for description in self.cursor.description]
+        days = [dict(zip(columns, row)) for row in self.cursor.fetchall()]
+        return self._put(key, days, start - timedelta(days=lead), end)
+
+    def streaks(self, today=None):
+        """{'current', 'longest', 'longest_end'}: runs of days with a completed task
+
+        A run that ended yesterday still counts as current until today is over.
+        """
+        today = today or date.today()
+        self._refresh()
+        key = ('streaks', str(today))
+        if key in self._cache:
+            return self._cache[key][0]
+
+        self.cursor.execute('''
+            WITH islands AS (
+                SELECT MAX(date) AS last, COUNT(*) AS length
+                FROM (SELECT date, julianday(date) - ROW_NUMBER() OVER (ORDER BY date) AS island
+                      FROM productivity_stats
+                      WHERE tasks_completed > 0 AND date <= ?)
+                GROUP BY island
+            )
+            SELECT (SELECT length FROM islands WHERE last >= date(?, '-1 day')),
+                   length, last
+            FROM islands ORDER BY length DESC, last DESC LIMIT 1
+        ''', (str(today), str(today)))
+        row = self.cursor.fetchone() or (0, 0, None)
+        streaks = {'current': row[0] or 0, 'longest': row[1], 'longest_end': row[2]}
+        return self._put(key, streaks, None, today)
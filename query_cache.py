@@ -0,0 +1,102 @@
+"""
+Query result cache for Daily Task Tracker Pro
+Caches result sets keyed by normalized query parameters. Every entry records
+the date ranges it covers and the task ids it contains; writes invalidate only
+the entries that overlap the dates or ids they touched. Entries are evicted
+least recently used first once the approximate memory cap is reached.
+"""
+
+import sys
+from collections import OrderedDict
+
+
+def _approx_size(value):
+    """Rough deep size of a result set made of lists/tuples of scalars"""
+    size = sys.getsizeof(value)
+    if isinstance(value, (list, tuple)):
+        for item in value:
+            size += _approx_size(item)
+    return size
+
+
+class QueryCache:
+    """LRU cache of query results with date/id based invalidation"""
+
+    def __init__(self, max_bytes=4 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (value, ranges, ids, size)
+        self._keys_by_id = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Cached value for key, or None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, value, ranges, ids=()):
+        """Store value; ranges are (start, end) date pairs, None for open ends"""
+        self._remove(key)
+
+        size = _approx_size(value)
+        if size > self.max_bytes:
+            return
+
+        ranges = [(None if start is None else str(start), None if end is None else str(end))
+                  for start, end in ranges]
+        ids = frozenset(ids)
+        self._entries[key] = (value, ranges, ids, size)
+        self.size += size
+        for task_id in ids:
+            self._keys_by_id.setdefault(task_id, set()).add(key)
+
+        while self.size > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    def invalidate(self, dates=(), ids=(), date_range=None):
+        """Drop entries covering any of the dates or containing any of the ids"""
+        stale = set()
+        for task_id in ids:
+            stale |= self._keys_by_id.get(task_id, set())
+
+        dates = [str(day) for day in dates]
+        if date_range is not None:
+            low, high = (None if d is None else str(d) for d in date_range)
+        for key, (_, ranges, _, _) in self._entries.items():
+            for start, end in ranges:
+                if any((start is None or start <= day) and (end is None or day <= end) for day in dates):
+                    stale.add(key)
+                    break
+                if date_range is not None and (start is None or high is None or start <= high) \
+                        and (end is None or low is None or low <= end):
+                    stale.add(key)
+                    break
+
+        for key in stale:
+            self._remove(key)
+
+    def clear(self):
+        self._entries.clear()
+        self._keys_by_id.clear()
+        self.size = 0
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.size -= entry[3]
+        for task_id in entry[2]:
+            keys = self._keys_by_id.get(task_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_id[task_id]
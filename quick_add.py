@@ -0,0 +1,129 @@
+"""
+Multi-line quick add for Daily Task Tracker Pro
+Each non-empty line of pasted text becomes a task. Inline tokens set its
+fields and are removed from the title:
+
+    !high / !h      priority (high, medium, low)
+    #work           category when it names a known one, otherwise a tag
+    ~45m / ~1h30m   time estimate (bare numbers are minutes)
+    @tomorrow       date: today, tomorrow, a weekday, YYYY-MM-DD or MM-DD
+    @14:30          due time (reminder)
+
+List markers such as "- ", "* ", "[ ]" and "1." at the start of a line are
+dropped, so checklists paste as they are.
+"""
+
+import re
+from datetime import date, timedelta
+
+from tag_index import normalize_tag
+
+
+PRIORITIES = {'h': 'High', 'high': 'High', 'm': 'Medium', 'med': 'Medium', 'medium': 'Medium',
+              'l': 'Low', 'low': 'Low'}
+
+WEEKDAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+
+LIST_MARKER = re.compile(r'^\s*(?:[-*+•]\s+|\[[ xX]?\]\s*|\d+[.)]\s+)+')
+ESTIMATE = re.compile(r'^(?:(\d+)h)?(?:(\d+)m?)?$')
+DUE_TIME = re.compile(r'^([01]?\d|2[0-3]):([0-5]\d)$')
+
+
+class QuickAddError(ValueError):
+    """A token on a quick-add line could not be understood"""
+
+    def __init__(self, line_number, message):
+        super().__init__(f"Line {line_number}: {message}")
+        self.line_number = line_number
+
+
+def parse_estimate(text):
+    """Minutes for '45m', '1h', '1h30m' or '90'; None if not an estimate"""
+    match = ESTIMATE.match(text.lower())
+    if not match or not any(match.groups()):
+        return None
+    hours, minutes = (int(group) if group else 0 for group in match.groups())
+    return hours * 60 + minutes
+
+
+def parse_date(text, today):
+    """Date for 'today', 'tomorrow', a weekday, 'YYYY-MM-DD' or 'MM-DD'; None if unknown
+
+    A weekday means its next occurrence, today included.
+    """
+    text = text.lower()
+    if text in ('today', 'tod'):
+        return today
+    if text in ('tomorrow', 'tom'):
+        return today + timedelta(days=1)
+    for index, weekday in enumerate(WEEKDAYS):
+        if len(text) >= 3 and weekday.startswith(text):
+            return today + timedelta(days=(index - today.weekday()) % 7)
+    for pattern in (r'^(\d{4})-(\d{1,2})-(\d{1,2})$', r'^()(\d{1,2})-(\d{1,2})$'):
+        match = re.match(pattern, text)
+        if match:
+            year, month, day = match.groups()
+            try:
+                return date(int(year) if year else today.year, int(month), int(day))
+            except ValueError:
+                return None
+    return None
+
+
+def parse_line(line, line_number=1, default_date=None, categories=(), today=None):
+    """Task fields for one line, or None for a blank line
+
+    Returns a dict with title, priority, category, estimated_time, tags,
+    date_created and due_time (HH:MM or None). Fields without a token are None.
+    """
+    today = today or date.today()
+    text = LIST_MARKER.sub('', line).strip()
+    if not text:
+        return None
+
+    known = {category.lower(): category for category in categories}
+    task = {'priority': None, 'category': None, 'estimated_time': None, 'tags': [],
+            'date_created': default_date, 'due_time': None}
+    words = []
+    for word in text.split():
+        marker, value = word[0], word[1:]
+        if not value or marker not in '!#~@':
+            words.append(word)
+        elif marker == '!':
+            if value.lower() not in PRIORITIES:
+                raise QuickAddError(line_number, f"unknown priority '{word}'")
+            task['priority'] = PRIORITIES[value.lower()]
+        elif marker == '#':
+            if value.lower() in known:
+                task['category'] = known[value.lower()]
+            elif normalize_tag(value) and normalize_tag(value) not in task['tags']:
+                task['tags'].append(normalize_tag(value))
+        elif marker == '~':
+            minutes = parse_estimate(value)
+            if minutes is None:
+                raise QuickAddError(line_number, f"unknown estimate '{word}' (try ~45m or ~1h30m)")
+            task['estimated_time'] = minutes
+        else:
+            time_match = DUE_TIME.match(value)
+            if time_match:
+                task['due_time'] = f"{int(time_match.group(1)):02d}:{time_match.group(2)}"
+                continue
+            day = parse_date(value, today)
+            if day is None:
+                raise QuickAddError(line_number, f"unknown date '{word}'")
+            task['date_created'] = day
+
+    task['title'] = ' '.join(words)
+    if not task['title']:
+        raise QuickAddError(line_number, "the task has no title")
+    return task
+
+
+def parse_text(text, default_date=None, categories=(), today=None):
+    """Parse every line of text; raises QuickAddError naming the first bad line"""
+    tasks = []
+    for number, line in enumerate(text.splitlines(), 1):
+        task = parse_line(line, number, default_date, categories, today)
+        if task is not None:
+            tasks.append(task)
+    return tasks
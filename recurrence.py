@@ -0,0 +1,233 @@
+"""
+Recurring tasks for Daily Task Tracker Pro
+A series is stored once as a rule. Occurrences become real task rows only when
+a date that needs them is viewed; until then a series costs no storage. Each
+materialized occurrence is recorded in recurrence_occurrences, so edits to it
+act as per-occurrence overrides and deleting it skips that date for good.
+"""
+
+import calendar
+import json
+from datetime import date, datetime, timedelta
+
+
+RECURRING_TYPES = ("daily", "weekly", "monthly")
+
+
+def to_date(value):
+    """Accept date objects or ISO strings as stored by sqlite3"""
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+
+class RecurrenceEngine:
+    """Stores recurrence rules and expands them on demand"""
+
+    RULE_COLUMNS = ('id', 'title', 'description', 'priority', 'category', 'estimated_time',
+                    'tags', 'notes', 'recurring_type', 'recurring_interval', 'start_date', 'end_date')
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.cursor = conn.cursor()
+        self._rules = None  # Loaded lazily, rules are few
+        self._materialized = set()  # Dates already expanded in this session
+        self.init_schema(self.cursor)
+
+    @staticmethod
+    def init_schema(cursor):
+        """Create the rule and occurrence tables"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS recurrence_rules (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT NOT NULL,
+                description TEXT,
+                priority TEXT DEFAULT 'Medium',
+                category TEXT DEFAULT 'General',
+                estimated_time INTEGER DEFAULT 30,
+                tags TEXT DEFAULT '',
+                notes TEXT DEFAULT '',
+                recurring_type TEXT NOT NULL,
+                recurring_interval INTEGER DEFAULT 1,
+                start_date DATE NOT NULL,
+                end_date DATE DEFAULT NULL
+            )
+        ''')
+
+        # task_id is NULL when an occurrence was deleted (skipped)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS recurrence_occurrences (
+                rule_id INTEGER NOT NULL,
+                occurrence_date DATE NOT NULL,
+                task_id INTEGER,
+                PRIMARY KEY (rule_id, occurrence_date)
+            )
+        ''')
+
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_recurrence_occurrences_date
+            ON recurrence_occurrences (occurrence_date)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_recurrence_occurrences_task
+            ON recurrence_occurrences (task_id)
+        ''')
+
+    @property
+    def rules(self):
+        if self._rules is None:
+            self.cursor.execute(f'SELECT {", ".join(self.RULE_COLUMNS)} FROM recurrence_rules')
+            self._rules = [dict(zip(self.RULE_COLUMNS, row)) for row in self.cursor.fetchall()]
+            for rule in self._rules:
+                rule['start_date'] = to_date(rule['start_date'])
+                rule['end_date'] = to_date(rule['end_date']) if rule['end_date'] else None
+        return self._rules
+
+    def add_rule(self, title, description, priority, category, estimated_time, tags,
+                 recurring_type, start_date, recurring_interval=1):
+        """Create a series starting at start_date; returns the rule id"""
+        if recurring_type not in RECURRING_TYPES:
+            raise ValueError(f"Unknown recurrence type: {recurring_type}")
+
+        self.cursor.execute('''
+            INSERT INTO recurrence_rules (title, description, priority, category, estimated_time,
+                                          tags, notes, recurring_type, recurring_interval, start_date)
+            VALUES (?, ?, ?, ?, ?, ?, '', ?, ?, ?)
+        ''', (title, description, priority, category, estimated_time, tags,
+              recurring_type, max(1, int(recurring_interval)), start_date))
+        self.conn.commit()
+
+        self.reload()
+        return self.cursor.lastrowid
+
+    def end_series(self, task_id):
+        """Stop the series of an occurrence after that occurrence; the caller commits
+
+        Returns the ids of the later occurrences that are still open, for the
+        caller to delete like any other task, or None if task_id is not an
+        occurrence. Completed later occurrences stay as plain tasks.
+        """
+        self.cursor.execute('''
+            SELECT rule_id, occurrence_date FROM recurrence_occurrences WHERE task_id = ?
+        ''', (task_id,))
+        row = self.cursor.fetchone()
+        if not row:
+            return None
+
+        rule_id, occurrence_date = row
+        self.cursor.execute('UPDATE recurrence_rules SET end_date = ? WHERE id = ?',
+                            (occurrence_date, rule_id))
+        self.cursor.execute('''
+            SELECT o.task_id FROM recurrence_occurrences o JOIN tasks t ON t.id = o.task_id
+            WHERE o.rule_id = ? AND o.occurrence_date > ? AND t.completed = 0
+        ''', (rule_id, occurrence_date))
+        later = [row[0] for row in self.cursor.fetchall()]
+        self.cursor.execute('''
+            DELETE FROM recurrence_occurrences WHERE rule_id = ? AND occurrence_date > ?
+        ''', (rule_id, occurrence_date))
+
+        self.reload()
+        return later
+
+    def reload(self):
+        """Forget cached rules and expanded dates after the tables changed"""
+        self._rules = None
+        self._materialized.clear()
+
+    def series_of(self, task_id):
+        """Rule id of a materialized occurrence, or None"""
+        self.cursor.execute('SELECT rule_id FROM recurrence_occurrences WHERE task_id = ?', (task_id,))
+        row = self.cursor.fetchone()
+        return row[0] if row else None
+
+    def skip(self, task_id):
+        """Remember that an occurrence was deleted; the caller commits"""
+        self.cursor.execute('UPDATE recurrence_occurrences SET task_id = NULL WHERE task_id = ?', (task_id,))
+
+    def skip_many(self, task_ids):
+        """skip() for several deleted occurrences at once; the caller commits"""
+        self.cursor.execute('''
+            UPDATE recurrence_occurrences SET task_id = NULL
+            WHERE task_id IN (SELECT value FROM json_each(?))
+        ''', (json.dumps(list(task_ids)),))
+
+    @staticmethod
+    def occurs_on(rule, day):
+        """Whether a rule has an occurrence on day"""
+        start = rule['start_date']
+        if day < start or (rule['end_date'] and day > rule['end_date']):
+            return False
+
+        interval = rule['recurring_interval'] or 1
+        kind = rule['recurring_type']
+        if kind == 'daily':
+            return (day - start).days % interval == 0
+        if kind == 'weekly':
+            return (day - start).days % (7 * interval) == 0
+        if kind == 'monthly':
+            months = (day.year - start.year) * 12 + day.month - start.month
+            if months % interval:
+                return False
+            # Series on the 31st fall on the last day of shorter months
+            last_day = calendar.monthrange(day.year, day.month)[1]
+            return day.day == min(start.day, last_day)
+        return False
+
+    def _occurrences(self, start, end):
+        """(rule, day) pairs in range that have never been materialized or skipped"""
+        if not self.rules:
+            return []
+
+        self.cursor.execute('''
+            SELECT rule_id, occurrence_date FROM recurrence_occurrences
+            WHERE occurrence_date BETWEEN ? AND ?
+        ''', (start, end))
+        existing = {(rule_id, str(day)) for rule_id, day in self.cursor.fetchall()}
+
+        pending = []
+        day = start
+        while day <= end:
+            for rule in self.rules:
+                if (rule['id'], str(day)) not in existing and self.occurs_on(rule, day):
+                    pending.append((rule, day))
+            day += timedelta(days=1)
+        return pending
+
+    def pending_counts(self, start, end):
+        """Occurrences per date that would appear if those dates were opened"""
+        counts = {}
+        for _, day in self._occurrences(to_date(start), to_date(end)):
+            key = day.strftime("%Y-%m-%d")
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    def materialize(self, start, end=None):
+        """Create task rows for occurrences in range; returns the new task ids"""
+        start = to_date(start)
+        end = to_date(end) if end else start
+
+        days = {start + timedelta(days=i) for i in range((end - start).days + 1)}
+        if days <= self._materialized:
+            return []
+
+        created = []
+        for rule, day in self._occurrences(start, end):
+            self.cursor.execute('''
+                INSERT INTO tasks (title, description, priority, category, estimated_time,
+                                   date_created, tags, notes, progress,
+                                   recurring_type, recurring_interval)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0, ?, ?)
+            ''', (rule['title'], rule['description'], rule['priority'], rule['category'],
+                  rule['estimated_time'], day, rule['tags'], rule['notes'],
+                  rule['recurring_type'], rule['recurring_interval']))
+            task_id = self.cursor.lastrowid
+            self.cursor.execute('''
+                INSERT INTO recurrence_occurrences (rule_id, occurrence_date, task_id)
+                VALUES (?, ?, ?)
+            ''', (rule['id'], day, task_id))
+            created.append(task_id)
+
+        if created:
+            self.conn.commit()
+        self._materialized |= days
+        return created
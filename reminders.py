@@ -0,0 +1,209 @@
+"""
+Reminder scheduling for Daily Task Tracker Pro
+Due reminders and focus-timer overrun alerts share one min-heap with exactly
+one pending root.after for its earliest entry. Due reminders are read from a
+partial index on tasks.due_at a chunk at a time, only as far as the heap
+needs, so idle cost does not grow with the number of reminders. Writes
+reschedule single entries; superseded heap entries are skipped lazily.
+"""
+
+import heapq
+import json
+import time
+from datetime import datetime
+
+
+DUE_FORMAT = '%Y-%m-%d %H:%M'
+
+# Upper bound on one wait, so sleep or clock changes are caught within the hour
+MAX_DELAY_MS = 60 * 60 * 1000
+
+
+def parse_due(text):
+    """Timestamp for a stored due_at value, or None"""
+    if not text:
+        return None
+    try:
+        return datetime.strptime(str(text)[:16], DUE_FORMAT).timestamp()
+    except ValueError:
+        return None
+
+
+def init_schema(cursor):
+    """Add due_at/reminded columns, the pending-reminder index and its reset trigger"""
+    cursor.execute('PRAGMA table_info(tasks)')
+    columns = [row[1] for row in cursor.fetchall()]
+    if 'due_at' not in columns:
+        cursor.execute('ALTER TABLE tasks ADD COLUMN due_at TIMESTAMP')
+    if 'reminded' not in columns:
+        cursor.execute('ALTER TABLE tasks ADD COLUMN reminded INTEGER DEFAULT 0')
+
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_tasks_due ON tasks (due_at, id)
+        WHERE due_at IS NOT NULL AND completed = 0 AND reminded = 0 AND archived = 0
+    ''')
+
+    # A new due time re-arms the reminder, whoever sets it
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_tasks_due_rearm AFTER UPDATE OF due_at ON tasks
+        WHEN OLD.due_at IS NOT NEW.due_at AND NEW.reminded = 1
+        BEGIN
+            UPDATE tasks SET reminded = 0 WHERE id = NEW.id;
+        END
+    ''')
+
+
+class ReminderScheduler:
+    """Min-heap of upcoming events driven by a single scheduled callback
+
+    on_event(kind, task_id) is called with kind 'due' or 'overrun'.
+    """
+
+    PENDING_SQL = 'due_at IS NOT NULL AND completed = 0 AND reminded = 0 AND archived = 0'
+
+    def __init__(self, conn, schedule, cancel, on_event, clock=time.time, chunk=100):
+        self.conn = conn
+        self.cursor = conn.cursor()
+        self.schedule = schedule
+        self.cancel = cancel
+        self.on_event = on_event
+        self.clock = clock
+        self.chunk = chunk
+
+        self._heap = []       # (when, kind, task_id)
+        self._current = {}    # (kind, task_id) -> when; other heap entries are stale
+        self._horizon = ('', 0)  # (due_at, id) of the last loaded reminder
+        self._exhausted = False
+        self._handle = None
+        self._armed_for = None
+
+    def start(self):
+        self._load()
+        self._arm()
+
+    # Loading
+
+    def _load(self):
+        """Pull the next chunk of pending reminders past the horizon"""
+        self.cursor.execute(f'''
+            SELECT id, due_at FROM tasks INDEXED BY idx_tasks_due
+            WHERE {self.PENDING_SQL} AND (due_at, id) > (?, ?)
+            ORDER BY due_at, id LIMIT ?
+        ''', self._horizon + (self.chunk,))
+        rows = self.cursor.fetchall()
+        for task_id, due_at in rows:
+            when = parse_due(due_at)
+            if when is not None:
+                self._push('due', task_id, when)
+        if rows:
+            self._horizon = (str(rows[-1][1]), rows[-1][0])
+        self._exhausted = len(rows) < self.chunk
+
+    def _loaded(self, due_at, task_id):
+        """True if a reminder at this key falls inside the loaded range"""
+        return self._exhausted or (str(due_at), task_id) <= self._horizon
+
+    # Heap maintenance
+
+    def _push(self, kind, task_id, when):
+        self._current[(kind, task_id)] = when
+        heapq.heappush(self._heap, (when, kind, task_id))
+
+    def _drop(self, kind, task_id):
+        self._current.pop((kind, task_id), None)
+
+    def _top(self):
+        """Earliest live entry, discarding stale ones; loads more when needed"""
+        while True:
+            while self._heap:
+                when, kind, task_id = self._heap[0]
+                if self._current.get((kind, task_id)) == when:
+                    break
+                heapq.heappop(self._heap)
+            has_due = any(key[0] == 'due' for key in self._current)
+            if has_due or self._exhausted:
+                return self._heap[0] if self._heap else None
+            self._load()
+
+    def _arm(self):
+        """Keep exactly one callback pending, for the earliest entry"""
+        top = self._top()
+        when = top[0] if top else None
+        if when == self._armed_for and self._handle is not None:
+            return
+        if self._handle is not None:
+            self.cancel(self._handle)
+            self._handle = None
+        self._armed_for = when
+        if when is not None:
+            delay_ms = int(max(0.0, when - self.clock()) * 1000)
+            self._handle = self.schedule(min(delay_ms, MAX_DELAY_MS), self._fire)
+
+    def _fire(self):
+        self._handle = None
+        self._armed_for = None
+        now = self.clock()
+
+        fired = []
+        while True:
+            top = self._top()
+            if top is None or top[0] > now:
+                break
+            when, kind, task_id = heapq.heappop(self._heap)
+            self._drop(kind, task_id)
+            fired.append((kind, task_id))
+
+        due_ids = [task_id for kind, task_id in fired if kind == 'due']
+        if due_ids:
+            self.cursor.executemany('UPDATE tasks SET reminded = 1 WHERE id = ?',
+                                    [(task_id,) for task_id in due_ids])
+            self.conn.commit()
+
+        for kind, task_id in fired:
+            self.on_event(kind, task_id)
+        self._arm()
+
+    # Incremental updates
+
+    def task_changed(self, task_id, due_at, pending):
+        """Reschedule one task after a write; pending is False once done or reminded"""
+        self._reschedule(task_id, due_at, pending)
+        self._arm()
+
+    def refresh(self, task_ids):
+        """Re-read tasks changed elsewhere (other windows, undo, sync) and reschedule them"""
+        task_ids = list(task_ids)
+        if not task_ids:
+            return
+        self.cursor.execute(f'''
+            SELECT id, due_at, {self.PENDING_SQL} FROM tasks
+            WHERE id IN (SELECT value FROM json_each(?))
+        ''', (json.dumps(task_ids),))
+        found = {row[0]: row[1:] for row in self.cursor.fetchall()}
+        for task_id in task_ids:
+            self._reschedule(task_id, *found.get(task_id, (None, False)))
+        self._arm()
+
+    def _reschedule(self, task_id, due_at, pending):
+        when = parse_due(due_at) if pending else None
+        if when is not None and self._loaded(due_at, task_id):
+            self._push('due', task_id, when)
+        else:
+            self._drop('due', task_id)  # Beyond the horizon it is loaded when reached
+
+    def reload(self):
+        """Forget loaded reminders and read them again from the index"""
+        for key in [key for key in self._current if key[0] == 'due']:
+            del self._current[key]
+        self._horizon = ('', 0)
+        self._exhausted = False
+        self._arm()
+
+    def watch_overrun(self, task_id, when):
+        """Alert when a running focus session passes the task's estimate"""
+        self._push('overrun', task_id, when)
+        self._arm()
+
+    def cancel_overrun(self, task_id):
+        self._drop('overrun', task_id)
+        self._arm()
@@ -0,0 +1,275 @@
+"""
+Offline reports for Daily Task Tracker Pro
+Writes one self-contained HTML file per week or month, with inline SVG charts,
+plus an index page. Each report uses the same aggregates as the Analytics tab:
+the daily rollup, the focus buckets and the period comparisons. Periods are
+rendered in parallel by a process pool, and each worker opens its own
+read-only connection, so reports can be made while the app is running:
+
+    python reports.py --period week --start 2025-01-01 --end 2025-12-31 --out reports
+"""
+
+import argparse
+import concurrent.futures
+import html
+import os
+import sqlite3
+import time
+from datetime import date, timedelta
+
+import daily_rollup
+from focus_analytics import WEEKDAY_NAMES, FocusAnalytics, peak_hours
+from period_analytics import PeriodAnalytics, next_period, period_start
+
+
+ACCENT = (0x1f, 0x6a, 0xa5)
+EMPTY = (0xeb, 0xed, 0xf0)
+
+# Completed tasks listed per report; the rest are counted
+MAX_LISTED_TASKS = 100
+
+STYLE = '''
+    body { font-family: -apple-system, "Segoe UI", Roboto, sans-serif; margin: 32px auto; max-width: 860px;
+           color: #222; }
+    h1 { margin-bottom: 4px; } h2 { margin-top: 32px; border-bottom: 1px solid #ddd; padding-bottom: 4px; }
+    .muted { color: #777; } .up { color: #2e7d32; } .down { color: #e65100; }
+    .cards { display: flex; gap: 12px; } .card { flex: 1; background: #f4f6f8; border-radius: 8px; padding: 12px; }
+    .card b { display: block; font-size: 22px; margin-top: 4px; }
+    table { border-collapse: collapse; width: 100%; } td, th { text-align: left; padding: 4px 8px; }
+    tr:nth-child(even) { background: #f7f7f7; } svg text { font-size: 10px; fill: #555; }
+'''
+
+# Per-process state, set up once by the pool initializer
+_worker = {}
+
+
+def connect(db_path, archive_path=None):
+    """Read-only connection with task_history and time_log_history views over the archive"""
+    conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True, timeout=30)
+    archived = bool(archive_path) and os.path.exists(archive_path)
+    if archived:
+        conn.execute('ATTACH DATABASE ? AS archive', (f'file:{archive_path}?mode=ro',))
+
+    for table, view in (('tasks', 'task_history'), ('time_logs', 'time_log_history')):
+        columns = [row[1] for row in conn.execute(f'PRAGMA main.table_info({table})')]
+        selects = [f"SELECT {', '.join(columns)} FROM main.{table}"]
+        if archived:
+            # Archived rows keep archived = 1 on disk but read as live history
+            archived_columns = ', '.join('0 AS archived' if column == 'archived' else column for column in columns)
+            selects.append(f'SELECT {archived_columns} FROM archive.{table}')
+        conn.execute(f"CREATE TEMP VIEW {view} AS {' UNION ALL '.join(selects)}")
+    return conn
+
+
+def periods(kind, start, end):
+    """(start, end) of every week or month overlapping start..end"""
+    spans = []
+    first = period_start(start, kind)
+    while first <= end:
+        following = next_period(first, kind)
+        spans.append((first, following - timedelta(days=1)))
+        first = following
+    return spans
+
+
+# Formatting
+def _duration(seconds):
+    minutes = int(seconds or 0) // 60
+    return f"{minutes // 60}h{minutes % 60:02d}m"
+
+
+def _shade(level):
+    """Blend from the empty color towards the accent; level is 0..1"""
+    return "#" + "".join(f"{round(e + (c - e) * level):02x}" for c, e in zip(ACCENT, EMPTY))
+
+
+def _change(value, label):
+    if value is None:
+        return f'<span class="muted">{f"nothing {label}" if label else "—"}</span>'
+    css, arrow = ("up", "▲") if value >= 0 else ("down", "▼")
+    return f'<span class="{css}">{arrow} {abs(value) * 100:.0f}% {label}</span>'
+
+
+def bar_chart(bars, width=800, height=160, format_value=str):
+    """Inline SVG column chart of (label, value) pairs"""
+    top = max((value for _, value in bars), default=0) or 1
+    pitch = width / max(len(bars), 1)
+    step = max(1, len(bars) // 16)  # Keep labels from overlapping
+    parts = [f'<svg width="{width}" height="{height + 30}" viewBox="0 0 {width} {height + 30}" '
+             f'xmlns="http://www.w3.org/2000/svg">']
+    for index, (label, value) in enumerate(bars):
+        bar = (height - 14) * value / top
+        x = index * pitch
+        parts.append(f'<rect x="{x + 2:.1f}" y="{height - bar:.1f}" width="{max(pitch - 4, 1):.1f}" '
+                     f'height="{bar:.1f}" rx="2" fill="{_shade(1)}"><title>{html.escape(str(label))}: '
+                     f'{html.escape(format_value(value))}</title></rect>')
+        if value:
+            parts.append(f'<text x="{x + pitch / 2:.1f}" y="{height - bar - 3:.1f}" '
+                         f'text-anchor="middle">{html.escape(format_value(value))}</text>')
+        if index % step == 0:
+            parts.append(f'<text x="{x + pitch / 2:.1f}" y="{height + 14}" '
+                         f'text-anchor="middle">{html.escape(str(label))}</text>')
+    parts.append('</svg>')
+    return ''.join(parts)
+
+
+def heatmap_chart(grid, cell=(26, 18)):
+    """Inline SVG hour-of-week heatmap of focus minutes"""
+    cell_w, cell_h = cell
+    width, height = 40 + 24 * cell_w, 20 + 7 * cell_h
+    peak = max(max(row) for row in grid) or 1
+    parts = [f'<svg width="{width}" height="{height}" viewBox="0 0 {width} {height}" '
+             f'xmlns="http://www.w3.org/2000/svg">']
+    for hour in range(0, 24, 3):
+        parts.append(f'<text x="{40 + hour * cell_w}" y="12">{hour:02d}</text>')
+    for weekday, row in enumerate(grid):
+        y = 20 + weekday * cell_h
+        parts.append(f'<text x="2" y="{y + cell_h - 5}">{WEEKDAY_NAMES[weekday]}</text>')
+        for hour, minutes in enumerate(row):
+            fill = _shade(minutes / peak) if minutes else _shade(0)
+            parts.append(f'<rect x="{40 + hour * cell_w + 1}" y="{y + 1}" width="{cell_w - 2}" '
+                         f'height="{cell_h - 2}" fill="{fill}"><title>{WEEKDAY_NAMES[weekday]} {hour:02d}:00 '
+                         f'{minutes}m</title></rect>')
+    parts.append('</svg>')
+    return ''.join(parts)
+
+
+def _table(headers, rows):
+    head = ''.join(f'<th>{html.escape(header)}</th>' for header in headers)
+    body = ''.join('<tr>' + ''.join(f'<td>{html.escape(str(cell))}</td>' for cell in row) + '</tr>'
+                   for row in rows)
+    return f'<table><tr>{head}</tr>{body}</table>'
+
+
+def _page(title, body):
+    return (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{html.escape(title)}</title>'
+            f'<style>{STYLE}</style></head><body>{body}</body></html>')
+
+
+# Rendering
+def _init_worker(db_path, archive_path):
+    conn = connect(db_path, archive_path)
+    _worker['conn'] = conn
+    _worker['focus'] = FocusAnalytics(conn, 'task_history', 'time_log_history')
+    _worker['periods'] = PeriodAnalytics(conn)
+
+
+def render_period(kind, start, end, out_dir):
+    """Write one period's report; returns (file name, summary) for the index"""
+    conn, focus = _worker['conn'], _worker['focus']
+    cursor = conn.cursor()
+    label = f"Week of {start:%b %d, %Y}" if kind == 'week' else f"{start:%B %Y}"
+
+    comparison, = _worker['periods'].compare(kind, start, start)
+    rollup = daily_rollup.fetch_days(cursor, start, end)
+    days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+    day_label = (lambda day: f"{day:%a}") if kind == 'week' else (lambda day: str(day.day))
+    grid = focus.heatmap(start, end)
+    sessions = focus.session_stats(start, end)
+
+    cursor.execute('''
+        SELECT date(date_completed), title, category, priority, estimated_time, actual_time
+        FROM task_history
+        WHERE completed = 1 AND date(date_completed) BETWEEN ? AND ?
+        ORDER BY date_completed, id
+    ''', (str(start), str(end)))
+    completed_tasks = cursor.fetchall()
+
+    created, planned_done = comparison['created'], comparison['planned_done']
+    planned_rate = f"{planned_done / created * 100:.0f}%" if created else "—"
+    unit = "week" if kind == 'week' else "month"
+    peaks = ", ".join(f"{day} {hour:02d}:00" for day, hour, _ in peak_hours(grid)) or "—"
+
+    body = [
+        f'<h1>📋 {html.escape(label)}</h1>',
+        f'<p class="muted">{start:%Y-%m-%d} – {end:%Y-%m-%d} · generated {date.today():%Y-%m-%d}</p>',
+        '<div class="cards">',
+        f'<div class="card">✅ Completed<b>{comparison["completed"]}</b>'
+        f'{_change(comparison["completed_change"], f"vs last {unit}")}</div>',
+        f'<div class="card">⏱️ Focus<b>{_duration(comparison["worked"])}</b>'
+        f'{_change(comparison["worked_change"], f"vs last {unit}")}</div>',
+        f'<div class="card">📋 Planned done<b>{planned_rate}</b>'
+        f'<span class="muted">{planned_done} of {created} planned</span></div>',
+        f'<div class="card">🎯 Sessions<b>{sessions["count"]}</b>'
+        f'<span class="muted">median {sessions["median_minutes"]:.0f}m</span></div>',
+        '</div>',
+        '<h2>Completed per day</h2>',
+        bar_chart([(day_label(day), rollup.get(str(day), (0, 0, 0, 0))[2] or 0) for day in days]),
+        '<h2>Focus per day</h2>',
+        bar_chart([(day_label(day), rollup.get(str(day), (0, 0, 0, 0))[3] or 0) for day in days],
+                  format_value=lambda seconds: f"{int(seconds) // 60}m" if seconds else ""),
+        f'<h2>Focus by hour</h2><p class="muted">Peak hours: {html.escape(peaks)}</p>',
+        heatmap_chart(grid),
+        '<h2>Session lengths</h2>',
+        bar_chart(sessions['bins'], width=420, height=120),
+        '<h2>Focus by category</h2>',
+        _table(("Category", "Focus"), [(category, _duration(minutes * 60))
+                                       for category, minutes in focus.by_category(start, end)]),
+        '<h2>Most focused tasks</h2>',
+        _table(("Task", "Focus"), [(title, _duration(minutes * 60))
+                                   for _, title, minutes in focus.top_tasks(start, end, limit=10)]),
+        f'<h2>Completed tasks ({len(completed_tasks)})</h2>',
+        _table(("Date", "Task", "Category", "Priority", "Est.", "Actual"),
+               [(day, title, category, priority, f"{estimate or 0}m", f"{actual or 0}m")
+                for day, title, category, priority, estimate, actual in completed_tasks[:MAX_LISTED_TASKS]]),
+    ]
+    if len(completed_tasks) > MAX_LISTED_TASKS:
+        body.append(f'<p class="muted">… and {len(completed_tasks) - MAX_LISTED_TASKS} more</p>')
+
+    file_name = f"{kind}-{start}.html"
+    with open(os.path.join(out_dir, file_name), 'w', encoding='utf-8') as report:
+        report.write(_page(label, ''.join(body)))
+    summary = {'label': label, 'completed': comparison['completed'], 'worked': comparison['worked'],
+               'completed_change': comparison['completed_change'], 'sessions': sessions['count']}
+    return file_name, summary
+
+
+def write_index(kind, results, out_dir):
+    """Index page linking every report, newest first, with a completed-per-period chart"""
+    results = sorted(results, key=lambda result: result[0])
+    rows = ''.join(
+        f'<tr><td><a href="{html.escape(file_name)}">{html.escape(summary["label"])}</a></td>'
+        f'<td>{summary["completed"]}</td><td>{_change(summary["completed_change"], "")}</td>'
+        f'<td>{_duration(summary["worked"])}</td><td>{summary["sessions"]}</td></tr>'
+        for file_name, summary in reversed(results))
+    chart = bar_chart([(summary['label'].replace('Week of ', ''), summary['completed'])
+                       for _, summary in results])
+    body = (f'<h1>📋 {"Weekly" if kind == "week" else "Monthly"} Reports</h1>'
+            f'<h2>Completed per {kind}</h2>{chart}'
+            f'<h2>Reports</h2><table><tr><th>Period</th><th>Completed</th><th>Change</th>'
+            f'<th>Focus</th><th>Sessions</th></tr>{rows}</table>')
+    path = os.path.join(out_dir, 'index.html')
+    with open(path, 'w', encoding='utf-8') as index:
+        index.write(_page("Reports", body))
+    return path
+
+
+def generate(kind, start, end, out_dir, db_path='tasks_enhanced.db', archive_path='tasks_archive.db', workers=None):
+    """Render every period of start..end in parallel; returns the index path"""
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(db_path)
+    os.makedirs(out_dir, exist_ok=True)
+    spans = periods(kind, start, end)
+    with concurrent.futures.ProcessPoolExecutor(workers, initializer=_init_worker,
+                                                initargs=(db_path, archive_path)) as pool:
+        futures = [pool.submit(render_period, kind, first, last, out_dir) for first, last in spans]
+        results = [future.result() for future in futures]
+    return write_index(kind, results, out_dir)
+
+
+if __name__ == "__main__":
+    today = date.today()
+    parser = argparse.ArgumentParser(description="Daily Task Tracker Pro offline reports")
+    parser.add_argument('--period', choices=('week', 'month'), default='week')
+    parser.add_argument('--start', type=date.fromisoformat, default=today.replace(month=1, day=1))
+    parser.add_argument('--end', type=date.fromisoformat, default=today)
+    parser.add_argument('--out', default='reports')
+    parser.add_argument('--db', default='tasks_enhanced.db')
+    parser.add_argument('--archive', default='tasks_archive.db')
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    index = generate(args.period, args.start, args.end, args.out, args.db, args.archive, args.workers)
+    print(f"Wrote {len(periods(args.period, args.start, args.end))} report(s) and {index} "
+          f"in {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,110 @@
+"""
+Midnight rollover for Daily Task Tracker Pro
+Tasks belong to their date_created, so unfinished work stays behind when the
+day changes. On the first rollover of a day the open tasks of the days since
+the last one are carried to the new day in a single set-based statement:
+'move' re-dates them, 'copy' inserts fresh copies and leaves the originals as
+they were. Recurring occurrences stay put; the new day gets its own. Rollover
+is off unless a policy is chosen in the settings.
+"""
+
+import json
+from datetime import date
+
+
+ROLLOVER_POLICIES = ("off", "move", "copy")
+
+# Columns a copy takes over from the original; progress, time and reminders start over
+COPIED_COLUMNS = ('title', 'description', 'priority', 'category', 'estimated_time',
+                  'tags', 'notes')
+
+OPEN_TASKS_SQL = '''
+    SELECT id FROM tasks
+    WHERE date_created >= ? AND date_created < ? AND completed = 0 AND archived = 0
+      AND id NOT IN (SELECT task_id FROM recurrence_occurrences WHERE task_id IS NOT NULL)
+'''
+
+
+def carry_over(cursor, since, today, policy):
+    """Carry open tasks dated [since, today) to today; returns the ids written
+
+    'move' returns the re-dated tasks, 'copy' the new rows. Subtasks of a copied
+    parent become top-level copies. The caller commits.
+    """
+    if policy not in ("move", "copy") or since >= today:
+        return []
+    cursor.execute(OPEN_TASKS_SQL, (str(since), str(today)))
+    task_ids = [row[0] for row in cursor.fetchall()]
+    if not task_ids:
+        return []
+
+    if policy == "move":
+        cursor.execute('''
+            UPDATE tasks SET date_created = ?
+            WHERE id IN (SELECT value FROM json_each(?))
+        ''', (str(today), json.dumps(task_ids)))
+        return task_ids
+
+    cursor.execute('SELECT COALESCE(MAX(id), 0) FROM tasks')
+    last_id = cursor.fetchone()[0]
+    columns = ', '.join(COPIED_COLUMNS)
+    cursor.execute(f'''
+        INSERT INTO tasks ({columns}, date_created)
+        SELECT {columns}, ? FROM tasks
+        WHERE id IN (SELECT value FROM json_each(?)) ORDER BY id
+    ''', (str(today), json.dumps(task_ids)))
+    cursor.execute('SELECT id FROM tasks WHERE id > ? ORDER BY id', (last_id,))
+    return [row[0] for row in cursor.fetchall()]
+
+
+class DayRollover:
+    """Notices the day change and carries unfinished tasks forward once per day
+
+    The last rolled-over day is kept in the settings table, so a day the app
+    was closed through is caught up at the next start.
+    """
+
+    SETTING = 'last_rollover'
+
+    def __init__(self, conn, policy="off", clock=date.today):
+        self.conn = conn
+        self.cursor = conn.cursor()
+        self.policy = policy
+        self.clock = clock
+        self.today = clock()
+
+        self.cursor.execute('SELECT value FROM settings WHERE key = ?', (self.SETTING,))
+        row = self.cursor.fetchone()
+        if row is None:
+            # Nothing to catch up on first run; older open work stays in the backlog
+            self._record(self.today)
+            self.last = self.today
+        else:
+            self.last = date.fromisoformat(row[0])
+
+    def day_changed(self):
+        """Cheap check, safe to call every tick"""
+        return self.clock() != self.today or self.last < self.today
+
+    def roll(self, history=None):
+        """Carry tasks over to the current day; returns (previous_today, since, ids)
+
+        The write runs as one undoable action when history is given. The caller
+        commits.
+        """
+        previous, since = self.today, self.last
+        self.today = self.clock()
+        task_ids = []
+        if since < self.today:
+            if history is not None and self.policy in ("move", "copy"):
+                with history.action("Carry over unfinished tasks"):
+                    task_ids = carry_over(self.cursor, since, self.today, self.policy)
+            else:
+                task_ids = carry_over(self.cursor, since, self.today, self.policy)
+            self._record(self.today)
+            self.last = self.today
+        return previous, since, task_ids
+
+    def _record(self, day):
+        self.cursor.execute('INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)',
+                            (self.SETTING, str(day)))
@@ -0,0 +1,199 @@
+"""
+Subtask hierarchy for Daily Task Tracker Pro
+A day's task forest is loaded with a single recursive CTE, already in display
+order. Parent progress and total time are cached on the parent row and rolled
+up incrementally along the ancestor chain whenever a child changes.
+"""
+
+import json
+
+from task_queries import PAGE_SIZE, PRIORITY_RANK_SQL
+
+
+def sort_key_sql(alias):
+    """Fixed-width key that reproduces the task list ORDER BY within one level"""
+    rank = PRIORITY_RANK_SQL.replace('priority', f'{alias}.priority')
+    return f"printf('%d%d%03d%010d', {rank}, {alias}.completed, 100 - {alias}.progress, {alias}.id)"
+
+
+class TaskHierarchy:
+    """Tree loading and progress/time rollups over tasks.parent_task_id"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.cursor = conn.cursor()
+
+    def tree_query(self, columns, source='tasks', after_path=False):
+        """SQL for one day's forest in display order; params are (date, date)
+
+        Rows are the requested columns followed by depth and the sort path.
+        Roots are tasks with no parent on the same day, so subtasks whose parent
+        moved days still show. With after_path, a third parameter resumes
+        strictly after a previously returned path.
+        """
+        select_columns = ', '.join(f't.{c}' for c in columns)
+        return f'''
+            WITH RECURSIVE tree(id, depth, path) AS (
+                SELECT t.id, 0, {sort_key_sql('t')}
+                FROM {source} t
+                WHERE t.date_created = ? AND t.archived = 0
+                  AND (t.parent_task_id IS NULL OR NOT EXISTS (
+                      SELECT 1 FROM {source} p
+                      WHERE p.id = t.parent_task_id AND p.date_created = t.date_created))
+                UNION ALL
+                SELECT c.id, tree.depth + 1, tree.path || '/' || {sort_key_sql('c')}
+                FROM {source} c
+                JOIN tree ON c.parent_task_id = tree.id
+                WHERE c.date_created = ? AND c.archived = 0
+            )
+            SELECT {select_columns}, tree.depth, tree.path
+            FROM tree JOIN {source} t ON t.id = tree.id
+            {'WHERE tree.path > ?' if after_path else ''}
+            ORDER BY tree.path
+        '''
+
+    def fetch_tree_page(self, day, columns, source='tasks', after=None, limit=PAGE_SIZE):
+        """One page of a day's forest; returns (rows, next_cursor) like fetch_page"""
+        query = self.tree_query(columns, source, after_path=after is not None) + ' LIMIT ?'
+        params = [day, day] + ([after] if after is not None else []) + [limit]
+        self.cursor.execute(query, params)
+        rows = self.cursor.fetchall()
+
+        next_cursor = rows[-1][-1] if len(rows) == limit else None
+        return [row[:-1] for row in rows], next_cursor
+
+    def subtree_ids(self, task_id):
+        """Ids of a task and all its descendants; UNION keeps a cycle from looping"""
+        self.cursor.execute('''
+            WITH RECURSIVE subtree(id) AS (
+                SELECT ?
+                UNION
+                SELECT t.id FROM tasks t JOIN subtree ON t.parent_task_id = subtree.id
+            )
+            SELECT id FROM subtree
+        ''', (task_id,))
+        return [row[0] for row in self.cursor.fetchall()]
+
+    def has_children(self, task_id):
+        self.cursor.execute('SELECT 1 FROM tasks WHERE parent_task_id = ? LIMIT 1', (task_id,))
+        return self.cursor.fetchone() is not None
+
+    def add_subtask(self, parent_id, title):
+        """Insert a subtask on the parent's day; returns its id, the caller commits"""
+        self.cursor.execute('''
+            INSERT INTO tasks (title, description, priority, category, estimated_time,
+                               date_created, tags, notes, progress, parent_task_id)
+            SELECT ?, '', priority, category, 30, date_created, '', '', 0, id
+            FROM tasks WHERE id = ?
+        ''', (title, parent_id))
+        child_id = self.cursor.lastrowid
+        self.refresh(child_id)
+        return child_id
+
+    def delete_subtree(self, task_id):
+        """Delete a task, its descendants and their time logs; the caller commits
+
+        Returns the ids removed, with the former parent's rollup refreshed.
+        """
+        return self.delete_subtrees([task_id])
+
+    def delete_subtrees(self, task_ids):
+        """Delete several tasks with all their descendants in one pass; the caller commits
+
+        Returns the ids removed. Rollups of surviving parents are refreshed.
+        """
+        roots = json.dumps(list(task_ids))
+        self.cursor.execute('''
+            SELECT DISTINCT parent_task_id FROM tasks
+            WHERE id IN (SELECT value FROM json_each(?)) AND parent_task_id IS NOT NULL
+        ''', (roots,))
+        parent_ids = [row[0] for row in self.cursor.fetchall()]
+
+        self.cursor.execute('''
+            WITH RECURSIVE subtree(id) AS (
+                SELECT value FROM json_each(?)
+                UNION
+                SELECT t.id FROM tasks t JOIN subtree ON t.parent_task_id = subtree.id
+            )
+            SELECT id FROM subtree
+        ''', (roots,))
+        ids = json.dumps([row[0] for row in self.cursor.fetchall()])
+        self.cursor.execute('DELETE FROM time_logs WHERE task_id IN (SELECT value FROM json_each(?))', (ids,))
+        self.cursor.execute('DELETE FROM tasks WHERE id IN (SELECT value FROM json_each(?))', (ids,))
+
+        removed = json.loads(ids)
+        self.refresh_many(set(parent_ids) - set(removed))
+        return removed
+
+    def refresh(self, task_id):
+        """Recompute cached rollups for a changed task and its ancestors
+
+        The changed task and its parent are always recomputed; further up, an
+        ancestor is recomputed only if one of its children changed. A completed
+        task keeps its progress. Returns the ids whose cached values were
+        rewritten.
+        """
+        return self.refresh_many([task_id])
+
+    def refresh_many(self, task_ids):
+        """refresh() for several changed tasks, visiting each ancestor at most once
+
+        The ancestor chains are read with one recursive query; a task is
+        recomputed only after all of its affected children, so a parent shared
+        by many changed tasks is aggregated once.
+        """
+        seeds = set(task_ids)
+        self.cursor.execute('''
+            WITH RECURSIVE chain(id) AS (
+                SELECT value FROM json_each(?)
+                UNION
+                SELECT t.parent_task_id FROM tasks t JOIN chain ON t.id = chain.id
+                WHERE t.parent_task_id IS NOT NULL
+            )
+            SELECT t.id, t.parent_task_id, t.completed, t.progress, t.actual_time, t.rollup_time
+            FROM tasks t JOIN chain ON t.id = chain.id
+        ''', (json.dumps(sorted(seeds)),))
+        rows = {row[0]: row[1:] for row in self.cursor.fetchall()}
+
+        # Children in the chain still to be visited, per task; a cycle never drains
+        waiting = {}
+        for parent_id, *_ in rows.values():
+            if parent_id in rows:
+                waiting[parent_id] = waiting.get(parent_id, 0) + 1
+        ready = [task_id for task_id in rows if not waiting.get(task_id)]
+        dirty = seeds & set(rows)
+
+        changed = []
+        while ready:
+            node = ready.pop()
+            parent_id = rows[node][0]
+            if node in dirty:
+                if self._recompute(node, *rows[node][1:]):
+                    changed.append(node)
+                    dirty.add(parent_id)
+                elif node in seeds:
+                    dirty.add(parent_id)
+            if parent_id in rows:
+                waiting[parent_id] -= 1
+                if not waiting[parent_id]:
+                    ready.append(parent_id)
+        return changed
+
+    def _recompute(self, task_id, completed, progress, actual_time, rollup_time):
+        """Rewrite one task's cached progress and rollup time; True if they changed"""
+        self.cursor.execute('''
+            SELECT COUNT(*),
+                   AVG(CASE WHEN completed = 1 THEN 100 ELSE progress END),
+                   COALESCE(SUM(rollup_time), 0)
+            FROM tasks WHERE parent_task_id = ?
+        ''', (task_id,))
+        child_count, child_progress, child_time = self.cursor.fetchone()
+
+        new_progress = int(round(child_progress)) if child_count and not completed else progress
+        new_rollup = (actual_time or 0) + child_time
+        if (new_progress, new_rollup) == (progress, rollup_time):
+            return False
+        self.cursor.execute('''
+            UPDATE tasks SET progress = ?, rollup_time = ? WHERE id = ?
+        ''', (new_progress, new_rollup, task_id))
+        return True
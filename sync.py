@@ -0,0 +1,386 @@
+"""
+Multi-device sync for Daily Task Tracker Pro
+Tasks carry a stable uuid, and every synced field has a Lamport clock in
+sync_clock, bumped by triggers on each local write whoever makes it. A sync
+pushes only clock rows newer than the peer's watermark and pulls only the
+server rows newer than ours, in zlib-compressed JSON batches. Conflicts are
+settled per field: the higher (lamport, node) pair wins on every replica, so
+all devices converge whatever order changes arrive in. Deletes are tombstones
+and win over edits; a task re-inserted under its old uuid, as undoing a delete
+does, restores it with a newer clock on the same '_deleted' field. Time logs
+stay local; their totals travel in actual_time.
+"""
+
+import json
+import sqlite3
+import urllib.parse
+import urllib.request
+import uuid
+import zlib
+
+
+# Synced task columns; 'parent' travels as the parent's uuid
+SYNC_FIELDS = ('title', 'description', 'priority', 'category', 'completed', 'date_created',
+               'date_completed', 'estimated_time', 'actual_time', 'tags', 'notes', 'progress', 'due_at')
+PARENT_FIELD = 'parent'
+DELETED_FIELD = '_deleted'
+
+BATCH_SIZE = 500
+
+_NEW_UUID_SQL = 'lower(hex(randomblob(16)))'
+_TICK_SQL = 'UPDATE sync_state SET lamport = lamport + 1, seq = seq + 1 WHERE capture = 1;'
+
+
+def encode(payload):
+    """Compressed wire form of a JSON payload"""
+    return zlib.compress(json.dumps(payload, separators=(',', ':')).encode('utf-8'))
+
+
+def decode(data):
+    return json.loads(zlib.decompress(data).decode('utf-8'))
+
+
+def wins(incoming, current):
+    """True if clock (lamport, node) incoming beats current (None = no clock)"""
+    return current is None or tuple(incoming) > tuple(current)
+
+
+def _clock_sql(field, uuid_sql, condition=''):
+    """Trigger statement stamping one field with the current clock"""
+    return f'''
+        INSERT OR REPLACE INTO sync_clock (uuid, field, lamport, node, seq)
+        SELECT {uuid_sql}, '{field}', lamport, node, seq FROM sync_state
+        WHERE capture = 1 {condition};
+    '''
+
+
+def init_schema(cursor):
+    """Add task uuids, the clock table and the capture triggers"""
+    cursor.execute("PRAGMA table_info(tasks)")
+    if 'uuid' not in [row[1] for row in cursor.fetchall()]:
+        cursor.execute('ALTER TABLE tasks ADD COLUMN uuid TEXT')
+
+    # Copies of one database file must agree on the uuids of the rows they share
+    cursor.execute('SELECT id, date_created, title FROM tasks WHERE uuid IS NULL')
+    cursor.executemany('UPDATE tasks SET uuid = ? WHERE id = ?', [
+        (uuid.uuid5(uuid.NAMESPACE_OID, f'{task_id}|{day}|{title}').hex, task_id)
+        for task_id, day, title in cursor.fetchall()])
+    cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_tasks_uuid ON tasks (uuid)')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sync_state (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            node TEXT NOT NULL,
+            lamport INTEGER NOT NULL DEFAULT 0,
+            seq INTEGER NOT NULL DEFAULT 0,
+            capture INTEGER NOT NULL DEFAULT 1
+        )
+    ''')
+    cursor.execute('INSERT OR IGNORE INTO sync_state (id, node) VALUES (1, ?)', (uuid.uuid4().hex,))
+
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sync_clock'")
+    needs_backfill = cursor.fetchone() is None
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sync_clock (
+            uuid TEXT NOT NULL,
+            field TEXT NOT NULL,
+            lamport INTEGER NOT NULL,
+            node TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            PRIMARY KEY (uuid, field)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_sync_clock_seq ON sync_clock (seq)')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sync_peers (
+            peer TEXT PRIMARY KEY,
+            pushed_seq INTEGER DEFAULT 0,
+            pulled_seq INTEGER DEFAULT 0
+        )
+    ''')
+
+    all_fields = ''.join(_clock_sql(field, '(SELECT uuid FROM tasks WHERE id = NEW.id)')
+                         for field in SYNC_FIELDS + (PARENT_FIELD,))
+    # Re-inserting a deleted uuid supersedes its tombstone with a restore;
+    # recreated so databases made before restores get the new body
+    restore = _clock_sql(DELETED_FIELD, 'NEW.uuid', f'''
+        AND EXISTS (SELECT 1 FROM sync_clock WHERE uuid = NEW.uuid AND field = '{DELETED_FIELD}')''')
+    cursor.execute('DROP TRIGGER IF EXISTS trg_sync_insert')
+    cursor.execute(f'''
+        CREATE TRIGGER trg_sync_insert AFTER INSERT ON tasks
+        BEGIN
+            UPDATE tasks SET uuid = {_NEW_UUID_SQL} WHERE id = NEW.id AND uuid IS NULL;
+            {_TICK_SQL}
+            {restore}
+            {all_fields}
+        END
+    ''')
+
+    changed_fields = ''.join(_clock_sql(field, 'NEW.uuid', f'AND OLD.{field} IS NOT NEW.{field}')
+                             for field in SYNC_FIELDS)
+    changed_fields += _clock_sql(PARENT_FIELD, 'NEW.uuid', 'AND OLD.parent_task_id IS NOT NEW.parent_task_id')
+    # Recreated so the column list follows SYNC_FIELDS
+    cursor.execute('DROP TRIGGER IF EXISTS trg_sync_update')
+    cursor.execute(f'''
+        CREATE TRIGGER trg_sync_update
+        AFTER UPDATE OF {', '.join(SYNC_FIELDS)}, parent_task_id ON tasks
+        BEGIN
+            {_TICK_SQL}
+            {changed_fields}
+        END
+    ''')
+
+    # Archival also deletes rows, after flagging them archived; those are not tombstones
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_sync_delete AFTER DELETE ON tasks
+        WHEN OLD.archived = 0
+        BEGIN
+            {_TICK_SQL}
+            {_clock_sql(DELETED_FIELD, 'OLD.uuid')}
+        END
+    ''')
+
+    if needs_backfill:
+        cursor.execute('UPDATE sync_state SET lamport = lamport + 1, seq = seq + 1')
+        for field in SYNC_FIELDS + (PARENT_FIELD,):
+            cursor.execute(f'''
+                INSERT OR IGNORE INTO sync_clock (uuid, field, lamport, node, seq)
+                SELECT t.uuid, '{field}', s.lamport, s.node, s.seq FROM tasks t, sync_state s
+            ''')
+
+
+def init_archive_triggers(cursor):
+    """Stamp deletes and restores of archived rows, as the tasks triggers do
+
+    The archive is attached per connection, so these triggers live in TEMP.
+    Without them a forgotten archived task would come back from peers, and a
+    restored one would not reach them.
+    """
+    cursor.execute('DROP TRIGGER IF EXISTS temp.trg_sync_archive_delete')
+    cursor.execute(f'''
+        CREATE TEMP TRIGGER trg_sync_archive_delete AFTER DELETE ON archive.tasks
+        BEGIN
+            {_TICK_SQL}
+            {_clock_sql(DELETED_FIELD, 'OLD.uuid')}
+        END
+    ''')
+    cursor.execute('DROP TRIGGER IF EXISTS temp.trg_sync_archive_restore')
+    cursor.execute(f'''
+        CREATE TEMP TRIGGER trg_sync_archive_restore AFTER INSERT ON archive.tasks
+        WHEN EXISTS (SELECT 1 FROM main.sync_clock WHERE uuid = NEW.uuid AND field = '{DELETED_FIELD}')
+        BEGIN
+            {_TICK_SQL}
+            {_clock_sql(DELETED_FIELD, 'NEW.uuid')}
+            {''.join(_clock_sql(field, 'NEW.uuid') for field in SYNC_FIELDS + (PARENT_FIELD,))}
+        END
+    ''')
+
+
+class SyncClient:
+    """Pushes local deltas to a sync server and merges the server's deltas
+
+    Opens its own connection, so it can run on a worker thread.
+    """
+
+    def __init__(self, db_path, server_url, archive_path=None, timeout=30):
+        self.db_path = db_path
+        self.server_url = server_url.rstrip('/')
+        self.archive_path = archive_path
+        self.timeout = timeout
+        self.changed_ids = set()  # Local task ids written by the last sync
+
+    def sync(self):
+        """Push then pull; returns (pushed, pulled) change counts"""
+        self.changed_ids = set()
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout)
+        try:
+            if self.archive_path:
+                conn.execute('ATTACH DATABASE ? AS archive', (self.archive_path,))
+            cursor = conn.cursor()
+            cursor.execute('SELECT node FROM sync_state')
+            node = cursor.fetchone()[0]
+            cursor.execute('INSERT OR IGNORE INTO sync_peers (peer) VALUES (?)', (self.server_url,))
+            conn.commit()
+            return self._push(conn, node), self._pull(conn, node)
+        finally:
+            conn.close()
+
+    def _request(self, path, body=None, **params):
+        url = f'{self.server_url}{path}'
+        if params:
+            url += '?' + urllib.parse.urlencode(params)
+        request = urllib.request.Request(url, data=body, headers={'Content-Type': 'application/octet-stream'})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return decode(response.read())
+
+    def _tables(self):
+        """Task tables holding synced rows; archived rows keep syncing in place"""
+        tables = ['main.tasks']
+        if self.archive_path:
+            tables.append('archive.tasks')
+        return tables
+
+    def _push(self, conn, node):
+        cursor = conn.cursor()
+        cursor.execute('SELECT pushed_seq FROM sync_peers WHERE peer = ?', (self.server_url,))
+        pushed_seq = floor = cursor.fetchone()[0]
+        after = (floor, '', '')
+        total = 0
+
+        # One write stamps several fields with the same seq, so pages continue
+        # after the full (seq, uuid, field) key
+        while True:
+            cursor.execute('''
+                SELECT uuid, field, lamport, node, seq FROM sync_clock
+                WHERE seq > ? AND (seq, uuid, field) > (?, ?, ?) ORDER BY seq, uuid, field LIMIT ?
+            ''', (floor,) + after + (BATCH_SIZE,))
+            clocks = cursor.fetchall()
+
+            if clocks:
+                rows = self._read_rows(conn, {clock[0] for clock in clocks})
+                changes = []
+                for task_uuid, field, lamport, writer, _ in clocks:
+                    if field == DELETED_FIELD:
+                        value = 0 if task_uuid in rows else 1  # 0: restored
+                    elif task_uuid in rows:
+                        value = rows[task_uuid][field]
+                    else:
+                        continue  # Deleted since; its tombstone follows
+                    changes.append([task_uuid, field, value, lamport, writer])
+
+                self._request('/push', encode({'node': node, 'changes': changes}))
+                total += len(changes)
+                after = (clocks[-1][4], clocks[-1][0], clocks[-1][1])
+
+            # A full page may end partway through a seq; resending part of one
+            # after an interruption is harmless
+            finished = len(clocks) < BATCH_SIZE
+            done_seq = after[0] if finished else after[0] - 1
+            if done_seq > pushed_seq:
+                pushed_seq = done_seq
+                cursor.execute('UPDATE sync_peers SET pushed_seq = ? WHERE peer = ?',
+                               (pushed_seq, self.server_url))
+                conn.commit()
+            if finished:
+                return total
+
+    def _read_rows(self, conn, uuids):
+        """uuid -> {field: value} for synced fields, with the parent as a uuid"""
+        cursor = conn.cursor()
+        rows = {}
+        for table in self._tables():
+            cursor.execute(f'''
+                SELECT t.uuid, {', '.join(f't.{field}' for field in SYNC_FIELDS)},
+                       (SELECT p.uuid FROM {table} p WHERE p.id = t.parent_task_id)
+                FROM {table} t WHERE t.uuid IN (SELECT value FROM json_each(?))
+            ''', (json.dumps(sorted(uuids)),))
+            for row in cursor.fetchall():
+                rows[row[0]] = dict(zip(SYNC_FIELDS + (PARENT_FIELD,), row[1:]))
+        return rows
+
+    def _pull(self, conn, node):
+        cursor = conn.cursor()
+        cursor.execute('SELECT pulled_seq FROM sync_peers WHERE peer = ?', (self.server_url,))
+        pulled_seq = cursor.fetchone()[0]
+        total = 0
+
+        while True:
+            batch = self._request('/pull', since=pulled_seq, limit=BATCH_SIZE, exclude=node)
+            if batch['changes']:
+                total += self.apply(conn, batch['changes'])
+            pulled_seq = batch['cursor']
+            cursor.execute('UPDATE sync_peers SET pulled_seq = ? WHERE peer = ?', (pulled_seq, self.server_url))
+            conn.commit()
+            if not batch['more']:
+                return total
+
+    def apply(self, conn, changes):
+        """Merge remote [uuid, field, value, lamport, node] changes in one transaction
+
+        Capture is switched off inside the transaction so merged values are not
+        echoed back as local edits. Returns the number of fields applied.
+        """
+        cursor = conn.cursor()
+        cursor.execute('UPDATE sync_state SET capture = 0')
+        try:
+            applied = self._merge(cursor, changes)
+            cursor.execute('UPDATE sync_state SET lamport = MAX(lamport, ?), capture = 1',
+                           (max(change[3] for change in changes),))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return applied
+
+    def _merge(self, cursor, changes):
+        uuids = json.dumps(sorted({change[0] for change in changes}))
+        cursor.execute('''
+            SELECT uuid, field, lamport, node FROM sync_clock
+            WHERE uuid IN (SELECT value FROM json_each(?))
+        ''', (uuids,))
+        clocks = {(row[0], row[1]): (row[2], row[3]) for row in cursor.fetchall()}
+
+        locations = {}
+        for table in self._tables():
+            cursor.execute(f'''
+                SELECT uuid, id FROM {table} WHERE uuid IN (SELECT value FROM json_each(?))
+            ''', (uuids,))
+            for task_uuid, task_id in cursor.fetchall():
+                locations[task_uuid] = (table, task_id)
+
+        # Tombstoned uuids with no row; deletes and restores are settled first,
+        # so a restore lets the fields that follow it through
+        deleted = {task_uuid for task_uuid, field in clocks
+                   if field == DELETED_FIELD and task_uuid not in locations}
+        changes = sorted(changes, key=lambda change: change[1] != DELETED_FIELD)
+
+        applied = 0
+        parents = []
+        for task_uuid, field, value, lamport, writer in changes:
+            if task_uuid in deleted and field != DELETED_FIELD:
+                continue
+            if not wins((lamport, writer), clocks.get((task_uuid, field))):
+                continue
+            clocks[(task_uuid, field)] = (lamport, writer)
+            cursor.execute('''
+                INSERT OR REPLACE INTO sync_clock (uuid, field, lamport, node, seq)
+                VALUES (?, ?, ?, ?, 0)
+            ''', (task_uuid, field, lamport, writer))
+            applied += 1
+
+            location = locations.get(task_uuid)
+            if field == DELETED_FIELD:
+                if not value:
+                    deleted.discard(task_uuid)
+                    continue
+                deleted.add(task_uuid)
+                if location:
+                    table, task_id = location
+                    schema = table.split('.')[0]
+                    cursor.execute(f'DELETE FROM {schema}.time_logs WHERE task_id = ?', (task_id,))
+                    cursor.execute(f'DELETE FROM {table} WHERE id = ?', (task_id,))
+                    self.changed_ids.discard(task_id)
+                    del locations[task_uuid]
+                continue
+
+            if location is None:
+                cursor.execute("INSERT INTO main.tasks (title, uuid) VALUES ('', ?)", (task_uuid,))
+                location = locations[task_uuid] = ('main.tasks', cursor.lastrowid)
+
+            table, task_id = location
+            if table == 'main.tasks':
+                self.changed_ids.add(task_id)
+            if field == PARENT_FIELD:
+                parents.append((table, task_id, value))
+            else:
+                cursor.execute(f'UPDATE {table} SET {field} = ? WHERE id = ?', (value, task_id))
+
+        # Parents resolve last, once every task of the batch exists
+        for table, task_id, parent_uuid in parents:
+            parent_id = locations.get(parent_uuid, (None, None))[1]
+            if parent_uuid is not None and parent_id is None:
+                cursor.execute('SELECT id FROM main.tasks WHERE uuid = ?', (parent_uuid,))
+                row = cursor.fetchone()
+                parent_id = row[0] if row else None
+            cursor.execute(f'UPDATE {table} SET parent_task_id = ? WHERE id = ?', (parent_id, task_id))
+        return applied
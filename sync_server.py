@@ -0,0 +1,145 @@
+"""
+Reference sync server for Daily Task Tracker Pro
+Keeps the winning value and clock of every (task uuid, field) in its own
+SQLite file and serves them by a server-side sequence, so a client only
+downloads rows written since its last pull. Meant for localhost testing:
+
+    python sync_server.py --port 8765 --db sync_server.db
+"""
+
+import argparse
+import json
+import sqlite3
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from sync import BATCH_SIZE, decode, encode, wins
+
+
+class SyncStore:
+    """Server-side field store with last-writer-wins merging"""
+
+    def __init__(self, db_path):
+        self.conn = sqlite3.connect(db_path)
+        self.cursor = self.conn.cursor()
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS sync_fields (
+                uuid TEXT NOT NULL,
+                field TEXT NOT NULL,
+                value TEXT,
+                lamport INTEGER NOT NULL,
+                node TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                PRIMARY KEY (uuid, field)
+            ) WITHOUT ROWID
+        ''')
+        self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_sync_fields_seq ON sync_fields (seq)')
+        self.cursor.execute('SELECT COALESCE(MAX(seq), 0) FROM sync_fields')
+        self.seq = self.cursor.fetchone()[0]
+        self.conn.commit()
+
+    def push(self, changes):
+        """Merge [uuid, field, value, lamport, node] changes; returns how many won"""
+        uuids = json.dumps(sorted({change[0] for change in changes}))
+        self.cursor.execute('''
+            SELECT uuid, field, lamport, node FROM sync_fields
+            WHERE uuid IN (SELECT value FROM json_each(?))
+        ''', (uuids,))
+        clocks = {(row[0], row[1]): (row[2], row[3]) for row in self.cursor.fetchall()}
+
+        accepted = []
+        for task_uuid, field, value, lamport, node in changes:
+            if not wins((lamport, node), clocks.get((task_uuid, field))):
+                continue
+            clocks[(task_uuid, field)] = (lamport, node)
+            self.seq += 1
+            accepted.append((task_uuid, field, json.dumps(value), lamport, node, self.seq))
+
+        self.cursor.executemany('''
+            INSERT OR REPLACE INTO sync_fields (uuid, field, value, lamport, node, seq)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', accepted)
+        self.conn.commit()
+        return len(accepted)
+
+    def pull(self, since, limit=BATCH_SIZE, exclude=None):
+        """Changes after sequence since, skipping those last written by exclude"""
+        self.cursor.execute('''
+            SELECT uuid, field, value, lamport, node, seq FROM sync_fields
+            WHERE seq > ? ORDER BY seq LIMIT ?
+        ''', (since, limit))
+        rows = self.cursor.fetchall()
+
+        changes = [[task_uuid, field, json.loads(value), lamport, node]
+                   for task_uuid, field, value, lamport, node, _ in rows if node != exclude]
+        return {
+            'changes': changes,
+            'cursor': rows[-1][5] if rows else since,
+            'more': len(rows) == limit,
+        }
+
+
+class SyncHandler(BaseHTTPRequestHandler):
+    """POST /push and GET /pull with zlib-compressed JSON bodies"""
+
+    store = None
+
+    def do_POST(self):
+        if urlparse(self.path).path != '/push':
+            self.send_error(404)
+            return
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        try:
+            payload = decode(body)
+            accepted = self.store.push(payload['changes'])
+        except (ValueError, KeyError, TypeError) as e:
+            self.send_error(400, str(e))
+            return
+        self.respond({'accepted': accepted})
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != '/pull':
+            self.send_error(404)
+            return
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        try:
+            since = int(params.get('since', 0))
+            limit = min(int(params.get('limit', BATCH_SIZE)), BATCH_SIZE)
+        except ValueError as e:
+            self.send_error(400, str(e))
+            return
+        self.respond(self.store.pull(since, limit, params.get('exclude')))
+
+    def respond(self, payload):
+        body = encode(payload)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(host='127.0.0.1', port=8765, db_path='sync_server.db'):
+    """Run the server until interrupted; requests are handled one at a time"""
+    SyncHandler.store = SyncStore(db_path)
+    server = HTTPServer((host, port), SyncHandler)
+    print(f"Sync server listening on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Daily Task Tracker Pro sync server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--db', default='sync_server.db')
+    args = parser.parse_args()
+    serve(args.host, args.port, args.db)
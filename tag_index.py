@@ -0,0 +1,143 @@
+"""
+Tag index for Daily Task Tracker Pro
+tasks.tags stays the editable comma-separated text; task_tags is a normalized
+junction table kept in sync by triggers, so every writer (the GUI, recurring
+series, scripts) maintains it. The task date is denormalized into the index so
+per-range facet counts are answered from the (date_created, tag) index alone.
+"""
+
+
+def normalize_tag(tag):
+    """Lowercase, trimmed, without a leading '#'"""
+    return tag.strip().lstrip('#').strip().lower()
+
+
+def parse_tags(text):
+    """Split comma-separated tag text into unique normalized tags, in order"""
+    tags = []
+    for part in (text or '').split(','):
+        tag = normalize_tag(part)
+        if tag and tag not in tags:
+            tags.append(tag)
+    return tags
+
+
+def split_search(text):
+    """Separate '#tag' tokens from free-text search terms"""
+    tags, words = [], []
+    for token in (text or '').split():
+        if token.startswith('#') and normalize_tag(token):
+            tags.append(normalize_tag(token))
+        else:
+            words.append(token)
+    return tags, ' '.join(words)
+
+
+def _split_sql(column):
+    """SQL turning comma-separated text into a JSON array for json_each"""
+    escaped = f"replace(replace(COALESCE({column}, ''), '\\', '\\\\'), '\"', '\\\"')"
+    for control in (9, 10, 13):
+        escaped = f"replace({escaped}, char({control}), ' ')"
+    array = f"""'["' || replace({escaped}, ',', '","') || '"]'"""
+    return f"CASE WHEN json_valid({array}) THEN {array} ELSE '[]' END"
+
+
+_NORMALIZED_VALUE_SQL = "lower(trim(ltrim(trim(value), '#')))"
+
+
+def _index_rows_sql(row):
+    return f'''
+        INSERT OR IGNORE INTO task_tags (tag, task_id, date_created)
+        SELECT {_NORMALIZED_VALUE_SQL}, {row}.id, {row}.date_created
+        FROM json_each({_split_sql(f'{row}.tags')})
+        WHERE {_NORMALIZED_VALUE_SQL} != ''
+    '''
+
+
+def init_schema(cursor):
+    """Create the junction table and triggers; backfill it on first creation"""
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'task_tags'")
+    needs_backfill = cursor.fetchone() is None
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS task_tags (
+            tag TEXT NOT NULL,
+            task_id INTEGER NOT NULL,
+            date_created DATE,
+            PRIMARY KEY (tag, task_id)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_task_tags_task ON task_tags (task_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_task_tags_date ON task_tags (date_created, tag)')
+
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_task_tags_insert AFTER INSERT ON tasks
+        BEGIN
+            {_index_rows_sql('NEW')};
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_task_tags_update AFTER UPDATE OF tags ON tasks
+        BEGIN
+            DELETE FROM task_tags WHERE task_id = NEW.id;
+            {_index_rows_sql('NEW')};
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_task_tags_date AFTER UPDATE OF date_created ON tasks
+        BEGIN
+            UPDATE task_tags SET date_created = NEW.date_created WHERE task_id = NEW.id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_task_tags_delete AFTER DELETE ON tasks
+        BEGIN
+            DELETE FROM task_tags WHERE task_id = OLD.id;
+        END
+    ''')
+
+    if needs_backfill:
+        cursor.execute(f'''
+            INSERT OR IGNORE INTO task_tags (tag, task_id, date_created)
+            SELECT {_NORMALIZED_VALUE_SQL}, tasks.id, tasks.date_created
+            FROM tasks, json_each({_split_sql('tasks.tags')})
+            WHERE tasks.tags != '' AND {_NORMALIZED_VALUE_SQL} != ''
+        ''')
+
+
+def _like_escape(text):
+    """Text matched literally by LIKE ... ESCAPE '\\'"""
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def tag_filter_sql(tags, source='tasks'):
+    """WHERE fragment and params matching tasks that carry every tag
+
+    Hot rows use the index; archived rows are not indexed, so ranges read
+    from the history view fall back to exact token matching on the text.
+    """
+    if not tags:
+        return '', []
+
+    if source == 'tasks':
+        placeholders = ', '.join('?' for _ in tags)
+        clause = f''' AND id IN (
+            SELECT task_id FROM task_tags WHERE tag IN ({placeholders})
+            GROUP BY task_id HAVING COUNT(*) = ?)'''
+        return clause, list(tags) + [len(tags)]
+
+    normalized_text = "(',' || lower(replace(replace(tags, ' ', ''), '#', '')) || ',')"
+    clause = ''.join(f" AND {normalized_text} LIKE ? ESCAPE '\\'" for _ in tags)
+    return clause, [f'%,{_like_escape(tag.replace(" ", ""))},%' for tag in tags]
+
+
+def facet_counts(cursor, start_date, end_date, limit=12):
+    """(tag, task count) for tasks dated in range, most used first"""
+    cursor.execute('''
+        SELECT tag, COUNT(*) FROM task_tags
+        WHERE date_created BETWEEN ? AND ?
+        GROUP BY tag
+        ORDER BY COUNT(*) DESC, tag
+        LIMIT ?
+    ''', (start_date, end_date, limit))
+    return cursor.fetchall()
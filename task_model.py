@@ -0,0 +1,93 @@
+"""
+In-memory task model for Daily Task Tracker Pro
+Task is a compact __slots__ record built from a database row. TaskMap is an
+identity map keyed by id: each loaded task exists once, handlers read the
+values the list already holds instead of re-selecting them, and writes are
+applied to the cached record as they are committed.
+"""
+
+import json
+
+
+# Columns that make up a Task, in row order
+TASK_FIELDS = ('id', 'title', 'description', 'priority', 'category', 'completed',
+               'estimated_time', 'actual_time', 'tags', 'notes', 'progress', 'rollup_time',
+               'date_created', 'parent_task_id', 'due_at')
+
+
+class Task:
+    """One task row; attributes mirror the tasks table columns"""
+
+    __slots__ = TASK_FIELDS
+
+    def __init__(self, *values):
+        for field, value in zip(TASK_FIELDS, values):
+            setattr(self, field, value)
+
+    def assign(self, values):
+        """Overwrite every field from a row"""
+        for field, value in zip(TASK_FIELDS, values):
+            setattr(self, field, value)
+
+    def __repr__(self):
+        return f"Task(id={self.id!r}, title={self.title!r}, date_created={self.date_created!r})"
+
+
+class TaskMap:
+    """Identity map of loaded tasks keyed by id"""
+
+    def __init__(self, cursor, source='tasks'):
+        self.cursor = cursor
+        self.source = source
+        self._tasks = {}
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def __contains__(self, task_id):
+        return task_id in self._tasks
+
+    def load(self, row):
+        """Return the Task for a row, reusing and refreshing a cached record"""
+        task = self._tasks.get(row[0])
+        if task is None:
+            task = Task(*row)
+            self._tasks[task.id] = task
+        else:
+            task.assign(row)
+        return task
+
+    def get(self, task_id):
+        """Cached task, loaded with a point query only on a miss"""
+        task = self._tasks.get(task_id)
+        if task is None:
+            self.refresh([task_id])
+            task = self._tasks.get(task_id)
+        return task
+
+    def refresh(self, task_ids):
+        """Re-read rows changed by derived updates (such as rollups)"""
+        task_ids = list(task_ids)
+        if not task_ids:
+            return
+        self.cursor.execute(f'''
+            SELECT {', '.join(TASK_FIELDS)} FROM {self.source}
+            WHERE id IN (SELECT value FROM json_each(?))
+        ''', (json.dumps(task_ids),))
+        for row in self.cursor.fetchall():
+            self.load(row)
+
+    def update(self, task_id, **fields):
+        """Apply a committed write to the cached record, if any"""
+        task = self._tasks.get(task_id)
+        if task is not None:
+            for field, value in fields.items():
+                setattr(task, field, value)
+
+    def discard(self, task_ids):
+        """Forget deleted tasks"""
+        for task_id in task_ids:
+            self._tasks.pop(task_id, None)
+
+    def clear(self):
+        self._tasks.clear()
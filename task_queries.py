@@ -0,0 +1,53 @@
+"""
+Paginated task queries for Daily Task Tracker Pro
+Every list reads through fetch_page, which uses keyset cursors instead of
+OFFSET: each page continues strictly after the sort key of the last row, so
+page cost stays flat however deep the user scrolls. The default key matches
+the task list order (priority rank, completed, progress descending, id) and is
+backed by an expression index per day.
+"""
+
+PAGE_SIZE = 50
+
+# Unknown priorities rank first, as NULL did in the original ORDER BY
+PRIORITY_RANK_SQL = "COALESCE(CASE priority WHEN 'High' THEN 1 WHEN 'Medium' THEN 2 WHEN 'Low' THEN 3 END, 0)"
+
+# Sort key of the task list; progress is negated so every part ascends
+TASK_ORDER = (PRIORITY_RANK_SQL, 'completed', '-progress', 'id')
+
+
+def init_schema(cursor):
+    """Create the index that serves day views in TASK_ORDER without sorting"""
+    cursor.execute(f'''
+        CREATE INDEX IF NOT EXISTS idx_tasks_day_order
+        ON tasks (date_created, {', '.join(TASK_ORDER)})
+    ''')
+
+
+def fetch_page(cursor, columns, where, params, after=None, limit=PAGE_SIZE,
+               source='tasks', order=TASK_ORDER, descending=False):
+    """Fetch one page of rows matching where, ordered by order
+
+    Returns (rows, next_cursor); next_cursor is None on the last page and is
+    otherwise passed back as ``after`` to continue.
+    """
+    key_sql = ', '.join(order)
+    query = f'SELECT {", ".join(columns)}, {key_sql} FROM {source} WHERE {where}'
+    params = list(params)
+
+    if after is not None:
+        placeholders = ', '.join('?' for _ in order)
+        query += f' AND ({key_sql}) {"<" if descending else ">"} ({placeholders})'
+        params.extend(after)
+
+    direction = ' DESC' if descending else ''
+    query += f' ORDER BY {", ".join(key + direction for key in order)} LIMIT ?'
+    params.append(limit)
+
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+
+    width = len(order)
+    page = [row[:-width] for row in rows]
+    next_cursor = tuple(rows[-1][-width:]) if len(rows) == limit else None
+    return page, next_cursor
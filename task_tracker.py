@@ -1,4 +1,5 @@
 import customtkinter as ctk
+import tkinter as tk
 import sqlite3
 from datetime import datetime, date, timedelta
 import json
@@ -11,6 +12,36 @@ import csv
 from typing import List, Dict, Optional
 import webbrowser
 
+from focus_timer import FocusTimer, SessionCheckpoint
+from archiver import TaskArchiver
+from recurrence import RecurrenceEngine
+from subtasks import TaskHierarchy
+import tag_index
+import task_queries
+from task_model import TASK_FIELDS, TaskMap
+from query_cache import QueryCache
+from change_watcher import ChangeWatcher
+from change_log import ChangeLog
+import sync
+from sync import SyncClient
+import api_server
+import reminders
+from reminders import ReminderScheduler
+from rollover import ROLLOVER_POLICIES, DayRollover
+import quick_add
+from quick_add import QuickAddError
+import focus_analytics
+from focus_analytics import FocusAnalytics
+import daily_rollup
+import canvas_views
+from canvas_views import TaskRow, YearHeatmap
+from estimate_model import EstimateModel
+import period_analytics
+from period_analytics import PeriodAnalytics
+
+
+CATEGORIES = ["General", "Work", "Personal", "Health", "Learning", "Shopping"]
+
 # Set appearance mode and color theme
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("blue")
@@ -24,26 +55,117 @@ class TaskTracker:
         
         # Enhanced features
         self.current_selected_date = date.today()
+        self.view_mode = "Day"
+        self.custom_range = None
         self.search_term = ""
+        self.tag_filters = []
+        
+        # Paginated task list state
+        self.page_generation = 0
+        self.page_fetch = None
+        self.page_render = None
+        self.page_cursor = None
+        self.page_has_more = False
+        self.page_pending = False
+        
+        # Multi-selection in the task list
+        self.selected_task_ids = set()
+        self.selection_anchor = None
+        self.task_frames = {}
+        self.task_order = []
+        self.task_rows = "widgets"  # or "canvas": one drawn canvas per row
+        self.task_row_actions = {
+            'toggle': self.toggle_enhanced_task, 'subtask': self.add_subtask,
+            'timer': self.start_task_timer, 'edit': self.edit_enhanced_task,
+            'delete': self.delete_task, 'select': self.toggle_selection,
+            'extend': self.extend_selection, 'rename': self.rename_task,
+        }
         self.notifications_enabled = True
         self.auto_save_enabled = True
         self.theme_mode = "dark"
+        self.archive_horizon_days = 90
+        self.sync_server = "http://127.0.0.1:8765"
+        self.sync_result = None
+        self.api_enabled = False
+        self.rollover_policy = "off"
+        self.api = None
+        self.pending_alerts = []
         
         # Timer functionality
-        self.active_timer = None
         self.timer_task_id = None
-        self.timer_start_time = None
-        self.timer_running = False
+        self.timer_started_at = None
+        self.session_keepalive = None
+        self.overrun_task_id = None
+        self.focus_timer = FocusTimer(schedule=self.root.after, cancel=self.root.after_cancel,
+                                      on_tick=self.update_timer_label,
+                                      on_finish=self.on_timer_finished)
         
         # Statistics
         self.productivity_data = []
+        self.heatmap_year = date.today().year
+        self.heatmap_days = {}
+        self.focus_grid = [[0] * 24 for _ in range(7)]
         
         # Initialize database with enhanced schema
         self.init_enhanced_database()
         
+        # Subtask tree loading and rollups
+        self.hierarchy = TaskHierarchy(self.conn)
+        
+        # Close focus sessions interrupted by a crash or shutdown
+        self.session_checkpoint = SessionCheckpoint(self.conn)
+        self.recovered_sessions = self.session_checkpoint.recover()
+        for task_id, _ in self.recovered_sessions:
+            self.hierarchy.refresh(task_id)
+        self.conn.commit()
+        
         # Load settings
         self.load_settings()
         
+        # Hot/cold partitioning of old completed tasks
+        self.archiver = TaskArchiver(self.conn, horizon_days=self.archive_horizon_days)
+        
+        # Hourly focus buckets kept current by triggers on time_logs, backfilled from all history
+        focus_analytics.init_schema(self.cursor, log_source='time_log_history')
+        
+        # Per-day counters in productivity_stats, kept current by triggers
+        daily_rollup.init_schema(self.cursor, 'task_history', 'time_log_history')
+        self.conn.commit()
+        
+        # Recurring series, expanded lazily per viewed date
+        self.recurrence = RecurrenceEngine(self.conn)
+        
+        # Tasks currently held by the UI, keyed by id
+        self.tasks = TaskMap(self.cursor, source='task_history')
+        
+        # Result sets of repeated list, stats and timer queries
+        self.query_cache = QueryCache()
+        
+        # Focus heatmap and session statistics over the time logs
+        self.focus_analytics = FocusAnalytics(self.conn)
+        
+        # Week/month comparisons, rolling averages and streaks over the daily rollup
+        self.period_analytics = PeriodAnalytics(self.conn)
+        
+        # Realistic estimates learned from completed tasks, refit on a worker thread
+        self.estimates = EstimateModel('tasks_enhanced.db', self.archiver.archive_path)
+        
+        # Commits made by other windows and scripts
+        self.change_watcher = ChangeWatcher(self.conn)
+        
+        # Undo/redo history; created last so its triggers see every column
+        self.history = ChangeLog(self.conn)
+        
+        # Due reminders and timer overrun alerts
+        self.reminders = ReminderScheduler(self.conn, self.root.after, self.root.after_cancel,
+                                           self.on_reminder)
+        
+        # Carries unfinished tasks into a new day, catching up on days the app was closed
+        self.rollover = DayRollover(self.conn, self.rollover_policy)
+        if self.rollover.day_changed():
+            self.rollover.roll(self.history)
+        self.conn.commit()
+        
         # Create enhanced GUI
         self.create_enhanced_widgets()
         
@@ -53,6 +175,12 @@ class TaskTracker:
         # Start auto-save thread
         self.start_auto_save()
         
+        if self.recovered_sessions:
+            total_seconds = sum(seconds for _, seconds in self.recovered_sessions)
+            messagebox.showinfo("Focus Sessions Recovered",
+                              f"Logged {len(self.recovered_sessions)} interrupted focus session(s)\n"
+                              f"Time recovered: {total_seconds // 60}:{total_seconds % 60:02d}")
+        
     def init_enhanced_database(self):
         """Initialize SQLite database with enhanced schema"""
         self.conn = sqlite3.connect('tasks_enhanced.db')
@@ -81,6 +209,32 @@ class TaskTracker:
             )
         ''')
         
+        self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_tasks_date ON tasks (date_created)')
+        self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_tasks_parent ON tasks (parent_task_id)')
+        
+        # Backlog of open work: only incomplete, unarchived rows are indexed
+        self.cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_tasks_backlog ON tasks (date_created, id)
+            WHERE completed = 0 AND archived = 0
+        ''')
+        
+        # Cached subtree time (own actual_time plus all descendants)
+        if self.ensure_column('tasks', 'rollup_time', 'INTEGER DEFAULT 0'):
+            self.cursor.execute('UPDATE tasks SET rollup_time = actual_time')
+        
+        # Normalized tag index, maintained by triggers
+        tag_index.init_schema(self.cursor)
+        
+        # Index serving day views in list order
+        task_queries.init_schema(self.cursor)
+        
+        # Due times and the index of pending reminders
+        reminders.init_schema(self.cursor)
+        
+        # Task uuids and per-field clocks for multi-device sync; after the
+        # migrations that add synced columns
+        sync.init_schema(self.cursor)
+        
         # Time tracking table
         self.cursor.execute('''
             CREATE TABLE IF NOT EXISTS time_logs (
@@ -116,6 +270,14 @@ class TaskTracker:
         
         self.conn.commit()
         
+    def ensure_column(self, table, column, definition):
+        """Add a column to an existing table; returns True if it was missing"""
+        self.cursor.execute(f'PRAGMA table_info({table})')
+        if column in [row[1] for row in self.cursor.fetchall()]:
+            return False
+        self.cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+        return True
+        
     def load_settings(self):
         """Load user settings from database"""
         self.cursor.execute('SELECT key, value FROM settings')
@@ -124,13 +286,25 @@ class TaskTracker:
         self.notifications_enabled = settings.get('notifications', 'true') == 'true'
         self.auto_save_enabled = settings.get('auto_save', 'true') == 'true'
         self.theme_mode = settings.get('theme', 'dark')
+        self.archive_horizon_days = int(settings.get('archive_horizon_days', '90'))
+        self.sync_server = settings.get('sync_server', self.sync_server)
+        self.api_enabled = settings.get('api_enabled', 'false') == 'true'
+        if settings.get('rollover_policy') in ROLLOVER_POLICIES:
+            self.rollover_policy = settings['rollover_policy']
+        if settings.get('task_rows') in ("widgets", "canvas"):
+            self.task_rows = settings['task_rows']
         
     def save_settings(self):
         """Save user settings to database"""
         settings = {
             'notifications': str(self.notifications_enabled).lower(),
             'auto_save': str(self.auto_save_enabled).lower(),
-            'theme': self.theme_mode
+            'theme': self.theme_mode,
+            'archive_horizon_days': str(self.archive_horizon_days),
+            'sync_server': self.sync_server,
+            'api_enabled': str(self.api_enabled).lower(),
+            'rollover_policy': self.rollover_policy,
+            'task_rows': self.task_rows
         }
         
         for key, value in settings.items():
@@ -175,6 +349,25 @@ class TaskTracker:
                                 command=self.toggle_theme, corner_radius=8)
         theme_btn.pack(side="left", padx=2)
         
+        # Undo/redo buttons
+        self.undo_btn = ctk.CTkButton(tools_frame, text="↶", width=40, height=35,
+                                    command=self.undo, corner_radius=8)
+        self.undo_btn.pack(side="left", padx=2)
+        
+        self.redo_btn = ctk.CTkButton(tools_frame, text="↷", width=40, height=35,
+                                    command=self.redo, corner_radius=8)
+        self.redo_btn.pack(side="left", padx=2)
+        
+        self.root.bind("<Control-z>", lambda e: self.undo())
+        self.root.bind("<Control-y>", lambda e: self.redo())
+        self.root.bind("<Control-Shift-Z>", lambda e: self.redo())
+        self.root.bind("<Escape>", lambda e: self.clear_selection())
+        
+        # Sync button
+        self.sync_btn = ctk.CTkButton(tools_frame, text="🔄", width=40, height=35,
+                                    command=self.sync_now, corner_radius=8)
+        self.sync_btn.pack(side="left", padx=2)
+        
         # Export button
         export_btn = ctk.CTkButton(tools_frame, text="📤", width=40, height=35,
                                  command=self.export_data, corner_radius=8)
@@ -210,7 +403,7 @@ class TaskTracker:
     def create_tabbed_interface(self, parent):
         """Create tabbed interface for different views"""
         # Tab view
-        self.tab_view = ctk.CTkTabview(parent, corner_radius=15)
+        self.tab_view = ctk.CTkTabview(parent, corner_radius=15, command=self.on_tab_changed)
         self.tab_view.pack(fill="both", expand=True)
         
         # Main tabs
@@ -280,6 +473,13 @@ class TaskTracker:
                                 command=self.go_to_today, corner_radius=6)
         today_btn.pack(fill="x", padx=5, pady=2)
         
+        # Day or agenda (date range) view
+        self.view_var = ctk.StringVar(value="Day")
+        view_menu = ctk.CTkOptionMenu(quick_frame, variable=self.view_var,
+                                    values=["Day", "Week", "Next 7 Days", "Month", "Custom Range..."],
+                                    command=self.change_view, height=30, corner_radius=6)
+        view_menu.pack(fill="x", padx=5, pady=2)
+        
         # Add task section
         add_frame = ctk.CTkFrame(parent, corner_radius=10)
         add_frame.pack(fill="x", padx=15, pady=10)
@@ -310,7 +510,7 @@ class TaskTracker:
         
         self.category_var = ctk.StringVar(value="General")
         category_menu = ctk.CTkOptionMenu(row1, variable=self.category_var,
-                                        values=["General", "Work", "Personal", "Health", "Learning", "Shopping"],
+                                        values=CATEGORIES,
                                         height=35, corner_radius=8)
         category_menu.pack(side="right", padx=5, pady=5, fill="x", expand=True)
         
@@ -324,15 +524,47 @@ class TaskTracker:
         self.time_entry = ctk.CTkEntry(row2, placeholder_text="30", width=80, height=35)
         self.time_entry.pack(side="left", padx=5, pady=5)
         
+        # What similar tasks usually take; clicking it uses that estimate
+        self.estimate_hint = None
+        self.estimate_hint_label = ctk.CTkLabel(row2, text="", text_color="gray60", cursor="hand2")
+        self.estimate_hint_label.pack(side="left", padx=5)
+        self.estimate_hint_label.bind("<Button-1>", lambda e: self.apply_estimate_hint())
+        
         self.tags_entry = ctk.CTkEntry(row2, placeholder_text="Tags (comma-separated)...", 
                                      height=35, corner_radius=8)
         self.tags_entry.pack(side="right", fill="x", expand=True, padx=5, pady=5)
         
+        for entry in (self.time_entry, self.tags_entry):
+            entry.bind("<KeyRelease>", lambda e: self.update_estimate_hint())
+        for variable in (self.priority_var, self.category_var):
+            variable.trace_add("write", lambda *args: self.update_estimate_hint())
+        
+        # Recurrence
+        row3 = ctk.CTkFrame(add_frame, corner_radius=8)
+        row3.pack(fill="x", padx=15, pady=5)
+        
+        repeat_label = ctk.CTkLabel(row3, text="🔁 Repeat:")
+        repeat_label.pack(side="left", padx=5)
+        
+        self.repeat_var = ctk.StringVar(value="No repeat")
+        repeat_menu = ctk.CTkOptionMenu(row3, variable=self.repeat_var,
+                                      values=["No repeat", "Daily", "Weekly", "Monthly"],
+                                      height=35, corner_radius=8)
+        repeat_menu.pack(side="left", padx=5, pady=5, fill="x", expand=True)
+        
+        self.due_entry = ctk.CTkEntry(row3, placeholder_text="⏰ HH:MM", width=80, height=35)
+        self.due_entry.pack(side="right", padx=5, pady=5)
+        
         # Add button
         add_btn = ctk.CTkButton(add_frame, text="➕ Add Task", height=40,
                               command=self.add_enhanced_task, corner_radius=8,
                               font=ctk.CTkFont(size=14, weight="bold"))
-        add_btn.pack(fill="x", padx=15, pady=(5, 15))
+        add_btn.pack(fill="x", padx=15, pady=(5, 5))
+        
+        quick_add_btn = ctk.CTkButton(add_frame, text="📋 Quick Add Several", height=30,
+                                    command=self.open_quick_add, corner_radius=8,
+                                    fg_color="gray40", hover_color="gray50")
+        quick_add_btn.pack(fill="x", padx=15, pady=(0, 15))
         
         # Filters section
         filter_frame = ctk.CTkFrame(parent, corner_radius=10)
@@ -346,10 +578,15 @@ class TaskTracker:
         filter_menu = ctk.CTkOptionMenu(filter_frame, variable=self.filter_var,
                                       values=["All", "Completed", "Pending", "High Priority", "Overdue"],
                                       command=self.filter_tasks, corner_radius=8)
-        filter_menu.pack(fill="x", padx=15, pady=(0, 15))
+        filter_menu.pack(fill="x", padx=15, pady=(0, 10))
+        
+        # Tag facets for the selected date
+        self.tag_facets_frame = ctk.CTkFrame(filter_frame, corner_radius=8, fg_color="transparent")
+        self.tag_facets_frame.pack(fill="x", padx=15, pady=(0, 10))
         
         # Bind Enter key
         self.task_entry.bind("<Return>", lambda e: self.add_enhanced_task())
+        self.task_entry.bind("<<Paste>>", self.on_task_entry_paste)
         
     def create_tasks_display(self, parent):
         """Create the tasks display area"""
@@ -362,10 +599,41 @@ class TaskTracker:
                                               font=ctk.CTkFont(size=20, weight="bold"))
         self.selected_date_label.pack(pady=20)
         
+        # Bulk actions, shown while tasks are selected (Ctrl+click / Shift+click)
+        self.bulk_bar = ctk.CTkFrame(parent, corner_radius=10)
+        
+        self.bulk_count_label = ctk.CTkLabel(self.bulk_bar, text="", font=ctk.CTkFont(size=13, weight="bold"))
+        self.bulk_count_label.pack(side="left", padx=10, pady=8)
+        
+        bulk_buttons = [
+            ("✓ Complete", lambda: self.bulk_set_completed(True), "green", "darkgreen"),
+            ("↺ Reopen", lambda: self.bulk_set_completed(False), "gray40", "gray50"),
+            ("📅 Move", self.bulk_reschedule, "blue", "darkblue"),
+            ("🗑️ Delete", self.bulk_delete, "red", "darkred"),
+        ]
+        for text, command, color, hover in bulk_buttons:
+            ctk.CTkButton(self.bulk_bar, text=text, width=90, height=30, command=command,
+                        fg_color=color, hover_color=hover, corner_radius=6).pack(side="left", padx=3, pady=8)
+        
+        self.bulk_priority_var = ctk.StringVar(value="Priority")
+        bulk_priority_menu = ctk.CTkOptionMenu(self.bulk_bar, variable=self.bulk_priority_var,
+                                             values=["High", "Medium", "Low"], width=100, height=30,
+                                             command=self.bulk_set_priority)
+        bulk_priority_menu.pack(side="left", padx=3, pady=8)
+        
+        ctk.CTkButton(self.bulk_bar, text="✕", width=30, height=30, command=self.clear_selection,
+                    fg_color="gray30", hover_color="gray40", corner_radius=6).pack(side="right", padx=5, pady=8)
+        ctk.CTkButton(self.bulk_bar, text="Select all", width=80, height=30, command=self.select_all_tasks,
+                    fg_color="gray30", hover_color="gray40", corner_radius=6).pack(side="right", padx=3, pady=8)
+        
         # Tasks scrollable area
         self.tasks_scrollable = ctk.CTkScrollableFrame(parent, corner_radius=10)
         self.tasks_scrollable.pack(fill="both", expand=True, padx=15, pady=(0, 15))
         
+        # Watch the scroll position to load further pages on demand
+        self.tasks_scrollbar = self.tasks_scrollable._scrollbar
+        self.tasks_scrollable._parent_canvas.configure(yscrollcommand=self.on_tasks_scrolled)
+        
     def create_calendar_tab(self):
         """Create calendar view tab"""
         cal_frame = ctk.CTkFrame(self.calendar_tab, corner_radius=10)
@@ -396,6 +664,34 @@ class TaskTracker:
         self.calendar_grid_frame = ctk.CTkFrame(cal_frame, corner_radius=10)
         self.calendar_grid_frame.pack(fill="both", expand=True, padx=20, pady=20)
         
+        # Year in review, drawn on one canvas from the daily rollup
+        year_frame = ctk.CTkFrame(cal_frame, corner_radius=10)
+        year_frame.pack(fill="x", padx=20, pady=(0, 20))
+        
+        year_nav = ctk.CTkFrame(year_frame, corner_radius=8, fg_color="transparent")
+        year_nav.pack(fill="x", padx=10, pady=(10, 5))
+        
+        ctk.CTkLabel(year_nav, text="🟩 Completed Tasks by Day",
+                    font=ctk.CTkFont(size=16, weight="bold")).pack(side="left", padx=5)
+        
+        self.heatmap_span_var = ctk.StringVar(value="1 year")
+        heatmap_span = ctk.CTkSegmentedButton(year_nav, values=["1 year", "3 years"],
+                                            variable=self.heatmap_span_var,
+                                            command=lambda value: self.update_year_heatmap())
+        heatmap_span.pack(side="right", padx=5)
+        
+        ctk.CTkButton(year_nav, text="▶", width=30, height=28,
+                    command=lambda: self.shift_heatmap_year(1)).pack(side="right", padx=2)
+        self.heatmap_year_label = ctk.CTkLabel(year_nav, text="", width=60,
+                                             font=ctk.CTkFont(size=14, weight="bold"))
+        self.heatmap_year_label.pack(side="right", padx=2)
+        ctk.CTkButton(year_nav, text="◀", width=30, height=28,
+                    command=lambda: self.shift_heatmap_year(-1)).pack(side="right", padx=2)
+        
+        self.year_heatmap = YearHeatmap(year_frame, on_select=self.select_calendar_date,
+                                        describe=self.describe_heatmap_day)
+        self.year_heatmap.pack(padx=10, pady=(0, 10))
+        
         self.create_calendar_grid()
         
     def create_analytics_tab(self):
@@ -409,7 +705,7 @@ class TaskTracker:
         analytics_header.pack(pady=20)
         
         # Stats panels
-        stats_container = ctk.CTkFrame(analytics_frame, corner_radius=10)
+        stats_container = ctk.CTkScrollableFrame(analytics_frame, corner_radius=10)
         stats_container.pack(fill="both", expand=True, padx=20, pady=20)
         
         # Weekly overview
@@ -434,6 +730,34 @@ class TaskTracker:
         self.trends_content = ctk.CTkFrame(trends_frame, corner_radius=8)
         self.trends_content.pack(fill="both", expand=True, padx=15, pady=(0, 15))
         
+        # Focus patterns from the time logs
+        focus_frame = ctk.CTkFrame(stats_container, corner_radius=10)
+        focus_frame.pack(fill="x", padx=15, pady=10)
+        
+        focus_label = ctk.CTkLabel(focus_frame, text="🎯 Focus Patterns (last 12 weeks)",
+                                 font=ctk.CTkFont(size=18, weight="bold"))
+        focus_label.pack(pady=15)
+        
+        focus_charts = ctk.CTkFrame(focus_frame, corner_radius=8, fg_color="transparent")
+        focus_charts.pack(fill="x", padx=15)
+        
+        # Hour-of-week heatmap and session lengths, each drawn on one canvas
+        self.focus_heatmap = tk.Canvas(focus_charts, width=40 + 24 * self.FOCUS_CELL[0],
+                                       height=20 + 7 * self.FOCUS_CELL[1], highlightthickness=0)
+        self.focus_heatmap.pack(side="left", padx=(0, 15), pady=5)
+        self.focus_heatmap.bind("<Motion>", self.on_focus_heatmap_hover)
+        self.focus_heatmap.bind("<Leave>", lambda e: self.focus_detail_label.configure(text=""))
+        
+        self.focus_sessions = tk.Canvas(focus_charts, width=300, height=20 + 7 * self.FOCUS_CELL[1],
+                                        highlightthickness=0)
+        self.focus_sessions.pack(side="left", pady=5)
+        
+        self.focus_detail_label = ctk.CTkLabel(focus_frame, text="", text_color="gray60")
+        self.focus_detail_label.pack(pady=(5, 0))
+        
+        self.focus_summary_label = ctk.CTkLabel(focus_frame, text="", justify="left")
+        self.focus_summary_label.pack(fill="x", padx=15, pady=(5, 15))
+        
     def create_timer_tab(self):
         """Create Pomodoro timer tab"""
         timer_frame = ctk.CTkFrame(self.timer_tab, corner_radius=10)
@@ -459,6 +783,12 @@ class TaskTracker:
                                            font=ctk.CTkFont(size=16, weight="bold"))
         self.start_timer_btn.pack(side="left", padx=10, pady=10)
         
+        stop_timer_btn = ctk.CTkButton(timer_controls, text="⏹️ Stop", 
+                                     height=50, width=120,
+                                     command=self.stop_timer,
+                                     fg_color="red", hover_color="darkred")
+        stop_timer_btn.pack(side="left", padx=10, pady=10)
+        
         reset_timer_btn = ctk.CTkButton(timer_controls, text="🔄 Reset", 
                                       height=50, width=120,
                                       command=self.reset_timer,
@@ -510,35 +840,158 @@ class TaskTracker:
         except ValueError:
             time_estimate = 30
             
-        # Insert enhanced task
-        self.cursor.execute('''
-            INSERT INTO tasks (title, description, priority, category, estimated_time, 
-                             date_created, tags, notes, progress)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (title, description, priority, category, time_estimate, 
-              self.current_selected_date, tags, '', 0))
-        self.conn.commit()
+        due_time = self.due_entry.get().strip()
+        due_at = f"{self.current_selected_date} {due_time}" if due_time else None
+        if due_at and reminders.parse_due(due_at) is None:
+            messagebox.showwarning("Warning", "Please enter the due time as HH:MM (e.g. 14:30)")
+            return
+            
+        repeat = self.repeat_var.get()
+        if repeat != "No repeat":
+            # Store the series once; occurrences appear as dates are viewed
+            self.recurrence.add_rule(title, description, priority, category, time_estimate,
+                                     tags, repeat.lower(), self.current_selected_date)
+        else:
+            # Insert enhanced task
+            with self.history.action(f"Add '{title}'"):
+                self.cursor.execute('''
+                    INSERT INTO tasks (title, description, priority, category, estimated_time, 
+                                     date_created, tags, notes, progress, due_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (title, description, priority, category, time_estimate, 
+                      self.current_selected_date, tags, '', 0, due_at))
+            self.conn.commit()
+            if due_at:
+                self.reminders.task_changed(self.cursor.lastrowid, due_at, True)
         
         # Clear inputs
         self.task_entry.delete(0, 'end')
         self.desc_entry.delete(0, 'end')
         self.time_entry.delete(0, 'end')
         self.tags_entry.delete(0, 'end')
+        self.due_entry.delete(0, 'end')
         self.priority_var.set("⚡ Medium")
         self.category_var.set("General")
+        self.repeat_var.set("No repeat")
+        self.update_estimate_hint()
         
         # Refresh displays
+        self.query_cache.invalidate(dates=[self.current_selected_date])
         self.load_tasks()
         self.update_timer_task_list()
         
-    def create_enhanced_task_widget(self, task):
+    def update_estimate_hint(self):
+        """Show what tasks like the one being added usually take"""
+        try:
+            estimate = int(self.time_entry.get().strip() or "30")
+        except ValueError:
+            estimate = 0
+        priority = self.priority_var.get().split()[-1]
+        predicted = self.estimates.predict(estimate, self.category_var.get(), priority, self.tags_entry.get())
+        
+        self.estimate_hint = predicted if self.estimates.ready and predicted != estimate else None
+        self.estimate_hint_label.configure(text=f"≈ {predicted}m usually" if self.estimate_hint else "")
+        
+    def apply_estimate_hint(self):
+        if self.estimate_hint:
+            self.time_entry.delete(0, 'end')
+            self.time_entry.insert(0, str(self.estimate_hint))
+            self.update_estimate_hint()
+            
+    # Quick add
+    def on_task_entry_paste(self, event):
+        """Send pasted multi-line text to the quick-add window instead of one title"""
+        try:
+            text = self.root.clipboard_get()
+        except Exception:
+            return None
+        if "\n" not in text.strip():
+            return None
+        self.open_quick_add(text)
+        return "break"
+    
+    def open_quick_add(self, text=""):
+        """Window that turns pasted lines into tasks, one per line"""
+        quick_window = ctk.CTkToplevel(self.root)
+        quick_window.title("Quick Add")
+        quick_window.geometry("560x520")
+        quick_window.transient(self.root)
+        quick_window.grab_set()
+        
+        hint = ("One task per line. Inline: !high  #category or #tag  ~45m  @tomorrow  @14:30\n"
+                f"Lines without a date go on {self.current_selected_date.strftime('%a %b %d')}.")
+        hint_label = ctk.CTkLabel(quick_window, text=hint, justify="left", text_color="gray60")
+        hint_label.pack(fill="x", padx=15, pady=(15, 5))
+        
+        lines_text = ctk.CTkTextbox(quick_window, corner_radius=8)
+        lines_text.pack(fill="both", expand=True, padx=15, pady=5)
+        lines_text.insert("1.0", text)
+        lines_text.focus_set()
+        
+        def add_lines():
+            try:
+                tasks = quick_add.parse_text(lines_text.get("1.0", "end"), self.current_selected_date,
+                                             self.known_categories())
+            except QuickAddError as e:
+                messagebox.showwarning("Quick Add", str(e), parent=quick_window)
+                lines_text.see(f"{e.line_number}.0")
+                return
+            if tasks:
+                self.quick_add_tasks(tasks)
+            quick_window.destroy()
+        
+        add_btn = ctk.CTkButton(quick_window, text="➕ Add Tasks", height=40, command=add_lines,
+                              font=ctk.CTkFont(size=14, weight="bold"))
+        add_btn.pack(fill="x", padx=15, pady=15)
+    
+    def known_categories(self):
+        """Built-in categories plus any already used by tasks"""
+        self.cursor.execute('SELECT DISTINCT category FROM tasks WHERE category IS NOT NULL')
+        return list(dict.fromkeys(CATEGORIES + [row[0] for row in self.cursor.fetchall()]))
+    
+    def quick_add_tasks(self, tasks):
+        """Insert parsed quick-add tasks with one executemany, one commit and one refresh"""
+        rows = []
+        for task in tasks:
+            day = task['date_created']
+            due_at = f"{day} {task['due_time']}" if task['due_time'] else None
+            estimate = 30 if task['estimated_time'] is None else task['estimated_time']  # ~0m stays 0
+            rows.append((task['title'], '', task['priority'] or 'Medium', task['category'] or 'General',
+                         estimate, day, ', '.join(task['tags']), '', 0, due_at))
+        
+        with self.history.action(f"Quick add {len(rows)} task(s)"):
+            self.cursor.executemany('''
+                INSERT INTO tasks (title, description, priority, category, estimated_time,
+                                 date_created, tags, notes, progress, due_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+        self.conn.commit()
+        
+        if any(row[-1] for row in rows):
+            self.reminders.reload()
+        self.query_cache.invalidate(dates={task['date_created'] for task in tasks})
+        self.update_all_displays()
+        self.load_tasks()
+        self.update_timer_task_list()
+    
+    def create_enhanced_task_widget(self, task, depth=0):
         """Create enhanced task widget with progress tracking"""
-        task_id, title, description, priority, category, completed, estimated_time, actual_time, tags, notes, progress = task[:11]
+        if self.task_rows == "canvas":
+            self.create_task_row(task, depth)
+            return
+            
+        task_id, title, description, priority, category = task.id, task.title, task.description, task.priority, task.category
+        completed, estimated_time, actual_time, progress = task.completed, task.estimated_time, task.actual_time, task.progress
+        tags, rollup_time = task.tags, task.rollup_time
         
-        # Main task frame
+        # Main task frame, indented under its parent
         task_frame = ctk.CTkFrame(self.tasks_scrollable, corner_radius=12, height=120)
-        task_frame.pack(fill="x", padx=5, pady=8)
+        task_frame.pack(fill="x", padx=(5 + 30 * min(depth, 6), 5), pady=8)
         task_frame.pack_propagate(False)
+        self.task_frames[task_id] = task_frame
+        self.task_order.append(task_id)
+        if task_id in self.selected_task_ids:
+            task_frame.configure(border_width=2, border_color="#3b8ed0")
         
         # Left side - main content
         left_frame = ctk.CTkFrame(task_frame, corner_radius=10)
@@ -565,6 +1018,11 @@ class TaskTracker:
                                  font=ctk.CTkFont(size=16, weight="bold"))
         title_label.pack(side="left", padx=10, pady=5)
         
+        # Ctrl+click toggles the selection, Shift+click extends it
+        for widget in (task_frame, left_frame, top_row, title_label):
+            widget.bind("<Control-Button-1>", lambda e: self.toggle_selection(task_id))
+            widget.bind("<Shift-Button-1>", lambda e: self.extend_selection(task_id))
+        
         # Priority and category badges
         badges_frame = ctk.CTkFrame(top_row, corner_radius=5)
         badges_frame.pack(side="right", padx=5, pady=5)
@@ -605,11 +1063,22 @@ class TaskTracker:
         time_info = f"⏱️ Est: {estimated_time}m"
         if actual_time > 0:
             time_info += f" | Actual: {actual_time}m"
+        if rollup_time and rollup_time > actual_time:
+            time_info += f" | With subtasks: {rollup_time}m"
+        if task.due_at:
+            time_info += f" | ⏰ {str(task.due_at)[11:16]}"
             
         time_label = ctk.CTkLabel(bottom_row, text=time_info,
                                 font=ctk.CTkFont(size=11), text_color="gray60")
         time_label.pack(side="left", padx=5, pady=2)
         
+        # Subtask button
+        subtask_btn = ctk.CTkButton(bottom_row, text="➕ Subtask", width=80, height=22,
+                                  command=lambda: self.add_subtask(task_id),
+                                  fg_color="gray40", hover_color="gray50", corner_radius=6,
+                                  font=ctk.CTkFont(size=11))
+        subtask_btn.pack(side="right", padx=5, pady=2)
+        
         # Progress bar for incomplete tasks
         if not completed and progress > 0:
             progress_bar = ctk.CTkProgressBar(bottom_row, width=100, height=15)
@@ -639,6 +1108,27 @@ class TaskTracker:
                                  fg_color="red", hover_color="darkred", corner_radius=6)
         delete_btn.pack(pady=2)
         
+    def create_task_row(self, task, depth=0):
+        """Draw a task row on a single canvas instead of building it from widgets"""
+        row = TaskRow(self.tasks_scrollable, task, self.task_row_actions,
+                      selected=task.id in self.selected_task_ids)
+        row.pack(fill="x", padx=(5 + 30 * min(depth, 6), 5), pady=4)
+        self.task_frames[task.id] = row
+        self.task_order.append(task.id)
+        
+    def rename_task(self, task_id, title):
+        """Save a title edited in place and redraw only its row"""
+        with self.history.action(f"Rename '{title}'"):
+            self.cursor.execute('UPDATE tasks SET title = ? WHERE id = ?', (title, task_id))
+        
+        self.conn.commit()
+        self.tasks.update(task_id, title=title)
+        self.invalidate_tasks([task_id])
+        row = self.task_frames.get(task_id)
+        if isinstance(row, TaskRow):
+            row.draw()
+        self.update_timer_task_list()
+        
     def create_calendar_grid(self):
         """Create monthly calendar grid with task indicators"""
         # Clear existing grid
@@ -661,15 +1151,23 @@ class TaskTracker:
             header_label.grid(row=0, column=i, padx=2, pady=5, sticky="nsew")
             
         # Get task counts for each day
-        self.cursor.execute('''
+        source = self.archiver.source_for(date(cal_year, cal_month, 1))
+        self.cursor.execute(f'''
             SELECT date_created, COUNT(*), SUM(completed) 
-            FROM tasks 
+            FROM {source} 
             WHERE date_created LIKE ? 
             GROUP BY date_created
         ''', (f"{cal_year}-{cal_month:02d}-%",))
         
         task_data = {row[0]: (row[1], row[2]) for row in self.cursor.fetchall()}
         
+        # Count recurring occurrences that have not been materialized yet
+        month_end = date(cal_year, cal_month, calendar.monthrange(cal_year, cal_month)[1])
+        pending = self.recurrence.pending_counts(date(cal_year, cal_month, 1), month_end)
+        for day_str, count in pending.items():
+            total_tasks, completed_tasks = task_data.get(day_str, (0, 0))
+            task_data[day_str] = (total_tasks + count, completed_tasks or 0)
+        
         # Calendar days
         cal = calendar.monthcalendar(cal_year, cal_month)
         for week_num, week in enumerate(cal, 1):
@@ -721,6 +1219,28 @@ class TaskTracker:
         for i in range(7):
             self.calendar_grid_frame.grid_columnconfigure(i, weight=1)
             
+    def update_year_heatmap(self):
+        """Redraw the year heatmap from one range query over the daily rollup"""
+        span = 3 if self.heatmap_span_var.get() == "3 years" else 1
+        years = list(range(self.heatmap_year, self.heatmap_year - span, -1))
+        self.heatmap_days = daily_rollup.fetch_days(self.cursor, date(years[-1], 1, 1), date(years[0], 12, 31))
+        self.heatmap_year_label.configure(text=str(self.heatmap_year))
+        self.year_heatmap.draw(years, {day: row[2] for day, row in self.heatmap_days.items()})
+    
+    def shift_heatmap_year(self, step):
+        self.heatmap_year = min(date.today().year, self.heatmap_year + step)
+        self.update_year_heatmap()
+    
+    def describe_heatmap_day(self, day):
+        """Tooltip text for one heatmap cell"""
+        created, planned_done, completed, worked = self.heatmap_days.get(str(day), (0, 0, 0, 0))
+        lines = [day.strftime("%a %b %d, %Y"), f"✅ {completed or 0} completed"]
+        if created:
+            lines.append(f"📋 {planned_done or 0}/{created} planned done")
+        if worked:
+            lines.append(f"⏱️ {worked // 3600}h{worked % 3600 // 60:02d}m focused")
+        return "\n".join(lines)
+    
     def select_calendar_date(self, selected_date):
         """Select date from calendar"""
         self.current_selected_date = selected_date
@@ -736,7 +1256,11 @@ class TaskTracker:
         self.date_label.configure(text=nav_str)
         
         # Add day indicator
-        if self.current_selected_date == date.today():
+        agenda_range = self.agenda_range()
+        if agenda_range:
+            start, end = agenda_range
+            display_text = f"🗓️ Agenda - {start.strftime('%a %b %d')} to {end.strftime('%a %b %d, %Y')}"
+        elif self.current_selected_date == date.today():
             display_text = f"📅 Today - {selected_str}"
         elif self.current_selected_date == date.today() - timedelta(days=1):
             display_text = f"📅 Yesterday - {selected_str}"
@@ -758,57 +1282,341 @@ class TaskTracker:
         # Clear existing widgets
         for widget in self.tasks_scrollable.winfo_children():
             widget.destroy()
+        self.task_frames.clear()
+        self.task_order.clear()
+        
+        # Expand recurring series for the viewed date
+        self.expand_recurring(self.current_selected_date)
+            
+        day = self.current_selected_date
+        source = self.archiver.source_for(day)
+        filter_type = self.filter_var.get()
+        search_tags, search_text = tag_index.split_search(self.search_term)
+        tags = list(dict.fromkeys(self.tag_filters + search_tags))
+        
+        self.update_tag_facets()
+        
+        # Overdue work spans all earlier days
+        if filter_type == "Overdue":
+            self.show_backlog(search_text, tags)
+            return
+            
+        # Agenda views cover a date range
+        agenda_range = self.agenda_range()
+        if agenda_range:
+            self.show_agenda(*agenda_range, filter_type, search_text, tags)
+            return
+        
+        # Unfiltered days load as a subtask forest in one recursive query
+        if filter_type == "All" and not self.search_term and not tags:
+            self.show_paged_list(
+                self.cached_pages(('tree', str(day), source), [(day, day)],
+                                  lambda after: self.hierarchy.fetch_tree_page(day, TASK_FIELDS, source, after)),
+                self.render_task_rows)
+            return
             
         # Build query based on filters and search
-        base_query = '''
-            SELECT id, title, description, priority, category, completed, 
-                   estimated_time, actual_time, tags, notes, progress
-            FROM tasks 
-            WHERE date_created = ? AND archived = 0
-        '''
-        params = [self.current_selected_date]
+        filter_clause, filter_params = self.task_filter_sql(filter_type, search_text, tags, source)
+        where = 'date_created = ? AND archived = 0' + filter_clause
+        params = [day] + filter_params
+            
+        # Ordered by priority and completion, one page at a time
+        self.show_paged_list(
+            self.cached_pages(('day', str(day), source, filter_type, search_text.lower(), tuple(sorted(tags))),
+                              [(day, day)],
+                              lambda after: task_queries.fetch_page(self.cursor, TASK_FIELDS + ('0',), where, params,
+                                                                    after=after, source=source)),
+            self.render_task_rows)
+        
+    def task_filter_sql(self, filter_type, search_text, tags, source='tasks'):
+        """WHERE fragment and params for the search, tag and status filters"""
+        clause = ''
+        params = []
         
         # Apply search filter
-        if self.search_term:
-            base_query += ' AND (title LIKE ? OR description LIKE ? OR tags LIKE ?)'
-            search_pattern = f'%{self.search_term}%'
+        if search_text:
+            clause += ' AND (title LIKE ? OR description LIKE ? OR tags LIKE ?)'
+            search_pattern = f'%{search_text}%'
             params.extend([search_pattern, search_pattern, search_pattern])
             
+        # Apply tag filter (all tags must match)
+        tag_clause, tag_params = tag_index.tag_filter_sql(tags, source)
+        clause += tag_clause
+        params.extend(tag_params)
+            
         # Apply status filter
-        filter_type = self.filter_var.get()
         if filter_type == "Completed":
-            base_query += ' AND completed = 1'
+            clause += ' AND completed = 1'
         elif filter_type == "Pending":
-            base_query += ' AND completed = 0'
+            clause += ' AND completed = 0'
         elif filter_type == "High Priority":
-            base_query += ' AND priority = "High"'
-        elif filter_type == "Overdue":
-            base_query += ' AND completed = 0 AND date_created < ?'
-            params.append(date.today())
-            
-        # Order by priority and completion
-        base_query += '''
-            ORDER BY 
-                CASE priority 
-                    WHEN 'High' THEN 1 
-                    WHEN 'Medium' THEN 2 
-                    WHEN 'Low' THEN 3 
-                END,
-                completed ASC,
-                progress DESC
-        '''
-        
-        self.cursor.execute(base_query, params)
-        tasks = self.cursor.fetchall()
+            clause += " AND priority = 'High'"
+        return clause, params
+        
+    def show_agenda(self, start, end, filter_type="All", search_text="", tags=()):
+        """List tasks for a date range from one range query, grouped by day"""
+        self.expand_recurring(start, end)
+        source = self.archiver.source_for(start)
+        
+        filter_clause, filter_params = self.task_filter_sql(filter_type, search_text, list(tags), source)
+        where = 'date_created BETWEEN ? AND ? AND archived = 0' + filter_clause
+        params = [start, end] + filter_params
         
+        self.agenda_day = None
+        
+        def fetch(after):
+            return task_queries.fetch_page(self.cursor, TASK_FIELDS + ('0',), where, params,
+                                           after=after, source=source,
+                                           order=('date_created',) + task_queries.TASK_ORDER)
+            
+        key = ('agenda', str(start), str(end), source, filter_type, search_text.lower(), tuple(sorted(tags)))
+        self.show_paged_list(self.cached_pages(key, [(start, end)], fetch), self.render_agenda_rows)
+        
+    def render_agenda_rows(self, rows):
+        """Render agenda rows under a heading per day"""
+        for row in rows:
+            task = self.tasks.load(row[:-1])
+            task_date = datetime.strptime(str(task.date_created), '%Y-%m-%d').date()
+            if task_date != self.agenda_day:
+                self.agenda_day = task_date
+                heading = task_date.strftime("%A, %B %d")
+                if task_date == date.today():
+                    heading = f"Today - {heading}"
+                day_label = ctk.CTkLabel(self.tasks_scrollable, text=f"📅 {heading}",
+                                       font=ctk.CTkFont(size=16, weight="bold"), anchor="w")
+                day_label.pack(fill="x", padx=10, pady=(15, 0))
+            self.create_enhanced_task_widget(task)
+            
+    def agenda_range(self):
+        """(start, end) of the current agenda view, or None in day view"""
+        selected = self.current_selected_date
+        if self.view_mode == "Week":
+            start = selected - timedelta(days=selected.weekday())
+            return start, start + timedelta(days=6)
+        if self.view_mode == "Next 7 Days":
+            return selected, selected + timedelta(days=6)
+        if self.view_mode == "Month":
+            last_day = calendar.monthrange(selected.year, selected.month)[1]
+            return selected.replace(day=1), selected.replace(day=last_day)
+        if self.view_mode == "Custom Range..." and self.custom_range:
+            return self.custom_range
+        return None
+        
+    def change_view(self, choice):
+        """Switch between the day view and agenda ranges"""
+        if choice == "Custom Range...":
+            dialog = ctk.CTkInputDialog(text="Date range (YYYY-MM-DD to YYYY-MM-DD):",
+                                      title="Custom Range")
+            text = (dialog.get_input() or "").replace(" to ", " ").split()
+            try:
+                if len(text) != 2:
+                    raise ValueError
+                start, end = sorted(datetime.strptime(part, '%Y-%m-%d').date() for part in text)
+            except ValueError:
+                messagebox.showwarning("Warning", "Please enter two dates like 2024-01-01 to 2024-01-31")
+                self.view_var.set(self.view_mode)
+                return
+            self.custom_range = (start, end)
+            
+        self.view_mode = choice
+        self.update_all_displays()
+        self.load_tasks()
+        
+    def show_backlog(self, search_text="", tags=()):
+        """List incomplete tasks from before today, newest first, grouped by age"""
+        where = 'completed = 0 AND archived = 0 AND date_created < ?'
+        params = [date.today()]
+        
+        if search_text:
+            where += ' AND (title LIKE ? OR description LIKE ? OR tags LIKE ?)'
+            params.extend([f'%{search_text}%'] * 3)
+            
+        tag_clause, tag_params = tag_index.tag_filter_sql(list(tags))
+        where += tag_clause
+        params.extend(tag_params)
+        
+        self.backlog_group = None
+        
+        def fetch(after):
+            return task_queries.fetch_page(self.cursor, TASK_FIELDS + ('0',), where, params,
+                                           after=after, source='tasks INDEXED BY idx_tasks_backlog',
+                                           order=('date_created', 'id'), descending=True)
+            
+        today = date.today()
+        key = ('backlog', str(today), search_text.lower(), tuple(sorted(tags)))
+        self.show_paged_list(self.cached_pages(key, [(None, today - timedelta(days=1))], fetch),
+                             self.render_backlog_rows)
+        
+    def render_backlog_rows(self, rows):
+        """Render backlog rows under age headings"""
+        for row in rows:
+            task = self.tasks.load(row[:-1])
+            task_date = datetime.strptime(str(task.date_created), '%Y-%m-%d').date()
+            group = self.backlog_age_group((date.today() - task_date).days)
+            if group != self.backlog_group:
+                self.backlog_group = group
+                group_label = ctk.CTkLabel(self.tasks_scrollable, text=group,
+                                         font=ctk.CTkFont(size=16, weight="bold"), anchor="w")
+                group_label.pack(fill="x", padx=10, pady=(15, 0))
+            self.create_enhanced_task_widget(task)
+            
+    @staticmethod
+    def backlog_age_group(age_days):
+        """Heading for a backlog task that is age_days old"""
+        if age_days <= 1:
+            return "⏰ Yesterday"
+        if age_days <= 7:
+            return "📆 Earlier this week"
+        if age_days <= 30:
+            return "🗓️ Earlier this month"
+        return "🕸️ Older than a month"
+        
+    # Query cache
+    def cached_pages(self, key, ranges, fetch_page):
+        """Wrap a page fetcher so repeated pages are served from the query cache"""
+        def fetch(after):
+            page_key = key + (after,)
+            page = self.query_cache.get(page_key)
+            if page is None:
+                page = fetch_page(after)
+                self.query_cache.put(page_key, page, ranges, ids=[row[0] for row in page[0]])
+            return page
+        return fetch
+        
+    def invalidate_tasks(self, task_ids):
+        """Drop cached results that hold these tasks or cover their dates"""
+        dates = {self.tasks.get(task_id).date_created for task_id in task_ids if task_id in self.tasks}
+        self.query_cache.invalidate(dates=dates, ids=task_ids)
+        
+    def expand_recurring(self, start, end=None):
+        """Materialize recurring occurrences for viewed dates"""
+        if self.recurrence.materialize(start, end):
+            self.query_cache.invalidate(date_range=(start, end or start))
+            
+    # External changes
+    def visible_range(self):
+        """(start, end) of the dates the task list shows; None means open-ended"""
+        if self.filter_var.get() == "Overdue":
+            return None, date.today() - timedelta(days=1)
+        return self.agenda_range() or (self.current_selected_date, self.current_selected_date)
+        
+    def schedule_change_watch(self, delay_ms=2000):
+        """Schedule the next external change poll"""
+        self.root.after(delay_ms, self.watch_external_changes)
+        
+    def watch_external_changes(self):
+        """Refresh only the views touched by commits from other connections"""
+        try:
+            changes = self.change_watcher.poll()
+        except sqlite3.Error:
+            changes = None
+            
+        if changes is not None:
+            self.apply_external_changes(changes)
+        self.schedule_change_watch()
+        
+    def apply_external_changes(self, changes):
+        # The rollup rows other connections wrote are not tracked per period
+        self.period_analytics.clear()
+        if changes.full:
+            self.query_cache.clear()
+            self.reminders.reload()
+            self.load_tasks()
+            self.update_timer_task_list()
+            self.create_calendar_grid()
+            return
+            
+        self.query_cache.invalidate(dates=changes.dates, ids=changes.task_ids)
+        self.reminders.refresh(changes.task_ids)
+        
+        start, end = (None if day is None else str(day) for day in self.visible_range())
+        in_view = any((start is None or start <= day) and day <= end for day in changes.dates)
+        if in_view or any(task_id in self.tasks for task_id in changes.task_ids):
+            self.load_tasks()
+            
+        if str(self.current_selected_date) in changes.dates:
+            self.update_timer_task_list()
+            
+        month = self.current_selected_date.strftime('%Y-%m')
+        if any(day.startswith(month) for day in changes.dates):
+            self.create_calendar_grid()
+            
+    # Paginated task list
+    def show_paged_list(self, fetch_page, render_rows):
+        """Start a list whose pages load as the user scrolls
+
+        fetch_page(after) returns (rows, next_cursor); render_rows appends rows.
+        """
+        self.page_generation += 1
+        self.tasks.clear()  # The map only holds tasks of the list on screen
+        self.page_fetch = fetch_page
+        self.page_render = render_rows
+        self.page_cursor = None
+        self.page_has_more = True
+        self.load_next_page(self.page_generation)
+        
+    def load_next_page(self, generation):
+        """Append the next page of the current list"""
+        self.page_pending = False
+        if generation != self.page_generation or not self.page_has_more:
+            return
+            
+        first_page = self.page_cursor is None
+        rows, self.page_cursor = self.page_fetch(self.page_cursor)
+        self.page_has_more = self.page_cursor is not None
+        
+        if first_page and not rows:
+            self.render_task_rows([])
+        else:
+            self.page_render(rows)
+            
+    def on_tasks_scrolled(self, first, last):
+        """Scrollbar callback of the task list; loads more rows near the bottom"""
+        self.tasks_scrollbar.set(first, last)
+        if self.page_has_more and not self.page_pending and float(last) >= 0.9:
+            self.page_pending = True
+            generation = self.page_generation
+            self.root.after_idle(lambda: self.load_next_page(generation))
+            
+    def update_tag_facets(self):
+        """Show tag buttons with task counts for the selected date or agenda range"""
+        for widget in self.tag_facets_frame.winfo_children():
+            widget.destroy()
+            
+        start, end = self.agenda_range() or (self.current_selected_date, self.current_selected_date)
+        facets = tag_index.facet_counts(self.cursor, start, end)
+        shown = {tag for tag, _ in facets}
+        facets += [(tag, 0) for tag in self.tag_filters if tag not in shown]
+        
+        for index, (tag, count) in enumerate(facets):
+            active = tag in self.tag_filters
+            tag_btn = ctk.CTkButton(self.tag_facets_frame, text=f"#{tag} ({count})", height=24,
+                                  command=lambda t=tag: self.toggle_tag_filter(t),
+                                  fg_color="blue" if active else "gray30",
+                                  hover_color="darkblue" if active else "gray40",
+                                  corner_radius=12, font=ctk.CTkFont(size=11))
+            tag_btn.grid(row=index // 2, column=index % 2, padx=2, pady=2, sticky="ew")
+            
+        self.tag_facets_frame.grid_columnconfigure((0, 1), weight=1)
+        
+    def toggle_tag_filter(self, tag):
+        """Add or remove a tag from the active tag filter"""
+        if tag in self.tag_filters:
+            self.tag_filters.remove(tag)
+        else:
+            self.tag_filters.append(tag)
+        self.load_tasks()
+        
+    def render_task_rows(self, tasks):
+        """Render task rows, or a placeholder when there are none"""
         if not tasks:
             no_tasks_label = ctk.CTkLabel(self.tasks_scrollable, 
                                         text="🎯 No tasks found.\nTry adjusting your filters or add some tasks!", 
                                         font=ctk.CTkFont(size=16))
             no_tasks_label.pack(pady=50)
         else:
-            for task in tasks:
-                self.create_enhanced_task_widget(task)
+            for row in tasks:
+                self.create_enhanced_task_widget(self.tasks.load(row[:-1]), depth=row[-1])
                 
     def update_quick_stats(self):
         """Update quick statistics in header"""
@@ -817,23 +1625,42 @@ class TaskTracker:
             widget.destroy()
             
         # Get stats for current date
-        self.cursor.execute('''
-            SELECT 
-                COUNT(*) as total,
-                SUM(completed) as completed,
-                SUM(estimated_time) as total_time,
-                AVG(CASE WHEN completed = 1 AND actual_time > 0 
-                    THEN (estimated_time * 1.0 / actual_time) ELSE NULL END) as efficiency
-            FROM tasks 
-            WHERE date_created = ? AND archived = 0
-        ''', (self.current_selected_date,))
-        
-        result = self.cursor.fetchone()
+        day = self.current_selected_date
+        self.expand_recurring(day)
+        source = self.archiver.source_for(day)
+        
+        result = self.query_cache.get(('stats', str(day), source))
+        if result is None:
+            self.cursor.execute(f'''
+                SELECT 
+                    COUNT(*) as total,
+                    SUM(completed) as completed,
+                    SUM(estimated_time) as total_time,
+                    AVG(CASE WHEN completed = 1 AND actual_time > 0 
+                        THEN (estimated_time * 1.0 / actual_time) ELSE NULL END) as efficiency
+                FROM {source} 
+                WHERE date_created = ? AND archived = 0
+            ''', (day,))
+            result = self.cursor.fetchone()
+            self.query_cache.put(('stats', str(day), source), result, [(day, day)])
+            
         total = result[0] if result[0] else 0
         completed = result[1] if result[1] else 0
         total_time = result[2] if result[2] else 0
         efficiency = result[3] if result[3] else 1.0
         
+        # Time the open tasks will likely still take, per the estimate model
+        open_rows = self.query_cache.get(('open', str(day), source))
+        if open_rows is None:
+            self.cursor.execute(f'''
+                SELECT estimated_time, actual_time, category, priority, tags
+                FROM {source}
+                WHERE date_created = ? AND completed = 0 AND archived = 0
+            ''', (day,))
+            open_rows = self.cursor.fetchall()
+            self.query_cache.put(('open', str(day), source), open_rows, [(day, day)])
+        planned_left, expected_left = self.estimates.forecast(open_rows)
+        
         # Create compact stats display
         if total > 0:
             completion_rate = (completed / total) * 100
@@ -854,6 +1681,13 @@ class TaskTracker:
                 eff_label = ctk.CTkLabel(self.quick_stats_frame, text=eff_text,
                                        font=ctk.CTkFont(size=12), text_color=eff_color)
                 eff_label.pack(side="left", padx=10, pady=8)
+                
+            if self.estimates.ready and expected_left != planned_left:
+                forecast_text = f"📈 ~{expected_left // 60}h{expected_left % 60:02d}m left likely"
+                forecast_label = ctk.CTkLabel(self.quick_stats_frame, text=forecast_text,
+                                            font=ctk.CTkFont(size=12),
+                                            text_color="orange" if expected_left > planned_left else "green")
+                forecast_label.pack(side="left", padx=10, pady=8)
         else:
             no_stats_label = ctk.CTkLabel(self.quick_stats_frame, text="📊 No tasks for today",
                                         font=ctk.CTkFont(size=14))
@@ -862,13 +1696,17 @@ class TaskTracker:
     # Timer functionality
     def update_timer_task_list(self):
         """Update the task list for timer selection"""
-        self.cursor.execute('''
-            SELECT id, title FROM tasks 
-            WHERE date_created = ? AND completed = 0 AND archived = 0
-            ORDER BY priority DESC
-        ''', (self.current_selected_date,))
-        
-        tasks = self.cursor.fetchall()
+        day = self.current_selected_date
+        tasks = self.query_cache.get(('timer', str(day)))
+        if tasks is None:
+            self.cursor.execute('''
+                SELECT id, title FROM tasks 
+                WHERE date_created = ? AND completed = 0 AND archived = 0
+                ORDER BY priority DESC
+            ''', (day,))
+            tasks = self.cursor.fetchall()
+            self.query_cache.put(('timer', str(day)), tasks, [(day, day)], ids=[task[0] for task in tasks])
+            
         task_options = ["No task selected"] + [f"{task[1]} (ID: {task[0]})" for task in tasks]
         
         self.timer_task_menu.configure(values=task_options)
@@ -878,8 +1716,7 @@ class TaskTracker:
         self.timer_task_id = task_id
         
         # Get task title
-        self.cursor.execute('SELECT title FROM tasks WHERE id = ?', (task_id,))
-        task_title = self.cursor.fetchone()[0]
+        task_title = self.tasks.get(task_id).title
         
         # Set timer task selection
         self.timer_task_var.set(f"{task_title} (ID: {task_id})")
@@ -888,114 +1725,166 @@ class TaskTracker:
         self.tab_view.set("⏱️ Timer")
         
         # Start timer if not running
-        if not self.timer_running:
-            self.toggle_timer()
+        if not self.focus_timer.is_active:
+            self.start_timer()
             
     def toggle_timer(self):
-        """Toggle timer start/stop"""
-        if not self.timer_running:
-            self.start_timer()
+        """Toggle timer start/pause/resume"""
+        if self.focus_timer.is_running:
+            self.focus_timer.pause()
+            self.session_checkpoint.pause(self.focus_timer.elapsed())
+            self.keep_session_alive()
+            self.cancel_overrun()
+            self.start_timer_btn.configure(text="▶️ Resume")
+        elif self.focus_timer.is_paused:
+            self.session_checkpoint.resume(self.focus_timer.elapsed())
+            self.focus_timer.resume()
+            self.watch_overrun()
+            self.start_timer_btn.configure(text="⏸️ Pause")
         else:
-            self.stop_timer()
+            self.start_timer()
             
     def start_timer(self):
         """Start the focus timer"""
-        self.timer_running = True
-        self.timer_start_time = time.time()
+        self.timer_started_at = datetime.now()
         
         # Get selected task ID if any
         task_selection = self.timer_task_var.get()
         if "ID: " in task_selection:
             self.timer_task_id = int(task_selection.split("ID: ")[1].split(")")[0])
         
+        duration_seconds = int(self.timer_duration.get() * 60)
+        self.session_checkpoint.begin(self.timer_task_id, duration_seconds, self.timer_started_at)
+        
         self.start_timer_btn.configure(text="⏸️ Pause")
-        self.update_timer()
+        self.focus_timer.start(duration_seconds)
+        self.watch_overrun()
         
     def stop_timer(self):
         """Stop the timer and log time"""
-        if self.timer_running and self.timer_start_time:
-            elapsed_time = int(time.time() - self.timer_start_time)
-            
-            # Log time if task is selected
-            if self.timer_task_id:
-                self.log_work_time(self.timer_task_id, elapsed_time)
+        if self.focus_timer.is_active:
+            self.finish_session(self.focus_timer.stop())
             
-            self.timer_running = False
-            self.start_timer_btn.configure(text="▶️ Start")
-            
-            # Show completion notification
-            messagebox.showinfo("Timer Complete", 
-                              f"Focus session complete!\nTime worked: {elapsed_time // 60}:{elapsed_time % 60:02d}")
+    def on_timer_finished(self, elapsed_time):
+        """Called by the timer engine when the countdown reaches zero"""
+        self.timer_display.configure(text="00:00")
+        self.finish_session(elapsed_time)
+        
+    def finish_session(self, elapsed_time):
+        """Log a finished focus session and notify the user"""
+        elapsed_time = int(elapsed_time)
+        
+        self.cancel_overrun()
+        
+        # Log time if task is selected; the checkpoint is dropped in the same commit
+        self.session_checkpoint.close()
+        if self.timer_task_id:
+            self.log_work_time(self.timer_task_id, elapsed_time)
+        else:
+            self.conn.commit()
+        
+        self.start_timer_btn.configure(text="▶️ Start")
+        
+        # Show completion notification
+        messagebox.showinfo("Timer Complete", 
+                          f"Focus session complete!\nTime worked: {elapsed_time // 60}:{elapsed_time % 60:02d}")
             
     def reset_timer(self):
         """Reset timer to default duration"""
-        self.timer_running = False
-        self.timer_start_time = None
+        self.focus_timer.reset()
+        self.session_checkpoint.discard()
+        self.cancel_overrun()
+        self.timer_started_at = None
         self.start_timer_btn.configure(text="▶️ Start")
         self.update_timer_display()
         
-    def update_timer(self):
-        """Update timer display while running"""
-        if self.timer_running and self.timer_start_time:
-            elapsed = time.time() - self.timer_start_time
-            duration_seconds = int(self.timer_duration.get() * 60)
-            remaining = max(0, duration_seconds - elapsed)
-            
-            minutes = int(remaining // 60)
-            seconds = int(remaining % 60)
-            
-            self.timer_display.configure(text=f"{minutes:02d}:{seconds:02d}")
+    def watch_overrun(self):
+        """Schedule an alert for when this session takes the task past its estimate"""
+        if not self.timer_task_id:
+            return
+        task = self.tasks.get(self.timer_task_id)
+        if task is None or not task.estimated_time:
+            return
+        budget = (task.estimated_time - (task.actual_time or 0)) * 60 - self.focus_timer.elapsed()
+        self.overrun_task_id = self.timer_task_id
+        self.reminders.watch_overrun(self.timer_task_id, time.time() + max(0, budget))
+        
+    def cancel_overrun(self):
+        if self.overrun_task_id:
+            self.reminders.cancel_overrun(self.overrun_task_id)
+            self.overrun_task_id = None
             
-            if remaining <= 0:
-                self.stop_timer()
-            else:
-                # Schedule next update
-                self.root.after(1000, self.update_timer)
+    def update_timer_label(self, remaining_seconds):
+        """Update the countdown label; called once per second while running"""
+        minutes, seconds = divmod(remaining_seconds, 60)
+        self.timer_display.configure(text=f"{minutes:02d}:{seconds:02d}")
+        self.session_checkpoint.beat(self.focus_timer.elapsed())
+                
+    def keep_session_alive(self):
+        """Heartbeat a paused session so other windows don't recover it"""
+        if self.session_keepalive is not None:
+            self.root.after_cancel(self.session_keepalive)
+            self.session_keepalive = None
+        if self.focus_timer.is_paused:
+            self.session_checkpoint.beat(self.focus_timer.elapsed())
+            self.session_keepalive = self.root.after(self.session_checkpoint.interval * 1000,
+                                                     self.keep_session_alive)
                 
     def update_timer_display(self, value=None):
         """Update timer display with current duration setting"""
-        if not self.timer_running:
+        if not self.focus_timer.is_active:
             duration = int(self.timer_duration.get())
             self.timer_display.configure(text=f"{duration:02d}:00")
             
     def log_work_time(self, task_id, duration_seconds):
         """Log work time for a task"""
-        # Insert time log
-        self.cursor.execute('''
-            INSERT INTO time_logs (task_id, start_time, end_time, duration, notes)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (task_id, 
-              datetime.fromtimestamp(self.timer_start_time),
-              datetime.now(),
-              duration_seconds,
-              "Focus timer session"))
-        
-        # Update task actual time
-        self.cursor.execute('''
-            UPDATE tasks 
-            SET actual_time = actual_time + ?
-            WHERE id = ?
-        ''', (duration_seconds // 60, task_id))
+        with self.history.action("Log focus time"):
+            # Insert time log
+            self.cursor.execute('''
+                INSERT INTO time_logs (task_id, start_time, end_time, duration, notes)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (task_id, 
+                  self.timer_started_at or datetime.now(),
+                  datetime.now(),
+                  duration_seconds,
+                  "Focus timer session"))
+        
+            # Update task actual time
+            self.cursor.execute('''
+                UPDATE tasks 
+                SET actual_time = actual_time + ?
+                WHERE id = ?
+            ''', (duration_seconds // 60, task_id))
+            changed = self.hierarchy.refresh(task_id)
         
         self.conn.commit()
+        self.invalidate_tasks([task_id] + changed)
+        self.tasks.refresh(changed)
         self.load_tasks()  # Refresh task display
         
     # Enhanced task operations
     def toggle_enhanced_task(self, task_id):
         """Toggle task completion with time tracking"""
-        self.cursor.execute('SELECT completed FROM tasks WHERE id = ?', (task_id,))
-        current_status = self.cursor.fetchone()[0]
+        current_status = self.tasks.get(task_id).completed
         
         new_status = 1 if current_status == 0 else 0
         completion_date = date.today() if new_status == 1 else None
         
-        self.cursor.execute('''
-            UPDATE tasks 
-            SET completed = ?, date_completed = ?, progress = ?
-            WHERE id = ?
-        ''', (new_status, completion_date, 100 if new_status == 1 else 0, task_id))
+        with self.history.action("Complete task" if new_status else "Reopen task"):
+            self.cursor.execute('''
+                UPDATE tasks 
+                SET completed = ?, date_completed = ?, progress = ?
+                WHERE id = ?
+            ''', (new_status, completion_date, 100 if new_status == 1 else 0, task_id))
+            changed = self.hierarchy.refresh(task_id)
         
         self.conn.commit()
+        self.tasks.update(task_id, completed=new_status, progress=100 if new_status == 1 else 0)
+        if new_status:
+            self.estimates.refit_async()
+        self.reminders.refresh([task_id])
+        self.invalidate_tasks([task_id] + changed)
+        self.tasks.refresh(changed)
         self.load_tasks()
         self.update_quick_stats()
         
@@ -1006,19 +1895,14 @@ class TaskTracker:
     def open_task_editor(self, task_id):
         """Open task editing window"""
         # Get current task data
-        self.cursor.execute('''
-            SELECT title, description, priority, category, estimated_time, tags, notes, progress
-            FROM tasks WHERE id = ?
-        ''', (task_id,))
-        
-        task_data = self.cursor.fetchone()
-        if not task_data:
+        task = self.tasks.get(task_id)
+        if not task:
             return
             
         # Create edit window
         edit_window = ctk.CTkToplevel(self.root)
         edit_window.title("Edit Task")
-        edit_window.geometry("500x600")
+        edit_window.geometry("500x660")
         edit_window.transient(self.root)
         edit_window.grab_set()
         
@@ -1028,14 +1912,14 @@ class TaskTracker:
         
         title_entry = ctk.CTkEntry(edit_window, height=35, corner_radius=8)
         title_entry.pack(fill="x", padx=20, pady=5)
-        title_entry.insert(0, task_data[0])
+        title_entry.insert(0, task.title)
         
         desc_label = ctk.CTkLabel(edit_window, text="Description:", font=ctk.CTkFont(size=14, weight="bold"))
         desc_label.pack(pady=(15, 5))
         
         desc_text = ctk.CTkTextbox(edit_window, height=80, corner_radius=8)
         desc_text.pack(fill="x", padx=20, pady=5)
-        desc_text.insert("1.0", task_data[1] or "")
+        desc_text.insert("1.0", task.description or "")
         
         # Priority and category
         row_frame = ctk.CTkFrame(edit_window, corner_radius=8)
@@ -1044,7 +1928,7 @@ class TaskTracker:
         priority_label = ctk.CTkLabel(row_frame, text="Priority:", font=ctk.CTkFont(size=14))
         priority_label.pack(side="left", padx=5, pady=10)
         
-        priority_var = ctk.StringVar(value=f"⚡ {task_data[2]}")
+        priority_var = ctk.StringVar(value=f"⚡ {task.priority}")
         priority_menu = ctk.CTkOptionMenu(row_frame, variable=priority_var,
                                         values=["🔥 High", "⚡ Medium", "🟢 Low"])
         priority_menu.pack(side="left", padx=10, pady=10)
@@ -1052,9 +1936,9 @@ class TaskTracker:
         category_label = ctk.CTkLabel(row_frame, text="Category:", font=ctk.CTkFont(size=14))
         category_label.pack(side="left", padx=5, pady=10)
         
-        category_var = ctk.StringVar(value=task_data[3])
+        category_var = ctk.StringVar(value=task.category)
         category_menu = ctk.CTkOptionMenu(row_frame, variable=category_var,
-                                        values=["General", "Work", "Personal", "Health", "Learning", "Shopping"])
+                                        values=CATEGORIES)
         category_menu.pack(side="left", padx=10, pady=10)
         
         # Time and tags
@@ -1066,14 +1950,25 @@ class TaskTracker:
         
         time_entry = ctk.CTkEntry(time_frame, width=80, height=35)
         time_entry.pack(side="left", padx=10, pady=10)
-        time_entry.insert(0, str(task_data[4]))
+        time_entry.insert(0, str(task.estimated_time))
         
         tags_label = ctk.CTkLabel(time_frame, text="Tags:", font=ctk.CTkFont(size=14))
         tags_label.pack(side="left", padx=5, pady=10)
         
         tags_entry = ctk.CTkEntry(time_frame, height=35)
         tags_entry.pack(side="right", fill="x", expand=True, padx=10, pady=10)
-        tags_entry.insert(0, task_data[5] or "")
+        tags_entry.insert(0, task.tags or "")
+        
+        # Due time
+        due_frame = ctk.CTkFrame(edit_window, corner_radius=8)
+        due_frame.pack(fill="x", padx=20, pady=(0, 10))
+        
+        due_label = ctk.CTkLabel(due_frame, text="⏰ Due (YYYY-MM-DD HH:MM):", font=ctk.CTkFont(size=14))
+        due_label.pack(side="left", padx=5, pady=10)
+        
+        due_entry = ctk.CTkEntry(due_frame, width=160, height=35)
+        due_entry.pack(side="left", padx=10, pady=10)
+        due_entry.insert(0, str(task.due_at or "")[:16])
         
         # Progress slider
         progress_label = ctk.CTkLabel(edit_window, text="Progress:", font=ctk.CTkFont(size=14, weight="bold"))
@@ -1081,9 +1976,16 @@ class TaskTracker:
         
         progress_slider = ctk.CTkSlider(edit_window, from_=0, to=100, number_of_steps=20)
         progress_slider.pack(fill="x", padx=20, pady=5)
-        progress_slider.set(task_data[7] or 0)
+        progress_slider.set(task.progress or 0)
         
-        progress_value_label = ctk.CTkLabel(edit_window, text=f"{task_data[7] or 0}%")
+        # Parents take their progress from their subtasks
+        has_subtasks = self.hierarchy.has_children(task_id)
+        progress_text = f"{task.progress or 0}%"
+        if has_subtasks:
+            progress_slider.configure(state="disabled")
+            progress_text += " (from subtasks)"
+        
+        progress_value_label = ctk.CTkLabel(edit_window, text=progress_text)
         progress_value_label.pack(pady=5)
         
         def update_progress_label(value):
@@ -1097,7 +1999,7 @@ class TaskTracker:
         
         notes_text = ctk.CTkTextbox(edit_window, height=80, corner_radius=8)
         notes_text.pack(fill="x", padx=20, pady=5)
-        notes_text.insert("1.0", task_data[6] or "")
+        notes_text.insert("1.0", task.notes or "")
         
         # Buttons
         button_frame = ctk.CTkFrame(edit_window, corner_radius=8)
@@ -1114,18 +2016,30 @@ class TaskTracker:
             new_category = category_var.get()
             new_time = int(time_entry.get() or "30")
             new_tags = tags_entry.get().strip()
-            new_progress = int(progress_slider.get())
+            new_progress = task.progress if has_subtasks else int(progress_slider.get())
             new_notes = notes_text.get("1.0", "end-1c").strip()
+            new_due = due_entry.get().strip() or None
+            if new_due and reminders.parse_due(new_due) is None:
+                messagebox.showwarning("Warning", "Due time must look like 2024-01-31 14:30")
+                return
             
-            self.cursor.execute('''
-                UPDATE tasks 
-                SET title=?, description=?, priority=?, category=?, estimated_time=?, 
-                    tags=?, notes=?, progress=?
-                WHERE id=?
-            ''', (new_title, new_desc, new_priority, new_category, new_time, 
-                  new_tags, new_notes, new_progress, task_id))
+            with self.history.action(f"Edit '{new_title}'"):
+                self.cursor.execute('''
+                    UPDATE tasks 
+                    SET title=?, description=?, priority=?, category=?, estimated_time=?, 
+                        tags=?, notes=?, progress=?, due_at=?
+                    WHERE id=?
+                ''', (new_title, new_desc, new_priority, new_category, new_time, 
+                      new_tags, new_notes, new_progress, new_due, task_id))
+                changed = self.hierarchy.refresh(task_id)
             
             self.conn.commit()
+            self.tasks.update(task_id, title=new_title, description=new_desc, priority=new_priority,
+                              category=new_category, estimated_time=new_time, tags=new_tags,
+                              notes=new_notes, progress=new_progress, due_at=new_due)
+            self.reminders.refresh([task_id])
+            self.invalidate_tasks([task_id] + changed)
+            self.tasks.refresh(changed)
             edit_window.destroy()
             self.load_tasks()
             
@@ -1139,15 +2053,281 @@ class TaskTracker:
                                  fg_color="gray40", hover_color="gray50")
         cancel_btn.pack(side="right", padx=10, pady=10)
         
+        # Recurring occurrences can end their series
+        if self.recurrence.series_of(task_id):
+            def end_series():
+                if messagebox.askyesno("End Series", "Stop repeating this task after this date?"):
+                    with self.history.action("End series"):
+                        self.delete_tasks(self.recurrence.end_series(task_id) or [])
+                    self.conn.commit()
+                    edit_window.destroy()
+                    self.create_calendar_grid()
+                    
+            end_series_btn = ctk.CTkButton(button_frame, text="⏹️ End Series", 
+                                         command=end_series, height=40,
+                                         fg_color="orange", hover_color="darkorange")
+            end_series_btn.pack(side="right", padx=10, pady=10)
+        
+    def add_subtask(self, parent_id):
+        """Prompt for a subtask title and add it under a task"""
+        dialog = ctk.CTkInputDialog(text="Subtask title:", title="Add Subtask")
+        title = (dialog.get_input() or "").strip()
+        if not title:
+            return
+            
+        with self.history.action(f"Add subtask '{title}'"):
+            child_id = self.hierarchy.add_subtask(parent_id, title)
+        self.conn.commit()
+        self.invalidate_tasks([parent_id, child_id])
+        self.load_tasks()
+        self.update_timer_task_list()
+        
     def delete_task(self, task_id):
         """Delete a task with confirmation"""
-        if messagebox.askyesno("Confirm Delete", "Are you sure you want to delete this task?"):
-            self.cursor.execute('DELETE FROM tasks WHERE id = ?', (task_id,))
-            self.cursor.execute('DELETE FROM time_logs WHERE task_id = ?', (task_id,))
+        subtask_count = len(self.hierarchy.subtree_ids(task_id)) - 1
+        prompt = "Are you sure you want to delete this task?"
+        if subtask_count:
+            prompt = f"Are you sure you want to delete this task and its {subtask_count} subtask(s)?"
+            
+        if messagebox.askyesno("Confirm Delete", prompt):
+            self.delete_tasks([task_id])
+    
+    def delete_tasks(self, task_ids):
+        """Delete tasks with their subtasks and time logs as one action, commit and refresh the views"""
+        dates, removed = set(), []
+        with self.history.action("Delete task"):
+            for task_id in task_ids:
+                self.cursor.execute('SELECT date_created FROM tasks WHERE id = ?', (task_id,))
+                row = self.cursor.fetchone()
+                if row:
+                    dates.add(row[0])
+                removed.extend(self.hierarchy.delete_subtree(task_id))
+            for removed_id in removed:
+                self.archiver.forget(removed_id)
+                self.recurrence.skip(removed_id)
+        self.conn.commit()
+        self.query_cache.invalidate(dates=dates, ids=removed)
+        self.reminders.refresh(removed)
+        self.tasks.discard(removed)
+        self.load_tasks()
+        self.update_quick_stats()
+            
+    # Multi-selection and bulk actions
+    def toggle_selection(self, task_id):
+        if task_id in self.selected_task_ids:
+            self.selected_task_ids.discard(task_id)
+        else:
+            self.selected_task_ids.add(task_id)
+        self.selection_anchor = task_id
+        self.update_selection_display([task_id])
+    
+    def extend_selection(self, task_id):
+        """Select the rows between the last clicked task and this one"""
+        if self.selection_anchor not in self.task_order:
+            self.toggle_selection(task_id)
+            return
+        first, last = sorted((self.task_order.index(self.selection_anchor), self.task_order.index(task_id)))
+        rows = self.task_order[first:last + 1]
+        self.selected_task_ids.update(rows)
+        self.update_selection_display(rows)
+    
+    def select_all_tasks(self):
+        """Select every task loaded in the list"""
+        self.selected_task_ids.update(self.task_order)
+        self.update_selection_display(self.task_order)
+    
+    def clear_selection(self):
+        shown = [task_id for task_id in self.selected_task_ids if task_id in self.task_frames]
+        self.selected_task_ids.clear()
+        self.update_selection_display(shown)
+    
+    def update_selection_display(self, task_ids):
+        """Restyle only the given rows and show or hide the bulk action bar"""
+        for task_id in task_ids:
+            frame = self.task_frames.get(task_id)
+            if isinstance(frame, TaskRow):
+                frame.set_selected(task_id in self.selected_task_ids)
+            elif frame is not None:
+                frame.configure(border_width=2 if task_id in self.selected_task_ids else 0,
+                                border_color="#3b8ed0")
+        
+        if self.selected_task_ids:
+            self.bulk_count_label.configure(text=f"{len(self.selected_task_ids)} selected")
+            if not self.bulk_bar.winfo_ismapped():
+                self.bulk_bar.pack(fill="x", padx=15, pady=(0, 10), before=self.tasks_scrollable)
+        else:
+            self.bulk_bar.pack_forget()
+    
+    def run_bulk_action(self, label, write, new_date=None):
+        """Apply write(ids_json) to the selection as one action, commit and refresh once
+        
+        write runs inside the action's transaction and returns any further task
+        ids it touched (rollups, removed subtasks).
+        """
+        task_ids = sorted(self.selected_task_ids)
+        if not task_ids:
+            return
+        ids_json = json.dumps(task_ids)
+        self.cursor.execute('''
+            SELECT DISTINCT date_created FROM tasks WHERE id IN (SELECT value FROM json_each(?))
+        ''', (ids_json,))
+        dates = {row[0] for row in self.cursor.fetchall()}
+        if new_date is not None:
+            dates.add(str(new_date))
+        
+        try:
+            with self.history.action(label):
+                touched = write(ids_json)
             self.conn.commit()
-            self.load_tasks()
-            self.update_quick_stats()
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            messagebox.showerror("Bulk Action Failed", str(e))
+            return
+        
+        touched = task_ids + [task_id for task_id in touched if task_id not in self.selected_task_ids]
+        self.selected_task_ids.clear()
+        self.update_selection_display([])
+        self.query_cache.invalidate(dates=dates, ids=touched)
+        self.reminders.refresh(touched)
+        self.tasks.discard(touched)
+        self.update_all_displays()
+        self.load_tasks()
+        self.update_timer_task_list()
+    
+    def bulk_set_completed(self, completed):
+        """Complete or reopen every selected task"""
+        def write(ids_json):
+            self.cursor.execute('''
+                UPDATE tasks SET completed = ?, date_completed = ?, progress = ?
+                WHERE id IN (SELECT value FROM json_each(?))
+            ''', (int(completed), date.today() if completed else None, 100 if completed else 0, ids_json))
+            return self.hierarchy.refresh_many(json.loads(ids_json))
+        
+        count = len(self.selected_task_ids)
+        self.run_bulk_action(f"{'Complete' if completed else 'Reopen'} {count} task(s)", write)
+        if completed:
+            self.estimates.refit_async()
+    
+    def bulk_set_priority(self, priority):
+        """Give every selected task the chosen priority"""
+        self.bulk_priority_var.set("Priority")
+        
+        def write(ids_json):
+            self.cursor.execute('''
+                UPDATE tasks SET priority = ? WHERE id IN (SELECT value FROM json_each(?))
+            ''', (priority, ids_json))
+            return []
+        
+        self.run_bulk_action(f"Set priority of {len(self.selected_task_ids)} task(s)", write)
+    
+    def bulk_reschedule(self):
+        """Move every selected task to another date"""
+        if not self.selected_task_ids:
+            return
+        dialog = ctk.CTkInputDialog(text="Move selected tasks to (YYYY-MM-DD):", title="Move Tasks")
+        text = (dialog.get_input() or "").strip()
+        if not text:
+            return
+        try:
+            new_date = datetime.strptime(text, "%Y-%m-%d").date()
+        except ValueError:
+            messagebox.showerror("Invalid Date", "Please enter the date as YYYY-MM-DD")
+            return
+        
+        def write(ids_json):
+            self.cursor.execute('''
+                UPDATE tasks SET date_created = ? WHERE id IN (SELECT value FROM json_each(?))
+            ''', (new_date, ids_json))
+            return []
+        
+        self.run_bulk_action(f"Move {len(self.selected_task_ids)} task(s)", write, new_date=new_date)
+    
+    def bulk_delete(self):
+        """Delete every selected task and its subtasks after one confirmation"""
+        if not self.selected_task_ids:
+            return
+        count = len(self.selected_task_ids)
+        if not messagebox.askyesno("Confirm Delete",
+                                   f"Are you sure you want to delete {count} task(s) and their subtasks?"):
+            return
+        
+        def write(ids_json):
+            removed = self.hierarchy.delete_subtrees(json.loads(ids_json))
+            self.archiver.forget_many(removed)
+            self.recurrence.skip_many(removed)
+            return removed
+        
+        self.run_bulk_action(f"Delete {count} task(s)", write)
+    
+    # Reminders
+    def on_reminder(self, kind, task_id):
+        """Collect events fired together into one notification"""
+        if not self.pending_alerts:
+            self.root.after_idle(self.show_alerts)
+        self.pending_alerts.append((kind, task_id))
+        
+    def show_alerts(self):
+        alerts, self.pending_alerts = self.pending_alerts, []
+        if not self.notifications_enabled:
+            return
             
+        lines = []
+        for kind, task_id in alerts:
+            task = self.tasks.get(task_id)
+            if task is None:
+                continue
+            if kind == 'overrun':
+                lines.append(f"⏱️ Over estimate: {task.title} ({task.estimated_time}m)")
+            else:
+                lines.append(f"⏰ Due {str(task.due_at)[11:16]}: {task.title}")
+        if lines:
+            self.notify("Reminder", "\n".join(lines[:8] + ([f"…and {len(lines) - 8} more"] if len(lines) > 8 else [])))
+            
+    def notify(self, title, message, timeout_ms=10000):
+        """Non-blocking toast in the corner of the main window"""
+        toast = ctk.CTkToplevel(self.root)
+        toast.title(title)
+        toast.transient(self.root)
+        toast.attributes("-topmost", True)
+        x = self.root.winfo_rootx() + self.root.winfo_width() - 380
+        y = self.root.winfo_rooty() + 40
+        toast.geometry(f"360x{80 + 22 * message.count(chr(10))}+{max(0, x)}+{y}")
+        
+        label = ctk.CTkLabel(toast, text=message, justify="left", wraplength=330)
+        label.pack(fill="both", expand=True, padx=15, pady=(10, 5))
+        
+        dismiss_btn = ctk.CTkButton(toast, text="Dismiss", height=26, command=toast.destroy)
+        dismiss_btn.pack(pady=(0, 10))
+        
+        self.root.bell()
+        self.root.after(timeout_ms, lambda: toast.winfo_exists() and toast.destroy())
+        
+    # Undo/redo
+    def undo(self):
+        """Revert the most recent action"""
+        self.apply_history(self.history.undo())
+        
+    def redo(self):
+        """Reapply the most recently undone action"""
+        self.apply_history(self.history.redo())
+        
+    def apply_history(self, result):
+        """Refresh the views touched by an undo or redo"""
+        if result is None:
+            return
+        label, affected = result
+        if affected['tables'] & {'recurrence_rules', 'recurrence_occurrences'}:
+            self.recurrence.reload()
+        for task_id in affected['task_ids']:
+            self.hierarchy.refresh(task_id)
+        self.conn.commit()
+        
+        self.query_cache.invalidate(dates=affected['dates'], ids=affected['task_ids'])
+        self.reminders.refresh(affected['task_ids'])
+        self.load_tasks()
+        self.update_timer_task_list()
+        self.create_calendar_grid()
+        
     # Search functionality
     def on_search_change(self, event):
         """Handle search term changes"""
@@ -1210,6 +2390,12 @@ class TaskTracker:
             ctk.set_appearance_mode("dark")
             self.theme_mode = "dark"
         self.save_settings()
+        # Canvas colors do not follow the theme by themselves
+        self.update_focus_analytics()
+        self.update_year_heatmap()
+        for row in self.task_frames.values():
+            if isinstance(row, TaskRow):
+                row.draw()
         
     def export_data(self):
         """Export tasks to CSV"""
@@ -1224,7 +2410,7 @@ class TaskTracker:
                 self.cursor.execute('''
                     SELECT date_created, title, description, priority, category, 
                            completed, estimated_time, actual_time, tags, notes, progress
-                    FROM tasks ORDER BY date_created DESC
+                    FROM task_history ORDER BY date_created DESC
                 ''')
                 
                 tasks = self.cursor.fetchall()
@@ -1244,7 +2430,7 @@ class TaskTracker:
         """Open settings window"""
         settings_window = ctk.CTkToplevel(self.root)
         settings_window.title("Settings")
-        settings_window.geometry("400x300")
+        settings_window.geometry("400x600")
         settings_window.transient(self.root)
         settings_window.grab_set()
         
@@ -1267,10 +2453,67 @@ class TaskTracker:
                                         variable=auto_save_var)
         auto_save_check.pack(pady=10)
         
+        # Local API toggle
+        api_var = ctk.BooleanVar(value=self.api_enabled)
+        api_check = ctk.CTkCheckBox(settings_window, 
+                                  text="Enable local API (localhost:8766)",
+                                  variable=api_var)
+        api_check.pack(pady=10)
+        
+        # Task row renderer
+        canvas_rows_var = ctk.BooleanVar(value=self.task_rows == "canvas")
+        canvas_rows_check = ctk.CTkCheckBox(settings_window, 
+                                          text="Lightweight task rows (drawn on a canvas)",
+                                          variable=canvas_rows_var)
+        canvas_rows_check.pack(pady=10)
+        
+        # Archive horizon
+        archive_label = ctk.CTkLabel(settings_window, 
+                                   text="Archive completed tasks after (days, 0 = never):")
+        archive_label.pack(pady=(10, 2))
+        
+        archive_entry = ctk.CTkEntry(settings_window, width=80, height=30)
+        archive_entry.pack(pady=(0, 10))
+        archive_entry.insert(0, str(self.archive_horizon_days))
+        
+        # Sync server
+        sync_label = ctk.CTkLabel(settings_window, text="Sync server:")
+        sync_label.pack(pady=(10, 2))
+        
+        sync_entry = ctk.CTkEntry(settings_window, width=260, height=30)
+        sync_entry.pack(pady=(0, 10))
+        sync_entry.insert(0, self.sync_server)
+        
+        # Midnight rollover
+        rollover_label = ctk.CTkLabel(settings_window, text="Unfinished tasks at midnight:")
+        rollover_label.pack(pady=(10, 2))
+        
+        rollover_labels = {"off": "Leave them", "move": "Move to the new day", "copy": "Copy to the new day"}
+        rollover_var = ctk.StringVar(value=rollover_labels[self.rollover_policy])
+        rollover_menu = ctk.CTkOptionMenu(settings_window, variable=rollover_var,
+                                        values=list(rollover_labels.values()), width=200)
+        rollover_menu.pack(pady=(0, 10))
+        
         # Save button
         def save_settings():
             self.notifications_enabled = notifications_var.get()
             self.auto_save_enabled = auto_save_var.get()
+            try:
+                self.archive_horizon_days = max(0, int(archive_entry.get()))
+            except ValueError:
+                pass
+            self.archiver.horizon_days = self.archive_horizon_days
+            self.sync_server = sync_entry.get().strip() or self.sync_server
+            self.api_enabled = api_var.get()
+            self.rollover_policy = next(policy for policy, text in rollover_labels.items()
+                                        if text == rollover_var.get())
+            self.rollover.policy = self.rollover_policy
+            task_rows = "canvas" if canvas_rows_var.get() else "widgets"
+            if task_rows != self.task_rows:
+                self.task_rows = task_rows
+                self.load_tasks()
+            if self.api_enabled:
+                self.start_api()  # Disabling takes effect on restart
             self.save_settings()
             settings_window.destroy()
             
@@ -1293,20 +2536,124 @@ class TaskTracker:
             auto_save_thread = threading.Thread(target=auto_save_worker, daemon=True)
             auto_save_thread.start()
             
+    def sync_now(self):
+        """Sync with the configured server on a worker thread"""
+        if self.sync_result is not None:
+            return  # A sync is already running
+        self.conn.commit()
+        self.sync_btn.configure(state="disabled")
+        client = SyncClient('tasks_enhanced.db', self.sync_server, archive_path=self.archiver.archive_path)
+        self.sync_result = {}
+        
+        def sync_worker():
+            try:
+                self.sync_result['counts'] = client.sync()
+            except Exception as e:
+                self.sync_result['error'] = e
+            self.sync_result['changed'] = client.changed_ids
+            
+        threading.Thread(target=sync_worker, daemon=True).start()
+        self.root.after(200, self.check_sync)
+        
+    def check_sync(self):
+        """Wait for the sync worker, then report its result"""
+        result = self.sync_result
+        if 'changed' not in result:
+            self.root.after(200, self.check_sync)
+            return
+        self.sync_result = None
+        self.sync_btn.configure(state="normal")
+        
+        if 'error' in result:
+            messagebox.showerror("Sync Failed", f"Could not sync with {self.sync_server}:\n{result['error']}")
+            return
+            
+        # Merged rows change their ancestors' rollups; the watcher refreshes the views
+        for task_id in result['changed']:
+            self.hierarchy.refresh(task_id)
+        self.conn.commit()
+        changes = self.change_watcher.poll()
+        if changes is not None:
+            self.apply_external_changes(changes)
+        
+        pushed, pulled = result['counts']
+        if self.notifications_enabled:
+            messagebox.showinfo("Sync Complete", f"Sent {pushed} change(s), received {pulled} change(s)")
+            
+    def roll_over_day(self):
+        """Follow the day change: carry tasks over and refresh only what it touched"""
+        try:
+            previous, since, task_ids = self.rollover.roll(self.history)
+            self.conn.commit()
+        except sqlite3.Error:
+            self.conn.rollback()
+            return
+        today = self.rollover.today
+        
+        # A view left on the old today follows the clock
+        if self.current_selected_date == previous:
+            self.current_selected_date = today
+            
+        self.query_cache.invalidate(date_range=(min(since, previous), today), ids=task_ids)
+        self.reminders.refresh(task_ids)
+        self.update_all_displays()
+        self.load_tasks()
+        self.update_timer_task_list()
+        
+        if task_ids and self.notifications_enabled:
+            self.notify("New Day", f"🌅 Carried {len(task_ids)} unfinished task(s) over to today")
+            
+    def start_api(self):
+        """Serve the local JSON API on a background event loop"""
+        if self.api is not None:
+            return
+        self.conn.commit()
+        try:
+            self.api = api_server.start_in_thread('tasks_enhanced.db')
+        except OSError as e:
+            messagebox.showwarning("Local API", f"Could not start the local API:\n{e}")
+            
+    def schedule_estimate_refit(self, delay_ms=5 * 60 * 1000):
+        """Fold newly completed tasks into the estimate model now and every few minutes"""
+        self.estimates.refit_async()
+        self.root.after(delay_ms, self.schedule_estimate_refit)
+        
+    def schedule_archival(self, delay_ms=60000):
+        """Schedule the next archival pass"""
+        self.root.after(delay_ms, lambda: self.root.after_idle(self.run_archival))
+        
+    def run_archival(self):
+        """Archive one batch while the UI is idle, then yield back to the event loop"""
+        try:
+            moved = self.archiver.archive_batch()
+        except sqlite3.Error:
+            moved = 0
+            
+        if moved:
+            self.query_cache.invalidate(date_range=(None, self.archiver.watermark))
+            
+        if moved >= self.archiver.batch_size:
+            self.schedule_archival(100)  # More to move; continue on the next idle slot
+        else:
+            self.change_watcher.prune()
+            self.history.compact()
+            self.conn.commit()
+            self.schedule_archival(30 * 60 * 1000)
+            
     def update_analytics(self):
         """Update analytics displays"""
         # Weekly stats
         week_start = self.current_selected_date - timedelta(days=self.current_selected_date.weekday())
         week_end = week_start + timedelta(days=6)
         
-        self.cursor.execute('''
+        self.cursor.execute(f'''
             SELECT 
                 date_created,
                 COUNT(*) as total_tasks,
                 SUM(completed) as completed_tasks,
                 SUM(estimated_time) as estimated_time,
                 SUM(actual_time) as actual_time
-            FROM tasks 
+            FROM {self.archiver.source_for(week_start)} 
             WHERE date_created BETWEEN ? AND ? AND archived = 0
             GROUP BY date_created
             ORDER BY date_created
@@ -1360,6 +2707,158 @@ class TaskTracker:
                     
         # Update trends
         self.update_productivity_trends()
+        self.update_focus_analytics()
+        
+    # Focus analytics
+    FOCUS_CELL = (22, 20)
+    FOCUS_WEEKS = 12
+    
+    def update_focus_analytics(self):
+        """Redraw the focus heatmap, session histogram and summary"""
+        end = date.today()
+        start = end - timedelta(weeks=self.FOCUS_WEEKS) + timedelta(days=1)
+        self.focus_analytics.task_source = self.archiver.source_for(start)
+        self.focus_analytics.log_source = self.archiver.log_source_for(start)
+        
+        self.focus_grid = self.focus_analytics.heatmap(start, end)
+        stats = self.focus_analytics.session_stats(start, end)
+        colors = canvas_views.palette()
+        cell_w, cell_h = self.FOCUS_CELL
+        
+        canvas = self.focus_heatmap
+        canvas.delete("all")
+        canvas.configure(bg=colors["bg"])
+        peak = max(max(row) for row in self.focus_grid) or 1
+        for hour in range(0, 24, 3):
+            canvas.create_text(40 + hour * cell_w, 10, text=f"{hour:02d}", anchor="w",
+                               fill=colors["text"], font=("TkDefaultFont", 8))
+        for weekday, row in enumerate(self.focus_grid):
+            y = 20 + weekday * cell_h
+            canvas.create_text(4, y + cell_h / 2, text=focus_analytics.WEEKDAY_NAMES[weekday], anchor="w",
+                               fill=colors["text"], font=("TkDefaultFont", 9))
+            for hour, minutes in enumerate(row):
+                x = 40 + hour * cell_w
+                fill = canvas_views.shade(colors["fill"], colors["empty"], minutes / peak) if minutes else colors["empty"]
+                canvas.create_rectangle(x + 1, y + 1, x + cell_w - 1, y + cell_h - 1, fill=fill, width=0)
+        
+        # Session length histogram
+        canvas = self.focus_sessions
+        canvas.delete("all")
+        canvas.configure(bg=colors["bg"])
+        most = max(count for _, count in stats['bins']) or 1
+        bar_h = cell_h
+        for index, (label, count) in enumerate(stats['bins']):
+            y = 20 + index * bar_h
+            canvas.create_text(4, y + bar_h / 2, text=label, anchor="w", fill=colors["text"],
+                               font=("TkDefaultFont", 9))
+            width = int(180 * count / most)
+            if width:
+                canvas.create_rectangle(60, y + 3, 60 + width, y + bar_h - 3,
+                                        fill=canvas_views.shade(colors["fill"], colors["empty"], 1), width=0)
+            canvas.create_text(66 + width, y + bar_h / 2, text=str(count), anchor="w", fill=colors["text"],
+                               font=("TkDefaultFont", 9))
+        canvas.create_text(4, 10, text="Session length", anchor="w", fill=colors["text"],
+                           font=("TkDefaultFont", 8))
+        
+        # Summary
+        if stats['count']:
+            peaks = ", ".join(f"{day} {hour:02d}:00" for day, hour, _ in
+                              focus_analytics.peak_hours(self.focus_grid))
+            categories = ", ".join(f"{category} {minutes // 60}h{minutes % 60:02d}m" for category, minutes in
+                                   self.focus_analytics.by_category(start, end)[:4])
+            tasks = ", ".join(f"{title} ({minutes}m)" for _, title, minutes in
+                              self.focus_analytics.top_tasks(start, end, limit=3))
+            total = stats['total_minutes']
+            summary = (f"⏱️ {stats['count']} sessions, {total // 60}h{total % 60:02d}m total, "
+                       f"median {stats['median_minutes']:.0f}m\n"
+                       f"🔥 Peak hours: {peaks}\n📁 By category: {categories}\n📋 Most focused: {tasks}")
+        else:
+            summary = "No focus sessions in the last 12 weeks yet. Start the timer on a task to see patterns!"
+        self.focus_summary_label.configure(text=summary)
+    
+    def on_focus_heatmap_hover(self, event):
+        """Name the hour under the pointer without redrawing the heatmap"""
+        cell_w, cell_h = self.FOCUS_CELL
+        hour, weekday = (event.x - 40) // cell_w, (event.y - 20) // cell_h
+        if event.x < 40 or event.y < 20 or not (0 <= hour < 24 and 0 <= weekday < 7):
+            self.focus_detail_label.configure(text="")
+            return
+        minutes = self.focus_grid[weekday][hour]
+        self.focus_detail_label.configure(
+            text=f"{focus_analytics.WEEKDAY_NAMES[weekday]} {hour:02d}:00-{hour + 1:02d}:00 · "
+                 f"{minutes // 60}h{minutes % 60:02d}m over {self.FOCUS_WEEKS} weeks")
+    
+    def on_tab_changed(self):
+        """Recompute analytics and the year heatmap when their tab is opened"""
+        if self.tab_view.get() == "📊 Analytics":
+            self.update_analytics()
+        elif self.tab_view.get() == "📅 Calendar":
+            self.update_year_heatmap()
+    
+    @staticmethod
+    def describe_change(value, label):
+        """Text and color for a relative change between periods"""
+        if value is None:
+            return f"— nothing {label}", "gray60"
+        if value >= 0:
+            return f"▲ {value * 100:.0f}% {label}", "green"
+        return f"▼ {-value * 100:.0f}% {label}", "orange"
+        
+    def show_period_comparison(self):
+        """Week and month against the previous ones, rolling averages and streaks
+        
+        Returns today's rolling figures for the 30-day summary.
+        """
+        today = date.today()
+        week, = self.period_analytics.compare('week', today, today)
+        months_start = today.replace(day=1)
+        for _ in range(5):
+            months_start = period_analytics.previous_period(months_start, 'month')
+        months = self.period_analytics.compare('month', months_start, today)
+        rolling, = self.period_analytics.rolling(today, today)
+        streaks = self.period_analytics.streaks(today)
+        
+        period_frame = ctk.CTkFrame(self.trends_content, corner_radius=8)
+        period_frame.pack(fill="x", padx=15, pady=10)
+        
+        period_title = ctk.CTkLabel(period_frame, text="🔁 Period over Period", 
+                                  font=ctk.CTkFont(size=16, weight="bold"))
+        period_title.pack(pady=10)
+        
+        cards_frame = ctk.CTkFrame(period_frame, corner_radius=8)
+        cards_frame.pack(fill="x", padx=15, pady=(0, 5))
+        
+        week_change = self.describe_change(week['completed_change'], "vs last week")
+        month_change = self.describe_change(months[-1]['completed_change'], "vs last month")
+        cards = [
+            ("📅 This Week", f"{week['completed']} done", *week_change),
+            ("🗓️ This Month", f"{months[-1]['completed']} done", *month_change),
+            ("📈 7-Day Avg", f"{rolling['avg7_completed']:.1f}/day",
+             f"⏱️ {rolling['avg7_worked'] / 60:.0f}m focus/day", "gray60"),
+            ("📊 30-Day Avg", f"{rolling['avg30_completed']:.1f}/day",
+             f"⏱️ {rolling['avg30_worked'] / 60:.0f}m focus/day", "gray60"),
+            ("🔥 Streak", f"{streaks['current']} day(s)", f"Best: {streaks['longest']} day(s)", "gray60"),
+        ]
+        for title, value, detail, detail_color in cards:
+            card = ctk.CTkFrame(cards_frame, corner_radius=6)
+            card.pack(side="left", fill="x", expand=True, padx=5, pady=5)
+            
+            ctk.CTkLabel(card, text=title, font=ctk.CTkFont(size=12, weight="bold")).pack(pady=2)
+            ctk.CTkLabel(card, text=value, font=ctk.CTkFont(size=16), text_color="blue").pack(pady=2)
+            ctk.CTkLabel(card, text=detail, font=ctk.CTkFont(size=11), text_color=detail_color).pack(pady=2)
+            
+        # Six months side by side
+        month_texts = []
+        for month in months:
+            text = f"{month['start'].strftime('%b')} {month['completed']}"
+            if month['completed_change'] is not None:
+                text += f" ({month['completed_change'] * 100:+.0f}%)"
+            month_texts.append(text)
+        months_label = ctk.CTkLabel(period_frame, text="Completed by month:  " + "   ".join(month_texts),
+                                  font=ctk.CTkFont(size=11), text_color="gray60")
+        months_label.pack(pady=(0, 10))
+        
+        return rolling
         
     def update_productivity_trends(self):
         """Update productivity trends display"""
@@ -1367,18 +2866,20 @@ class TaskTracker:
         for widget in self.trends_content.winfo_children():
             widget.destroy()
             
+        rolling = self.show_period_comparison()
+            
         # Get last 30 days of data
         end_date = date.today()
         start_date = end_date - timedelta(days=29)
         
-        self.cursor.execute('''
+        self.cursor.execute(f'''
             SELECT 
                 date_created,
                 COUNT(*) as total_tasks,
                 SUM(completed) as completed_tasks,
                 AVG(CASE WHEN completed = 1 AND actual_time > 0 AND estimated_time > 0
                     THEN (estimated_time * 1.0 / actual_time) ELSE NULL END) as avg_efficiency
-            FROM tasks 
+            FROM {self.archiver.source_for(start_date)} 
             WHERE date_created BETWEEN ? AND ? AND archived = 0
             GROUP BY date_created
             ORDER BY date_created DESC
@@ -1389,10 +2890,11 @@ class TaskTracker:
         
         if trend_data:
             # Create trend summary
-            total_days = len(trend_data)
-            avg_tasks_per_day = sum(row[1] for row in trend_data) / total_days
-            avg_completion_rate = sum((row[2] or 0) / row[1] * 100 for row in trend_data) / total_days
-            avg_efficiency = sum(row[3] for row in trend_data if row[3]) / len([r for r in trend_data if r[3]]) if any(row[3] for row in trend_data) else 1.0
+            # Averages over all 30 calendar days, from the rolling window
+            avg_tasks_per_day = rolling['created30'] / 30
+            avg_completion_rate = rolling['planned30'] / rolling['created30'] * 100 if rolling['created30'] else 0
+            efficiencies = [row[3] for row in trend_data if row[3]]
+            avg_efficiency = sum(efficiencies) / len(efficiencies) if efficiencies else 1.0
             
             # Summary stats
             summary_frame = ctk.CTkFrame(self.trends_content, corner_radius=8)
@@ -1487,16 +2989,23 @@ class TaskTracker:
         self.load_tasks()
         self.update_timer_task_list()
         self.update_analytics()
+        self.update_year_heatmap()
         
         # Set up periodic updates
         def periodic_update():
-            if self.timer_running:
-                self.update_timer()
+            if self.rollover.day_changed():
+                self.roll_over_day()
             self.update_quick_stats()
             # Schedule next update
             self.root.after(1000, periodic_update)
             
         periodic_update()
+        self.schedule_archival()
+        self.schedule_estimate_refit()
+        self.schedule_change_watch()
+        self.reminders.start()
+        if self.api_enabled:
+            self.start_api()
         
         # Handle window closing
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
@@ -1506,6 +3015,11 @@ class TaskTracker:
         
     def on_closing(self):
         """Handle application closing"""
+        # Log a running focus session instead of dropping it
+        if self.focus_timer.is_active:
+            self.session_checkpoint.pause(self.focus_timer.stop())
+            self.session_checkpoint.recover(own=True)
+        
         # Save any pending changes
         self.save_settings()
         self.conn.commit()
@@ -0,0 +1,113 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import daily_rollup
+import focus_analytics
+from archiver import TaskArchiver
+from change_log import ChangeLog
+from estimate_model import EstimateModel
+from period_analytics import PeriodAnalytics
+from query_cache import QueryCache
+from recurrence import RecurrenceEngine
+from reminders import ReminderScheduler
+from subtasks import TaskHierarchy
+from task_model import TaskMap
+from task_tracker import TaskTracker
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class FakeScheduler:
+    """root.after stand-in driven by a FakeClock"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.pending = {}  # handle -> (due, callback)
+        self.delays = []
+        self.handles = 0
+
+    def schedule(self, delay_ms, callback):
+        self.handles += 1
+        self.pending[self.handles] = (self.clock.now + delay_ms / 1000, callback)
+        self.delays.append(delay_ms)
+        return self.handles
+
+    def cancel(self, handle):
+        del self.pending[handle]
+
+    def advance(self, seconds):
+        """Move the clock, running callbacks as they come due"""
+        end = self.clock.now + seconds
+        while self.pending:
+            handle, (due, callback) = min(self.pending.items(), key=lambda item: item[1][0])
+            if due > end:
+                break
+            del self.pending[handle]
+            self.clock.now = due
+            callback()
+        self.clock.now = end
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def scheduler(clock):
+    return FakeScheduler(clock)
+
+
+@pytest.fixture
+def make_tracker(tmp_path, monkeypatch):
+    """Factory of trackers without a window, one database directory each
+
+    A tracker has conn, cursor, hierarchy, archiver, recurrence, tasks,
+    query_cache, estimates, period_analytics, history and reminders over the
+    app's schema, set up in the same order as TaskTracker.__init__. Reminders
+    run on a FakeScheduler.
+    """
+    trackers = []
+
+    def make(name='tracker'):
+        directory = tmp_path / name
+        directory.mkdir()
+        monkeypatch.chdir(directory)
+        tracker = TaskTracker.__new__(TaskTracker)
+        tracker.init_enhanced_database()
+        tracker.hierarchy = TaskHierarchy(tracker.conn)
+        tracker.archiver = TaskArchiver(tracker.conn, archive_path=str(directory / 'tasks_archive.db'))
+        focus_analytics.init_schema(tracker.cursor, log_source='time_log_history')
+        daily_rollup.init_schema(tracker.cursor, 'task_history', 'time_log_history')
+        tracker.conn.commit()
+        tracker.recurrence = RecurrenceEngine(tracker.conn)
+        tracker.tasks = TaskMap(tracker.cursor, source='task_history')
+        tracker.query_cache = QueryCache()
+        tracker.estimates = EstimateModel(str(directory / 'tasks_enhanced.db'), tracker.archiver.archive_path)
+        tracker.period_analytics = PeriodAnalytics(tracker.conn)
+        tracker.history = ChangeLog(tracker.conn)
+        scheduler = FakeScheduler(FakeClock())
+        tracker.reminders = ReminderScheduler(tracker.conn, scheduler.schedule, scheduler.cancel,
+                                              on_event=lambda kind, task_id: None)
+        tracker.db_path = str(directory / 'tasks_enhanced.db')
+        trackers.append(tracker)
+        return tracker
+
+    yield make
+    for tracker in trackers:
+        tracker.conn.close()
+
+
+@pytest.fixture
+def tracker_db(make_tracker):
+    return make_tracker()
@@ -0,0 +1,98 @@
+import asyncio
+from datetime import date
+
+import pytest
+
+import api_server
+from subtasks import TaskHierarchy
+
+
+def test_moving_a_task_refreshes_both_parents(tracker_db):
+    cursor = tracker_db.cursor
+    hierarchy = TaskHierarchy(tracker_db.conn)
+    cursor.execute("INSERT INTO tasks (title) VALUES ('old parent')")
+    old_parent = cursor.lastrowid
+    cursor.execute("INSERT INTO tasks (title) VALUES ('new parent')")
+    new_parent = cursor.lastrowid
+    cursor.execute("INSERT INTO tasks (title, parent_task_id, actual_time) VALUES ('child', ?, 30)", (old_parent,))
+    child = cursor.lastrowid
+    hierarchy.refresh(child)
+
+    api_server.update_task(tracker_db.conn, hierarchy, {'parent_task_id': new_parent}, child)
+
+    rollups = {task_id: api_server.get_task(tracker_db.conn, {}, task_id)['rollup_time']
+               for task_id in (old_parent, new_parent)}
+    assert rollups == {old_parent: 0, new_parent: 30}
+
+
+def test_completion_date_is_the_local_date(tracker_db, monkeypatch):
+    class FixedDate(date):
+        @classmethod
+        def today(cls):
+            return cls(2024, 12, 31)
+
+    monkeypatch.setattr(api_server, 'date', FixedDate)
+    tracker_db.cursor.execute("INSERT INTO tasks (title) VALUES ('task')")
+    task_id = tracker_db.cursor.lastrowid
+
+    api_server.update_task(tracker_db.conn, TaskHierarchy(tracker_db.conn), {'completed': 1}, task_id)
+
+    tracker_db.cursor.execute('SELECT date_completed, progress FROM tasks WHERE id = ?', (task_id,))
+    assert tracker_db.cursor.fetchone() == ('2024-12-31', 100)
+
+
+@pytest.fixture
+def family(tracker_db):
+    cursor = tracker_db.cursor
+    cursor.execute("INSERT INTO tasks (title) VALUES ('parent')")
+    parent = cursor.lastrowid
+    cursor.execute("INSERT INTO tasks (title, parent_task_id) VALUES ('child', ?)", (parent,))
+    return tracker_db, parent, cursor.lastrowid
+
+
+@pytest.mark.parametrize('body', [
+    {'parent_task_id': 'self'},
+    {'parent_task_id': 'child'},
+    {'parent_task_id': 999},
+    {'progress': 101},
+    {'progress': -1},
+    {'progress': 'half'},
+    {'completed': 2},
+    {'completed': 'yes'},
+    {'priority': 'Urgent'},
+])
+def test_update_rejects_invalid_fields(family, body):
+    tracker, parent, child = family
+    names = {'self': parent, 'child': child}
+    body = {name: names.get(value, value) for name, value in body.items()}
+
+    with pytest.raises(api_server.ApiError) as error:
+        api_server.update_task(tracker.conn, tracker.hierarchy, body, parent)
+    assert error.value.status == 400
+
+
+def test_subtree_ids_stop_at_a_cycle(family):
+    tracker, parent, child = family
+    tracker.cursor.execute('UPDATE tasks SET parent_task_id = ? WHERE id = ?', (child, parent))
+    assert sorted(tracker.hierarchy.subtree_ids(parent)) == [parent, child]
+
+
+def test_creating_a_completed_task_records_completion(tracker_db):
+    task = api_server.create_task(tracker_db.conn, tracker_db.hierarchy,
+                                  {'title': 'done', 'completed': 1, 'priority': 'Low'})
+
+    tracker_db.cursor.execute('SELECT date_completed, progress FROM tasks WHERE id = ?', (task['id'],))
+    assert tracker_db.cursor.fetchone() == (date.today().isoformat(), 100)
+
+
+@pytest.mark.parametrize('length', [b'ten', b'-5'])
+def test_bad_content_length_is_a_bad_request(length):
+    async def read():
+        reader = asyncio.StreamReader()
+        reader.feed_data(b'POST /tasks HTTP/1.1\r\nContent-Length: ' + length + b'\r\n\r\n{}')
+        reader.feed_eof()
+        return await api_server.ApiServer().read_request(reader)
+
+    with pytest.raises(api_server.ApiError) as error:
+        asyncio.run(read())
+    assert error.value.status == 400
@@ -0,0 +1,90 @@
+from datetime import date, timedelta
+
+
+def add_old_task(cursor, days_ago, minutes, parent_id=None, completed=1):
+    """A task created days_ago with one logged session of minutes"""
+    day = date.today() - timedelta(days=days_ago)
+    cursor.execute('''
+        INSERT INTO tasks (title, completed, date_created, date_completed, actual_time, parent_task_id)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', (f'task {days_ago}', completed, str(day), str(day) if completed else None, minutes, parent_id))
+    task_id = cursor.lastrowid
+    cursor.execute('''
+        INSERT INTO time_logs (task_id, start_time, end_time, duration)
+        VALUES (?, ?, ?, ?)
+    ''', (task_id, f'{day} 09:00:00', f'{day} 09:{minutes:02d}:00', minutes * 60))
+    return task_id
+
+
+def hot_ids(cursor):
+    cursor.execute('SELECT id FROM main.tasks ORDER BY id')
+    return [row[0] for row in cursor.fetchall()]
+
+
+def test_archive_batch_moves_old_completed_tasks(tracker_db):
+    cursor = tracker_db.cursor
+    old = [add_old_task(cursor, 200 + n, 25 + n) for n in range(3)]
+    recent = add_old_task(cursor, 1, 40)
+    tracker_db.conn.commit()
+
+    assert tracker_db.archiver.archive_batch() == len(old)
+    assert hot_ids(cursor) == [recent]
+    cursor.execute('SELECT COUNT(*) FROM archive.time_logs')
+    assert cursor.fetchone()[0] == len(old)
+    cursor.execute('SELECT COUNT(*) FROM task_history')
+    assert cursor.fetchone()[0] == len(old) + 1
+
+
+def test_archive_batch_moves_whole_trees_only(tracker_db):
+    cursor = tracker_db.cursor
+    open_parent = add_old_task(cursor, 0, 10, completed=0)
+    add_old_task(cursor, 200, 20, parent_id=open_parent)
+
+    done_parent = add_old_task(cursor, 300, 10)
+    add_old_task(cursor, 30, 15, parent_id=done_parent)
+    blocked_parent = add_old_task(cursor, 300, 10)
+    add_old_task(cursor, 30, 15, parent_id=blocked_parent, completed=0)
+    tracker_db.conn.commit()
+    before = hot_ids(cursor)
+
+    # The finished tree moves with its recent subtask; the others stay whole
+    assert tracker_db.archiver.archive_batch() == 2
+    assert hot_ids(cursor) == [task_id for task_id in before if task_id not in (done_parent, done_parent + 1)]
+    assert tracker_db.archiver.archive_batch() == 0
+
+
+def test_archive_batch_keeps_focus_hours(tracker_db):
+    cursor = tracker_db.cursor
+    old = [add_old_task(cursor, 200 + n, 25 + n) for n in range(3)]
+    add_old_task(cursor, 1, 40)
+    tracker_db.conn.commit()
+    cursor.execute('SELECT hour, task_id, seconds FROM focus_hours ORDER BY hour, task_id')
+    before = cursor.fetchall()
+
+    assert tracker_db.archiver.archive_batch() == len(old)
+
+    cursor.execute('SELECT hour, task_id, seconds FROM focus_hours ORDER BY hour, task_id')
+    assert cursor.fetchall() == before
+
+
+def test_deleting_a_task_log_still_updates_focus_hours(tracker_db):
+    cursor = tracker_db.cursor
+    task_id = add_old_task(cursor, 1, 30)
+    cursor.execute('DELETE FROM time_logs WHERE task_id = ?', (task_id,))
+    cursor.execute('SELECT COUNT(*) FROM focus_hours WHERE task_id = ?', (task_id,))
+    assert cursor.fetchone()[0] == 0
+
+
+def test_archive_batch_keeps_daily_rollup(tracker_db):
+    cursor = tracker_db.cursor
+    for n in range(3):
+        add_old_task(cursor, 200 + n, 25 + n)
+    tracker_db.conn.commit()
+    cursor.execute('SELECT * FROM productivity_stats ORDER BY date')
+    before = cursor.fetchall()
+    assert len(before) == 3 and all(row[3] for row in before)  # total_time_worked
+
+    assert tracker_db.archiver.archive_batch() == 3
+
+    cursor.execute('SELECT * FROM productivity_stats ORDER BY date')
+    assert cursor.fetchall() == before
@@ -0,0 +1,39 @@
+import pytest
+
+
+@pytest.fixture
+def selection(tracker_db, monkeypatch):
+    """Tracker with a parent and three open subtasks; views don't refresh"""
+    for name in ('update_selection_display', 'update_all_displays', 'load_tasks', 'update_timer_task_list'):
+        monkeypatch.setattr(tracker_db, name, lambda *args: None)
+    cursor = tracker_db.cursor
+    cursor.execute("INSERT INTO tasks (title) VALUES ('parent')")
+    parent_id = cursor.lastrowid
+    child_ids = []
+    for title in ('a', 'b', 'c'):
+        cursor.execute('INSERT INTO tasks (title, parent_task_id) VALUES (?, ?)', (title, parent_id))
+        child_ids.append(cursor.lastrowid)
+    tracker_db.conn.commit()
+    return tracker_db, parent_id, child_ids
+
+
+def test_bulk_complete_rolls_up_once_and_undoes_together(selection, monkeypatch):
+    tracker, parent_id, child_ids = selection
+    cursor = tracker.cursor
+    refits = []
+    monkeypatch.setattr(tracker.estimates, 'refit_async', lambda: refits.append(True))
+    tracker.selected_task_ids = set(child_ids[:2])
+
+    tracker.bulk_set_completed(True)
+    cursor.execute('SELECT progress FROM tasks WHERE id = ?', (parent_id,))
+    assert cursor.fetchone()[0] == 67
+    cursor.execute('SELECT COUNT(*) FROM tasks WHERE completed = 1 AND date_completed IS NOT NULL')
+    assert cursor.fetchone()[0] == 2
+    assert not tracker.selected_task_ids
+    assert refits == [True]
+
+    assert tracker.history.undo()[0] == "Complete 2 task(s)"
+    cursor.execute('SELECT COUNT(*) FROM tasks WHERE completed = 1')
+    assert cursor.fetchone()[0] == 0
+    cursor.execute('SELECT progress FROM tasks WHERE id = ?', (parent_id,))
+    assert cursor.fetchone()[0] == 0
@@ -0,0 +1,115 @@
+from datetime import date
+
+import pytest
+
+
+def count(cursor, sql, *args):
+    cursor.execute(sql, args)
+    return cursor.fetchone()[0]
+
+
+@pytest.fixture
+def series(tracker_db, monkeypatch):
+    """Tracker with three materialized daily occurrences; views don't refresh"""
+    monkeypatch.setattr(tracker_db, 'load_tasks', lambda: None)
+    monkeypatch.setattr(tracker_db, 'update_quick_stats', lambda: None)
+    tracker_db.recurrence.add_rule('Standup', '', 'Medium', 'Work', 15, '', 'daily', date(2024, 1, 1))
+    return tracker_db, tracker_db.recurrence.materialize(date(2024, 1, 1), date(2024, 1, 3))
+
+
+def test_undo_of_a_delete_restores_the_skipped_occurrence(series):
+    tracker, (_, second, _) = series
+    cursor = tracker.cursor
+    cursor.execute('INSERT INTO time_logs (task_id, duration) VALUES (?, 15)', (second,))
+    tracker.conn.commit()
+
+    tracker.delete_tasks([second])
+    assert count(cursor, 'SELECT COUNT(*) FROM recurrence_occurrences WHERE task_id = ?', second) == 0
+
+    assert tracker.history.undo()[0] == "Delete task"
+    assert count(cursor, 'SELECT COUNT(*) FROM tasks WHERE id = ?', second) == 1
+    assert count(cursor, 'SELECT COUNT(*) FROM time_logs WHERE task_id = ?', second) == 1
+    assert count(cursor, 'SELECT COUNT(*) FROM recurrence_occurrences WHERE task_id = ?', second) == 1
+
+    tracker.history.redo()
+    assert count(cursor, 'SELECT COUNT(*) FROM tasks WHERE id = ?', second) == 0
+
+
+def test_end_series_undoes_as_one_action(series):
+    tracker, (first, second, third) = series
+    cursor = tracker.cursor
+    with tracker.history.action("End series"):
+        tracker.delete_tasks(tracker.recurrence.end_series(first))
+    tracker.conn.commit()
+    assert count(cursor, 'SELECT COUNT(*) FROM tasks') == 1
+
+    label, affected = tracker.history.undo()
+    assert label == "End series"
+    assert {'recurrence_rules', 'recurrence_occurrences'} <= affected['tables']
+    assert count(cursor, 'SELECT COUNT(*) FROM tasks') == 3
+    assert count(cursor, 'SELECT COUNT(*) FROM recurrence_occurrences WHERE task_id IS NOT NULL') == 3
+    assert count(cursor, 'SELECT COUNT(*) FROM recurrence_rules WHERE end_date IS NULL') == 1
+    assert not tracker.history.can_undo()
+
+
+def test_undo_restores_forgotten_archive_rows(tracker_db):
+    cursor = tracker_db.cursor
+    cursor.execute('''
+        INSERT INTO tasks (title, completed, date_created) VALUES ('Old', 1, date('now', '-200 days'))
+    ''')
+    task_id = cursor.lastrowid
+    cursor.execute('INSERT INTO time_logs (task_id, duration) VALUES (?, 30)', (task_id,))
+    tracker_db.conn.commit()
+    tracker_db.archiver.archive_batch()
+
+    with tracker_db.history.action("Delete task"):
+        tracker_db.archiver.forget(task_id)
+    tracker_db.conn.commit()
+    assert count(cursor, 'SELECT COUNT(*) FROM task_history WHERE id = ?', task_id) == 0
+
+    tracker_db.history.undo()
+    assert count(cursor, 'SELECT COUNT(*) FROM archive.tasks WHERE id = ?', task_id) == 1
+    assert count(cursor, 'SELECT COUNT(*) FROM archive.time_logs WHERE task_id = ?', task_id) == 1
+
+
+def test_failed_undo_rolls_the_whole_action_back(tracker_db):
+    cursor = tracker_db.cursor
+    history = tracker_db.history
+    with history.action("Add two"):
+        cursor.execute("INSERT INTO tasks (title) VALUES ('One')")
+        cursor.execute("INSERT INTO tasks (title) VALUES ('Two')")
+    tracker_db.conn.commit()
+    cursor.execute("UPDATE change_log SET table_name = 'missing' WHERE seq = (SELECT MIN(seq) FROM change_log)")
+    tracker_db.conn.commit()
+
+    with pytest.raises(KeyError):
+        history.undo()
+    assert count(cursor, 'SELECT COUNT(*) FROM tasks') == 2
+    assert history.can_undo()
+
+
+def test_compacted_action_replays_in_order(tracker_db):
+    cursor = tracker_db.cursor
+    history = tracker_db.history
+    cursor.executemany('INSERT INTO recurrence_occurrences (rule_id, occurrence_date, task_id) VALUES (1, ?, NULL)',
+                       [('2024-01-01',), ('2024-01-02',)])
+    tracker_db.conn.commit()
+
+    # The first row takes the second row's date after it moved on
+    with history.action("Reschedule"):
+        cursor.execute("UPDATE recurrence_occurrences SET task_id = 7 WHERE occurrence_date = '2024-01-01'")
+        cursor.execute("UPDATE recurrence_occurrences SET occurrence_date = '2024-01-03' WHERE occurrence_date = '2024-01-02'")
+        cursor.execute("UPDATE recurrence_occurrences SET occurrence_date = '2024-01-02' WHERE task_id = 7")
+    with history.action("Add"):
+        cursor.execute("INSERT INTO tasks (title) VALUES ('Later')")
+    assert history.compact() == 1
+    tracker_db.conn.commit()
+    assert count(cursor, "SELECT COUNT(*) FROM change_log WHERE table_name = 'recurrence_occurrences'") == 2
+
+    history.undo()
+    history.undo()
+    cursor.execute('SELECT occurrence_date, task_id FROM recurrence_occurrences ORDER BY occurrence_date')
+    assert cursor.fetchall() == [('2024-01-01', None), ('2024-01-02', None)]
+    history.redo()
+    cursor.execute('SELECT occurrence_date, task_id FROM recurrence_occurrences ORDER BY occurrence_date')
+    assert cursor.fetchall() == [('2024-01-02', 7), ('2024-01-03', None)]
@@ -0,0 +1,59 @@
+import sqlite3
+
+import pytest
+
+from change_watcher import ChangeWatcher
+
+
+@pytest.fixture
+def watched(tracker_db):
+    watcher = ChangeWatcher(tracker_db.conn)
+    other = sqlite3.connect(tracker_db.db_path)
+    yield tracker_db, watcher, other
+    other.close()
+
+
+def add_task(conn, day):
+    cursor = conn.execute('INSERT INTO tasks (title, date_created) VALUES (?, ?)', ('Task', day))
+    conn.commit()
+    return cursor.lastrowid
+
+
+def test_poll_reports_external_commits_only(watched):
+    tracker, watcher, other = watched
+    assert watcher.poll() is None
+
+    add_task(tracker.conn, '2024-05-06')
+    assert watcher.poll() is None  # Own commits don't move data_version
+
+    task_id = add_task(other, '2024-05-07')
+    other.execute("UPDATE tasks SET date_created = '2024-05-08' WHERE id = ?", (task_id,))
+    other.commit()
+    changes = watcher.poll()
+    assert changes.task_ids >= {task_id}
+    assert {'2024-05-07', '2024-05-08'} <= changes.dates
+    assert not changes.full
+    assert watcher.poll() is None
+
+
+def test_prune_trims_own_writes_of_a_single_instance(watched):
+    tracker, watcher, _ = watched
+    for _ in range(3):
+        add_task(tracker.conn, '2024-05-06')
+    tracker.conn.execute("UPDATE task_changes SET changed_at = datetime('now', '-2 days')")
+    tracker.conn.commit()
+    written = tracker.conn.execute('SELECT COUNT(*) FROM task_changes').fetchone()[0]
+
+    assert watcher.prune() == written > 0
+    tracker.conn.commit()
+    assert tracker.conn.execute('SELECT COUNT(*) FROM task_changes').fetchone()[0] == 0
+
+
+def test_prune_keeps_unseen_external_rows(watched):
+    tracker, watcher, other = watched
+    add_task(other, '2024-05-06')
+    other.execute("UPDATE task_changes SET changed_at = datetime('now', '-2 days')")
+    other.commit()
+
+    assert watcher.prune() == 0
+    assert watcher.poll().dates == {'2024-05-06'}
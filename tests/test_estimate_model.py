@@ -0,0 +1,62 @@
+import pytest
+
+import estimate_model
+from estimate_model import EstimateModel
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def model(request, tracker_db, monkeypatch):
+    if request.param == 'python':
+        monkeypatch.setattr(estimate_model, 'np', None)
+    elif estimate_model.np is None:
+        pytest.skip("NumPy is not installed")
+    return EstimateModel(tracker_db.db_path, tracker_db.archiver.archive_path)
+
+
+def add_done(tracker, estimated, actual, category='Work', priority='Medium', tags='', days_ago=0):
+    tracker.cursor.execute(f'''
+        INSERT INTO tasks (title, estimated_time, actual_time, category, priority, tags, completed, date_created)
+        VALUES ('Task', ?, ?, ?, ?, ?, 1, date('now', '-{days_ago} days'))
+    ''', (estimated, actual, category, priority, tags))
+    tracker.conn.commit()
+    return tracker.cursor.lastrowid
+
+
+def weights(model):
+    return model.model[0]
+
+
+def test_no_correction_below_min_samples(tracker_db, model):
+    for _ in range(estimate_model.MIN_SAMPLES - 1):
+        add_done(tracker_db, 30, 60)
+    assert model.fit()
+    assert not model.ready
+    assert model.predict(30, 'Work', 'Medium', '') == 30
+
+
+def test_incremental_refit_matches_a_fresh_fit(tracker_db, model):
+    for estimated, actual, category, tags in [(30, 45, 'Work', 'deep'), (60, 90, 'Work', ''), (20, 20, 'Personal', ''),
+                                              (30, 25, 'Personal', 'quick, home'), (45, 60, 'Work', 'deep')]:
+        add_done(tracker_db, estimated, actual, category=category, tags=tags)
+    stale = add_done(tracker_db, 10, 80, days_ago=200)
+    assert model.fit()
+    assert model.ready
+    assert model.ratio('Work', 'Medium', 'deep') > model.ratio('Personal', 'Medium', 'quick')
+    assert not model.fit()
+
+    # New, changed, archived and deleted tasks all fold into the refit
+    add_done(tracker_db, 15, 30, category='Errands', priority='Low', tags='new')
+    tracker_db.cursor.execute("UPDATE tasks SET actual_time = 120 WHERE category = 'Work' AND tags = ''")
+    tracker_db.cursor.execute("DELETE FROM tasks WHERE tags = 'quick, home'")
+    tracker_db.conn.commit()
+    tracker_db.archiver.archive_batch()
+    assert model.fit()
+
+    fresh = EstimateModel(tracker_db.db_path, tracker_db.archiver.archive_path)
+    fresh.fit()
+    assert tracker_db.cursor.execute('SELECT COUNT(*) FROM archive.tasks WHERE id = ?', (stale,)).fetchone()[0] == 1
+    assert stale in fresh.rows and model.rows == fresh.rows
+    assert weights(model).keys() >= weights(fresh).keys()
+    for feature, weight in weights(model).items():
+        assert weight == pytest.approx(weights(fresh).get(feature, 0.0), abs=1e-9)
+    assert model.predict(30, 'Errands', 'Low', 'new') == fresh.predict(30, 'Errands', 'Low', 'new')
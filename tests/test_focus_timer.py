@@ -0,0 +1,139 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from focus_timer import FocusTimer, SessionCheckpoint
+
+
+def make_timer(clock, scheduler, ticks=None, finished=None):
+    return FocusTimer(scheduler.schedule, scheduler.cancel,
+                      on_tick=None if ticks is None else ticks.append,
+                      on_finish=None if finished is None else finished.append,
+                      clock=clock)
+
+
+def test_pause_excludes_paused_time(clock, scheduler):
+    timer = make_timer(clock, scheduler)
+    timer.start(60)
+    scheduler.advance(10.25)
+    timer.pause()
+    assert timer.is_paused and not scheduler.pending
+
+    scheduler.advance(300)
+    assert timer.elapsed() == pytest.approx(10.25)
+
+    timer.resume()
+    scheduler.advance(4.75)
+    assert timer.elapsed() == pytest.approx(15.0)
+    assert timer.remaining_seconds() == 45
+    assert len(scheduler.pending) == 1
+    assert timer.stop() == pytest.approx(15.0)
+    assert not timer.is_active and not scheduler.pending
+
+
+def test_ticks_land_on_second_boundaries(clock, scheduler):
+    ticks = []
+    timer = make_timer(clock, scheduler, ticks)
+    timer.start(5, elapsed=0.4)
+    assert ticks == [5] and scheduler.delays == [600]
+
+    scheduler.advance(2.6)
+    assert ticks == [5, 4, 3, 2]
+    assert scheduler.delays[1:] == [1000, 1000, 1000]
+
+    # Resuming mid-second waits only for the rest of that second
+    timer.pause()
+    clock.now += 0.3
+    timer.resume()
+    assert scheduler.delays[-1] == 1000
+    scheduler.advance(0.25)
+    timer.pause()
+    timer.resume()
+    assert scheduler.delays[-1] == 750
+
+
+def test_session_finishes_once(clock, scheduler):
+    ticks, finished = [], []
+    timer = make_timer(clock, scheduler, ticks, finished)
+    timer.start(3)
+    scheduler.advance(10)
+    assert ticks == [3, 2, 1]
+    assert finished == [3.0]
+    assert not timer.is_active and not scheduler.pending
+
+
+class WallClock:
+    def __init__(self):
+        self.now = datetime(2024, 5, 6, 9, 0)
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def focus_task(tracker_db):
+    tracker_db.cursor.execute("INSERT INTO tasks (title) VALUES ('focus')")
+    tracker_db.conn.commit()
+    return tracker_db.cursor.lastrowid
+
+
+def make_checkpoint(tracker, clock, wall):
+    return SessionCheckpoint(tracker.conn, interval=30, clock=clock, now=wall)
+
+
+def run(clock, wall, seconds, beat):
+    for _ in range(seconds):
+        clock.now += 1
+        wall.now += timedelta(seconds=1)
+        beat()
+
+
+def test_checkpoint_recovers_a_crashed_session(tracker_db, focus_task, clock):
+    cursor = tracker_db.cursor
+    wall = WallClock()
+    checkpoint = make_checkpoint(tracker_db, clock, wall)
+    checkpoint.begin(focus_task, 1500, wall())
+    elapsed = iter(range(1, 200))
+    run(clock, wall, 199, lambda: checkpoint.beat(next(elapsed)))
+    cursor.execute('SELECT elapsed FROM timer_heartbeats ORDER BY elapsed')
+    assert [row[0] for row in cursor.fetchall()] == [30, 60, 90, 120, 150, 180]
+
+    # Crash: a start soon after leaves the session alone, a later one logs it
+    # up to the last heartbeat
+    assert make_checkpoint(tracker_db, clock, wall).recover() == []
+    wall.now += timedelta(minutes=5)
+    assert make_checkpoint(tracker_db, clock, wall).recover() == [(focus_task, 180)]
+    cursor.execute('SELECT duration, notes FROM time_logs WHERE task_id = ?', (focus_task,))
+    assert cursor.fetchall() == [(180, 'Recovered focus session')]
+    cursor.execute('SELECT actual_time FROM tasks WHERE id = ?', (focus_task,))
+    assert cursor.fetchone()[0] == 3
+    cursor.execute('SELECT COUNT(*) FROM timer_sessions')
+    assert cursor.fetchone()[0] == 0
+
+
+def test_live_session_of_another_window_is_not_recovered(tracker_db, focus_task, clock):
+    wall = WallClock()
+    owner = make_checkpoint(tracker_db, clock, wall)
+    owner.begin(focus_task, 1500, wall())
+    run(clock, wall, 100, lambda: None)
+    owner.pause(100)
+
+    # Paused sessions stay alive as long as their window keeps beating
+    for _ in range(10):
+        run(clock, wall, 30, lambda: None)
+        owner.beat(100)
+        assert make_checkpoint(tracker_db, clock, wall).recover() == []
+
+    assert owner.recover(own=True) == [(focus_task, 100)]
+    assert owner.session_id is None
+
+
+def test_checkpoint_keeps_paused_elapsed(tracker_db, focus_task, clock):
+    wall = WallClock()
+    checkpoint = make_checkpoint(tracker_db, clock, wall)
+    checkpoint.begin(focus_task, 1500, wall())
+    run(clock, wall, 75, lambda: None)
+    checkpoint.pause(75)
+
+    wall.now += timedelta(hours=1)
+    assert make_checkpoint(tracker_db, clock, wall).recover() == [(focus_task, 75)]
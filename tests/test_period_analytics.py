@@ -0,0 +1,69 @@
+import sqlite3
+from datetime import date
+
+import pytest
+
+
+MONDAY = date(2024, 5, 6)
+
+
+def add_task(conn, day, completed_on=None):
+    conn.execute('INSERT INTO tasks (title, date_created, completed, date_completed) VALUES (?, ?, ?, ?)',
+                 ('Task', str(day), int(completed_on is not None), completed_on and str(completed_on)))
+    conn.commit()
+
+
+def test_compare_treats_an_empty_period_as_zeros(tracker_db):
+    add_task(tracker_db.conn, MONDAY, completed_on=MONDAY)
+    add_task(tracker_db.conn, MONDAY)
+    add_task(tracker_db.conn, date(2024, 5, 22), completed_on=date(2024, 5, 23))
+
+    first, empty, third = tracker_db.period_analytics.compare('week', MONDAY, date(2024, 5, 26))
+    assert (first['start'], first['created'], first['completed']) == (MONDAY, 2, 1)
+    assert empty['start'] == date(2024, 5, 13)
+    assert (empty['created'], empty['planned_done'], empty['completed'], empty['worked']) == (0, 0, 0, 0)
+    assert empty['completed_change'] == -1.0
+    assert empty['worked_change'] is None
+    assert third['previous']['completed'] == 0
+    assert third['completed_change'] is None
+
+
+@pytest.mark.parametrize('today, expected', [
+    (date(2024, 5, 1), {'current': 0, 'longest': 0, 'longest_end': None}),
+    (date(2024, 5, 12), {'current': 2, 'longest': 3, 'longest_end': '2024-05-08'}),
+    (date(2024, 5, 13), {'current': 0, 'longest': 3, 'longest_end': '2024-05-08'}),
+])
+def test_streaks_span_gaps_and_empty_history(tracker_db, today, expected):
+    for day in (6, 7, 8, 10, 11):
+        add_task(tracker_db.conn, MONDAY, completed_on=date(2024, 5, day))
+    assert tracker_db.period_analytics.streaks(today) == expected
+
+
+def test_own_writes_drop_only_the_periods_they_touch(tracker_db):
+    analytics = tracker_db.period_analytics
+    add_task(tracker_db.conn, MONDAY, completed_on=MONDAY)
+    first, second = analytics.compare('week', MONDAY, date(2024, 5, 13))
+    assert analytics.compare('week', MONDAY, date(2024, 5, 13))[0] is first
+
+    add_task(tracker_db.conn, date(2024, 5, 24), completed_on=date(2024, 5, 24))
+    again, _ = analytics.compare('week', MONDAY, date(2024, 5, 13))
+    assert again is first
+
+    # A write in a period also drops the next one, which compares against it
+    add_task(tracker_db.conn, MONDAY, completed_on=MONDAY)
+    again, second_again = analytics.compare('week', MONDAY, date(2024, 5, 13))
+    assert again['completed'] == 2
+    assert second_again is not second and second_again['previous']['completed'] == 2
+    assert analytics.streaks(date(2024, 5, 6))['current'] == 1
+
+
+def test_other_connections_are_seen_after_clear(tracker_db):
+    analytics = tracker_db.period_analytics
+    assert analytics.compare('week', MONDAY, MONDAY)[0]['created'] == 0
+
+    other = sqlite3.connect(tracker_db.db_path)
+    add_task(other, MONDAY)
+    other.close()
+    assert analytics.compare('week', MONDAY, MONDAY)[0]['created'] == 0
+    analytics.clear()
+    assert analytics.compare('week', MONDAY, MONDAY)[0]['created'] == 1
@@ -0,0 +1,55 @@
+from datetime import date
+
+import pytest
+
+from query_cache import QueryCache
+
+
+@pytest.fixture
+def cache():
+    cache = QueryCache()
+    cache.put('may-6', [(1, 'a')], [(date(2024, 5, 6), date(2024, 5, 6))], ids=[1])
+    cache.put('week', [(1, 'a'), (2, 'b')], [(date(2024, 5, 6), date(2024, 5, 12))], ids=[1, 2])
+    cache.put('backlog', [(3, 'c')], [(None, date(2024, 5, 5))], ids=[3])
+    cache.put('stats', (4, 2), [(date(2024, 5, 20), date(2024, 5, 20))])
+    return cache
+
+
+def cached(cache):
+    return {key for key in ('may-6', 'week', 'backlog', 'stats') if cache.get(key) is not None}
+
+
+@pytest.mark.parametrize('kwargs, kept', [
+    ({'dates': [date(2024, 5, 6)]}, {'backlog', 'stats'}),
+    ({'dates': ['2024-05-08']}, {'may-6', 'backlog', 'stats'}),
+    ({'dates': [date(2024, 4, 1)]}, {'may-6', 'week', 'stats'}),
+    ({'dates': [date(2024, 6, 1)]}, {'may-6', 'week', 'backlog', 'stats'}),
+    ({'ids': [2]}, {'may-6', 'backlog', 'stats'}),
+    ({'ids': [3, 9]}, {'may-6', 'week', 'stats'}),
+    ({'date_range': (date(2024, 5, 7), date(2024, 5, 19))}, {'may-6', 'backlog', 'stats'}),
+    ({'date_range': (date(2024, 5, 13), date(2024, 5, 31))}, {'may-6', 'week', 'backlog'}),
+    ({'date_range': (None, date(2024, 5, 1))}, {'may-6', 'week', 'stats'}),
+    ({'date_range': (date(2024, 5, 21), None)}, {'may-6', 'week', 'backlog', 'stats'}),
+])
+def test_invalidate_drops_only_overlapping_entries(cache, kwargs, kept):
+    cache.invalidate(**kwargs)
+    assert cached(cache) == kept
+    assert len(cache) == len(kept)
+
+
+def test_invalidated_ids_are_unindexed(cache):
+    cache.invalidate(ids=[1])
+    cache.put('may-6', [(4, 'd')], [(date(2024, 5, 6), date(2024, 5, 6))], ids=[4])
+    cache.invalidate(ids=[1])
+    assert cache.get('may-6') == [(4, 'd')]
+
+
+def test_least_recently_used_entries_are_evicted_first():
+    cache = QueryCache(max_bytes=1000)
+    rows = [(1, 'x' * 100)]
+    for key in 'abcdef':
+        cache.put(key, rows, [(None, None)])
+        cache.get('a')
+    assert cache.get('a') == rows
+    assert cache.get('b') is None
+    assert cache.size <= 1000
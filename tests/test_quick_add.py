@@ -0,0 +1,67 @@
+from datetime import date
+
+import pytest
+
+from quick_add import QuickAddError, parse_date, parse_line, parse_text
+
+
+TODAY = date(2024, 5, 8)  # A Wednesday
+CATEGORIES = ('General', 'Work', 'Personal')
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('today', date(2024, 5, 8)),
+    ('Tom', date(2024, 5, 9)),
+    ('wed', date(2024, 5, 8)),
+    ('monday', date(2024, 5, 13)),
+    ('fri', date(2024, 5, 10)),
+    ('2024-06-01', date(2024, 6, 1)),
+    ('12-31', date(2024, 12, 31)),
+    ('2-30', None),
+    ('mo', None),
+    ('someday', None),
+])
+def test_parse_date(text, expected):
+    assert parse_date(text, TODAY) == expected
+
+
+@pytest.mark.parametrize('line, fields', [
+    ('- [ ] Buy milk', {'title': 'Buy milk'}),
+    ('1. Call Bob !h', {'title': 'Call Bob', 'priority': 'High'}),
+    ('* Report #work #Q3 ~1h30m', {'title': 'Report', 'category': 'Work', 'tags': ['q3'], 'estimated_time': 90}),
+    ('Stretch ~0m', {'title': 'Stretch', 'estimated_time': 0}),
+    ('Plan trip @fri', {'title': 'Plan trip', 'date_created': date(2024, 5, 10)}),
+    ('Dentist @06-03 @9:05', {'title': 'Dentist', 'date_created': date(2024, 6, 3), 'due_time': '09:05'}),
+    ('Email #a #A', {'title': 'Email', 'tags': ['a']}),
+    ('Pay 50! now', {'title': 'Pay 50! now'}),
+])
+def test_parse_line(line, fields):
+    task = parse_line(line, default_date=TODAY, categories=CATEGORIES, today=TODAY)
+    expected = {'priority': None, 'category': None, 'estimated_time': None, 'tags': [],
+                'date_created': TODAY, 'due_time': None}
+    expected.update(fields)
+    assert task == expected
+
+
+@pytest.mark.parametrize('line, message', [
+    ('Task !urgent', "unknown priority '!urgent'"),
+    ('Task ~soon', "unknown estimate '~soon'"),
+    ('Task @someday', "unknown date '@someday'"),
+    ('Task @25:00', "unknown date '@25:00'"),
+    ('- !h #work', "the task has no title"),
+])
+def test_parse_line_errors(line, message):
+    with pytest.raises(QuickAddError) as error:
+        parse_line(line, 4, categories=CATEGORIES, today=TODAY)
+    assert error.value.line_number == 4
+    assert str(error.value).startswith(f"Line 4: {message}")
+
+
+def test_parse_text_skips_blank_lines_and_names_the_bad_one():
+    tasks = parse_text("- one\n\n  \n- two @tom\n", default_date=TODAY, today=TODAY)
+    assert [(task['title'], task['date_created']) for task in tasks] == [
+        ('one', TODAY), ('two', date(2024, 5, 9))]
+
+    with pytest.raises(QuickAddError) as error:
+        parse_text("fine\n\nbroken !x", today=TODAY)
+    assert error.value.line_number == 3
@@ -0,0 +1,66 @@
+from datetime import date
+
+import pytest
+
+from recurrence import RecurrenceEngine
+
+
+def rule(kind, start, interval=1, end=None):
+    return {'recurring_type': kind, 'recurring_interval': interval, 'start_date': start, 'end_date': end}
+
+
+@pytest.mark.parametrize('series, day, expected', [
+    (rule('daily', date(2024, 1, 1)), date(2024, 1, 1), True),
+    (rule('daily', date(2024, 1, 1)), date(2023, 12, 31), False),
+    (rule('daily', date(2024, 1, 1), interval=3), date(2024, 1, 7), True),
+    (rule('daily', date(2024, 1, 1), interval=3), date(2024, 1, 8), False),
+    (rule('daily', date(2024, 1, 1), end=date(2024, 1, 5)), date(2024, 1, 6), False),
+    (rule('weekly', date(2024, 1, 1)), date(2024, 1, 15), True),
+    (rule('weekly', date(2024, 1, 1), interval=2), date(2024, 1, 8), False),
+    (rule('monthly', date(2024, 1, 15)), date(2024, 3, 15), True),
+    (rule('monthly', date(2024, 1, 15), interval=2), date(2024, 2, 15), False),
+    # Series on the 31st fall on the last day of shorter months
+    (rule('monthly', date(2024, 1, 31)), date(2024, 2, 29), True),
+    (rule('monthly', date(2024, 1, 31)), date(2024, 2, 28), False),
+    (rule('monthly', date(2023, 1, 31)), date(2023, 2, 28), True),
+    (rule('monthly', date(2024, 1, 31)), date(2024, 4, 30), True),
+    (rule('monthly', date(2024, 1, 31)), date(2024, 5, 30), False),
+    (rule('monthly', date(2024, 1, 31)), date(2024, 5, 31), True),
+])
+def test_occurs_on(series, day, expected):
+    assert RecurrenceEngine.occurs_on(series, day) is expected
+
+
+def occurrence_dates(cursor):
+    cursor.execute('SELECT date_created FROM tasks ORDER BY date_created')
+    return [row[0] for row in cursor.fetchall()]
+
+
+def test_materialize_creates_each_occurrence_once(tracker_db):
+    engine = RecurrenceEngine(tracker_db.conn)
+    engine.add_rule('Rent', '', 'High', 'Home', 5, '', 'monthly', date(2024, 1, 31))
+
+    assert len(engine.materialize(date(2024, 1, 1), date(2024, 4, 30))) == 4
+    assert engine.materialize(date(2024, 2, 1), date(2024, 2, 29)) == []
+    assert occurrence_dates(tracker_db.cursor) == ['2024-01-31', '2024-02-29', '2024-03-31', '2024-04-30']
+
+    # A deleted occurrence stays skipped, also for a fresh engine
+    tracker_db.cursor.execute("SELECT id FROM tasks WHERE date_created = '2024-02-29'")
+    skipped = tracker_db.cursor.fetchone()[0]
+    tracker_db.cursor.execute('DELETE FROM tasks WHERE id = ?', (skipped,))
+    engine.skip(skipped)
+    tracker_db.conn.commit()
+    assert RecurrenceEngine(tracker_db.conn).materialize(date(2024, 1, 1), date(2024, 4, 30)) == []
+
+
+def test_end_series_returns_later_open_occurrences(tracker_db):
+    cursor = tracker_db.cursor
+    engine = RecurrenceEngine(tracker_db.conn)
+    engine.add_rule('Standup', '', 'Medium', 'Work', 15, '', 'daily', date(2024, 1, 1))
+    first, second, third, fourth = engine.materialize(date(2024, 1, 1), date(2024, 1, 4))
+    cursor.execute('UPDATE tasks SET completed = 1 WHERE id = ?', (fourth,))
+
+    assert engine.end_series(second) == [third]
+    assert engine.end_series(first + 100) is None
+    assert engine.materialize(date(2024, 1, 1), date(2024, 1, 10)) == []
+    assert engine.series_of(fourth) is None
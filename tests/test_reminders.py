@@ -0,0 +1,77 @@
+from datetime import datetime
+
+import pytest
+
+from reminders import ReminderScheduler
+
+
+@pytest.fixture
+def scheduled(tracker_db, clock, scheduler):
+    clock.now = datetime(2024, 5, 6, 9, 0).timestamp()
+    events = []
+    reminders = ReminderScheduler(tracker_db.conn, scheduler.schedule, scheduler.cancel,
+                                  on_event=lambda kind, task_id: events.append((kind, task_id)),
+                                  clock=clock, chunk=2)
+    return tracker_db, reminders, scheduler, events
+
+
+def add_task(tracker, title, due_at, completed=0):
+    tracker.cursor.execute('INSERT INTO tasks (title, due_at, completed) VALUES (?, ?, ?)',
+                           (title, due_at, completed))
+    tracker.conn.commit()
+    return tracker.cursor.lastrowid
+
+
+def test_reminders_fire_in_due_order_with_one_pending_callback(scheduled):
+    tracker, reminders, scheduler, events = scheduled
+    ids = {title: add_task(tracker, title, f'2024-05-06 {time}')
+           for title, time in [('a', '09:30'), ('b', '09:10'), ('c', '09:20'), ('d', '09:10')]}
+    add_task(tracker, 'done', '2024-05-06 09:05', completed=1)
+    reminders.start()
+    assert len(scheduler.pending) == 1
+
+    scheduler.advance(15 * 60)
+    assert events == [('due', ids['b']), ('due', ids['d'])]
+    assert len(scheduler.pending) == 1
+
+    scheduler.advance(60 * 60)
+    assert events[2:] == [('due', ids['c']), ('due', ids['a'])]
+    assert not scheduler.pending
+    tracker.cursor.execute('SELECT COUNT(*) FROM tasks WHERE reminded = 1')
+    assert tracker.cursor.fetchone()[0] == 4
+
+
+def test_editing_the_due_time_rearms_the_reminder(scheduled):
+    tracker, reminders, scheduler, events = scheduled
+    task_id = add_task(tracker, 'a', '2024-05-06 09:30')
+    reminders.start()
+
+    tracker.cursor.execute("UPDATE tasks SET due_at = '2024-05-06 09:05' WHERE id = ?", (task_id,))
+    tracker.conn.commit()
+    reminders.refresh([task_id])
+    assert len(scheduler.pending) == 1
+    scheduler.advance(6 * 60)
+    assert events == [('due', task_id)]
+
+    # A new due time after the reminder went off arms it again
+    tracker.cursor.execute("UPDATE tasks SET due_at = '2024-05-06 10:00' WHERE id = ?", (task_id,))
+    tracker.conn.commit()
+    reminders.refresh([task_id])
+    scheduler.advance(30 * 60)
+    assert len(events) == 1
+    scheduler.advance(30 * 60)
+    assert events == [('due', task_id)] * 2
+
+
+def test_overrun_alert_shares_the_heap(scheduled):
+    tracker, reminders, scheduler, events = scheduled
+    task_id = add_task(tracker, 'a', '2024-05-06 09:30')
+    reminders.start()
+
+    reminders.watch_overrun(task_id, scheduler.clock.now + 10 * 60)
+    reminders.watch_overrun(task_id, scheduler.clock.now + 20 * 60)
+    scheduler.advance(15 * 60)
+    assert events == []
+    reminders.cancel_overrun(task_id)
+    scheduler.advance(20 * 60)
+    assert events == [('due', task_id)]
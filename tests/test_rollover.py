@@ -0,0 +1,34 @@
+from datetime import date, timedelta
+
+from rollover import DayRollover
+
+
+class Clock:
+    def __init__(self, today):
+        self.today = today
+
+    def __call__(self):
+        return self.today
+
+
+def open_task_dates(cursor):
+    cursor.execute('SELECT date_created FROM tasks WHERE completed = 0 ORDER BY id')
+    return [row[0] for row in cursor.fetchall()]
+
+
+def roll_to_next_day(tracker, **policy):
+    clock = Clock(date(2024, 3, 1))
+    tracker.cursor.execute("INSERT INTO tasks (title, date_created) VALUES ('open', '2024-03-01')")
+    rollover = DayRollover(tracker.conn, clock=clock, **policy)
+    clock.today += timedelta(days=1)
+    assert rollover.day_changed()
+    rollover.roll(tracker.history)
+    return open_task_dates(tracker.cursor)
+
+
+def test_rollover_is_off_by_default(tracker_db):
+    assert roll_to_next_day(tracker_db) == ['2024-03-01']
+
+
+def test_move_policy_is_opt_in(tracker_db):
+    assert roll_to_next_day(tracker_db, policy='move') == ['2024-03-02']
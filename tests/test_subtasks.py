@@ -0,0 +1,86 @@
+from datetime import date, timedelta
+
+from subtasks import TaskHierarchy
+
+
+def add_family(cursor, days_ago=0):
+    """A parent with one finished and one open child; returns (parent, open child)"""
+    day = str(date.today() - timedelta(days=days_ago))
+    cursor.execute("INSERT INTO tasks (title, date_created) VALUES ('parent', ?)", (day,))
+    parent_id = cursor.lastrowid
+    cursor.execute('''
+        INSERT INTO tasks (title, parent_task_id, completed, date_created, actual_time, rollup_time)
+        VALUES ('done', ?, 1, ?, 20, 20)
+    ''', (parent_id, day))
+    cursor.execute("INSERT INTO tasks (title, parent_task_id, date_created) VALUES ('open', ?, ?)",
+                   (parent_id, day))
+    return parent_id, cursor.lastrowid
+
+
+def rollups(cursor, task_id):
+    cursor.execute('SELECT progress, rollup_time FROM tasks WHERE id = ?', (task_id,))
+    return cursor.fetchone()
+
+
+def test_refresh_rolls_children_up(tracker_db):
+    hierarchy = TaskHierarchy(tracker_db.conn)
+    parent_id, child_id = add_family(tracker_db.cursor)
+    hierarchy.refresh(child_id)
+    assert rollups(tracker_db.cursor, parent_id) == (50, 20)
+
+
+def test_refresh_keeps_completed_parent_at_100(tracker_db):
+    cursor = tracker_db.cursor
+    hierarchy = TaskHierarchy(tracker_db.conn)
+    parent_id, child_id = add_family(cursor)
+    cursor.execute('UPDATE tasks SET completed = 1, progress = 100 WHERE id = ?', (parent_id,))
+
+    hierarchy.refresh(parent_id)
+    assert rollups(cursor, parent_id) == (100, 20)
+
+    cursor.execute('UPDATE tasks SET progress = 40 WHERE id = ?', (child_id,))
+    hierarchy.refresh(child_id)
+    assert rollups(cursor, parent_id) == (100, 20)
+
+
+def test_archiving_leaves_open_parents_rollups_alone(tracker_db):
+    cursor = tracker_db.cursor
+    hierarchy = TaskHierarchy(tracker_db.conn)
+    parent_id, child_id = add_family(cursor, days_ago=200)
+    hierarchy.refresh(child_id)
+    tracker_db.conn.commit()
+
+    assert tracker_db.archiver.archive_batch() == 0
+    hierarchy.refresh(child_id)
+    assert rollups(cursor, parent_id) == (50, 20)
+
+
+def test_refresh_many_aggregates_a_shared_parent_once(tracker_db):
+    cursor = tracker_db.cursor
+    hierarchy = TaskHierarchy(tracker_db.conn)
+    cursor.execute("INSERT INTO tasks (title) VALUES ('root')")
+    root_id = cursor.lastrowid
+    cursor.execute("INSERT INTO tasks (title, parent_task_id) VALUES ('parent', ?)", (root_id,))
+    parent_id = cursor.lastrowid
+    child_ids = []
+    for minutes in range(1, 11):
+        cursor.execute('INSERT INTO tasks (title, parent_task_id, actual_time) VALUES (?, ?, ?)',
+                       ('child', parent_id, minutes))
+        child_ids.append(cursor.lastrowid)
+
+    statements = []
+    tracker_db.conn.set_trace_callback(statements.append)
+    changed = hierarchy.refresh_many(child_ids)
+    tracker_db.conn.set_trace_callback(None)
+
+    assert set(changed) == set(child_ids) | {parent_id, root_id}
+    assert rollups(cursor, root_id) == (0, 55)
+    aggregates = [sql for sql in statements if 'COUNT(*)' in sql]
+    assert len(aggregates) == len(child_ids) + 2
+
+
+def test_refresh_many_stops_at_a_cycle(tracker_db):
+    cursor = tracker_db.cursor
+    parent_id, child_id = add_family(cursor)
+    cursor.execute('UPDATE tasks SET parent_task_id = ? WHERE id = ?', (child_id, parent_id))
+    assert TaskHierarchy(tracker_db.conn).refresh_many([child_id]) == []
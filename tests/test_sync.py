@@ -0,0 +1,124 @@
+import pytest
+
+from sync import SyncClient, decode
+from sync_server import SyncStore
+
+
+class LocalSyncClient(SyncClient):
+    """Talks to an in-process SyncStore instead of HTTP"""
+
+    def __init__(self, tracker, store):
+        super().__init__(tracker.db_path, 'local', tracker.archiver.archive_path)
+        self.store = store
+
+    def _request(self, path, body=None, **params):
+        if path == '/push':
+            return {'accepted': self.store.push(decode(body)['changes'])}
+        return self.store.pull(params['since'], params['limit'], params.get('exclude'))
+
+
+@pytest.fixture
+def replicas(make_tracker, tmp_path):
+    store = SyncStore(str(tmp_path / 'sync_server.db'))
+    a, b = make_tracker('a'), make_tracker('b')
+    yield [(tracker, LocalSyncClient(tracker, store)) for tracker in (a, b)]
+    store.conn.close()
+
+
+def titles(tracker):
+    tracker.cursor.execute('SELECT uuid, title FROM tasks ORDER BY uuid')
+    return tracker.cursor.fetchall()
+
+
+def sync_all(replicas):
+    for _, client in replicas + replicas:
+        client.sync()
+
+
+def delete(tracker, title):
+    with tracker.history.action('Delete task'):
+        tracker.cursor.execute('DELETE FROM tasks WHERE title = ?', (title,))
+    tracker.conn.commit()
+
+
+def test_undone_delete_converges(replicas):
+    (a, _), (b, _) = replicas
+    a.cursor.executemany('INSERT INTO tasks (title) VALUES (?)', [('a1',), ('a2',)])
+    a.conn.commit()
+    sync_all(replicas)
+
+    delete(a, 'a2')
+    a.history.undo()
+    sync_all(replicas)
+
+    assert sorted(title for _, title in titles(a)) == ['a1', 'a2']
+    assert titles(b) == titles(a)
+
+
+def test_restore_after_delete_reached_peer(replicas):
+    (a, _), (b, _) = replicas
+    a.cursor.executemany('INSERT INTO tasks (title) VALUES (?)', [('a1',), ('a2',)])
+    a.conn.commit()
+    sync_all(replicas)
+
+    delete(a, 'a2')
+    sync_all(replicas)
+    assert sorted(title for _, title in titles(b)) == ['a1']
+
+    a.history.undo()
+    sync_all(replicas)
+    assert sorted(title for _, title in titles(b)) == ['a1', 'a2']
+
+    # Edits made after the restore flow both ways again
+    b.cursor.execute("UPDATE tasks SET title = 'a2 edited' WHERE title = 'a2'")
+    b.conn.commit()
+    sync_all(replicas)
+    assert sorted(title for _, title in titles(a)) == ['a1', 'a2 edited']
+    assert titles(b) == titles(a)
+
+
+def test_delete_still_wins_over_concurrent_edit(replicas):
+    (a, _), (b, _) = replicas
+    a.cursor.execute("INSERT INTO tasks (title) VALUES ('a1')")
+    a.conn.commit()
+    sync_all(replicas)
+
+    delete(a, 'a1')
+    b.cursor.execute("UPDATE tasks SET title = 'a1 edited'")
+    b.conn.commit()
+    sync_all(replicas)
+
+    assert titles(a) == titles(b) == []
+
+
+def test_forgotten_archived_task_stays_deleted(replicas):
+    (a, _), (b, _) = replicas
+    a.cursor.execute("INSERT INTO tasks (title, completed, date_created) VALUES ('old', 1, date('now', '-200 days'))")
+    task_id = a.cursor.lastrowid
+    a.conn.commit()
+    sync_all(replicas)
+    assert a.archiver.archive_batch() == 1
+    sync_all(replicas)
+
+    with a.history.action('Delete task'):
+        a.archiver.forget(task_id)
+    a.conn.commit()
+    sync_all(replicas)
+    assert titles(b) == []
+
+    a.history.undo()
+    sync_all(replicas)
+    assert [title for _, title in titles(b)] == ['old']
+
+
+def test_due_time_syncs(replicas):
+    (a, _), (b, _) = replicas
+    a.cursor.execute("INSERT INTO tasks (title) VALUES ('call')")
+    a.conn.commit()
+    sync_all(replicas)
+
+    a.cursor.execute("UPDATE tasks SET due_at = '2024-05-06 09:30'")
+    a.conn.commit()
+    sync_all(replicas)
+    b.cursor.execute('SELECT due_at FROM tasks')
+    assert b.cursor.fetchall() == [('2024-05-06 09:30',)]
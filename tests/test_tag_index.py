@@ -0,0 +1,46 @@
+import pytest
+
+import tag_index
+
+
+def add_task(cursor, tags, day='2024-05-06'):
+    cursor.execute('INSERT INTO tasks (title, tags, date_created) VALUES (?, ?, ?)', (tags, tags, day))
+    return cursor.lastrowid
+
+
+@pytest.fixture
+def tagged(tracker_db):
+    cursor = tracker_db.cursor
+    ids = {tags: add_task(cursor, tags) for tags in ('100%, Work', '1000', 'a_b', 'axb, work', '#Home')}
+    return tracker_db, ids
+
+
+def matching(cursor, tags, source):
+    clause, args = tag_index.tag_filter_sql(tags, source)
+    cursor.execute(f'SELECT title FROM {source} WHERE 1 = 1{clause} ORDER BY id', args)
+    return [row[0] for row in cursor.fetchall()]
+
+
+@pytest.mark.parametrize('source', ['tasks', 'task_history'])
+@pytest.mark.parametrize('tags, expected', [
+    (['work'], ['100%, Work', 'axb, work']),
+    (['100%'], ['100%, Work']),
+    (['a_b'], ['a_b']),
+    (['home'], ['#Home']),
+    (['work', '100%'], ['100%, Work']),
+    (['10%'], []),
+])
+def test_tag_filter_matches_whole_tags(tagged, source, tags, expected):
+    tracker, _ = tagged
+    assert matching(tracker.cursor, tags, source) == expected
+
+
+def test_index_follows_edits_and_counts_facets(tagged):
+    tracker, ids = tagged
+    cursor = tracker.cursor
+    cursor.execute("UPDATE tasks SET tags = 'home, work' WHERE id = ?", (ids['1000'],))
+    cursor.execute('DELETE FROM tasks WHERE id = ?', (ids['a_b'],))
+
+    assert tag_index.facet_counts(cursor, '2024-05-01', '2024-05-31') == [
+        ('work', 3), ('home', 2), ('100%', 1), ('axb', 1)]
+    assert tag_index.facet_counts(cursor, '2024-06-01', '2024-06-30') == []